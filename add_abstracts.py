@@ -6,16 +6,24 @@ Inserts abstract field before full_text in the JSON structure
 
 import json
 import requests
-import time
 from pathlib import Path
 from bs4 import BeautifulSoup
+from head_fetch import StreamingFetcher, head_end
+from http_cache import get_response_cache
 from datetime import datetime
 import config
 
+
+def abstract_head_end(element) -> bool:
+    """Stop condition: </head> is parsed and holds a citation_abstract; otherwise read on to the abstract block"""
+    return head_end(element) and any(tag.get('name') == 'citation_abstract' and (tag.get('content') or '').strip()
+                                     for tag in element.iter('meta'))
+
 class AbstractAdder:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': config.USER_AGENT})
+        self.fetcher = StreamingFetcher(self.session, cache=get_response_cache())
         self.stats = {
             'total': 0,
             'success': 0,
@@ -24,42 +32,28 @@ class AbstractAdder:
             'failed': 0
         }
 
-    def make_request(self, url: str, max_retries: int = 3):
-        """Make HTTP request with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                time.sleep(config.REQUEST_DELAY)
-                return response
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2
-                    print(f"  Retry {attempt + 1}/{max_retries} after {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"  ERROR: Failed after {max_retries} attempts: {e}")
-                    return None
-
     def extract_abstract(self, url: str):
-        """Extract abstract from article page"""
-        response = self.make_request(url)
+        """Extract abstract from article page, downloading only its <head> when citation_abstract has it"""
+        # One request either way: pages without citation_abstract are read to the end on the same connection
+        page = self.fetcher.fetch(url, stop=abstract_head_end)
 
-        if not response:
+        if not page:
+            print(f"  ERROR: Could not fetch {url}")
             return None
 
-        soup = BeautifulSoup(response.content, 'lxml')
+        meta = page.meta()
 
         # Try multiple methods to extract abstract
         abstract = None
 
         # Method 1: Meta tag
-        meta_abstract = soup.find('meta', attrs={'name': 'citation_abstract'})
-        if meta_abstract and meta_abstract.get('content'):
-            abstract = meta_abstract.get('content').strip()
+        meta_abstract = meta.get('citation_abstract')
+        if meta_abstract and meta_abstract[0]:
+            abstract = meta_abstract[0].strip()
 
-        # Method 2: Abstract div
+        # Method 2: Abstract div (the page was read in full if method 1 found nothing)
         if not abstract:
+            soup = BeautifulSoup(page.content, 'lxml')
             abstract_div = soup.find('div', class_='item abstract')
             if abstract_div:
                 # Remove the label/heading
@@ -70,9 +64,9 @@ class AbstractAdder:
 
         # Method 3: Try DC.Description meta tag
         if not abstract:
-            dc_desc = soup.find('meta', attrs={'name': 'DC.Description'})
-            if dc_desc and dc_desc.get('content'):
-                abstract = dc_desc.get('content').strip()
+            dc_desc = meta.get('DC.Description')
+            if dc_desc and dc_desc[0]:
+                abstract = dc_desc[0].strip()
 
         return abstract if abstract else ""
 
@@ -188,6 +182,7 @@ class AbstractAdder:
         if self.stats['total'] > 0:
             success_rate = (self.stats['success'] + self.stats['already_has']) / self.stats['total'] * 100
             print(f"  Success rate: {success_rate:.1f}%")
+        print(f"  Downloads: {self.fetcher.describe()}")
         if interim:
             print("---")
 
@@ -0,0 +1,150 @@
+"""
+Asynchronous fetch engine for the First Monday scrapers
+Keeps several requests in flight per host while the shared rate limiter paces them
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+except ImportError:  # optional - scrapers fall back to the synchronous requests path
+    aiohttp = None
+
+import config
+from rate_limiter import get_rate_limiter
+
+
+class FetchResult:
+    """Response object exposing the parts of requests.Response the scrapers use"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, content: bytes, elapsed: float = 0.0,
+                 from_cache: bool = False, fetched_at: Optional[float] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+        self.fetched_at = fetched_at  # download time (epoch seconds) of a cached response
+        self.not_modified = False  # set during recrawls when the page matches its stored validators
+
+    @classmethod
+    def from_response(cls, response) -> 'FetchResult':
+        """Wrap a requests.Response"""
+        return cls(url=response.url, status_code=response.status_code, headers=response.headers,
+                   content=response.content, elapsed=response.elapsed.total_seconds())
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+
+class AsyncFetcher:
+    """aiohttp-based fetcher with per-host concurrency limits and adaptive rate limiting"""
+
+    def __init__(self,
+                 concurrency_per_host: Optional[int] = None,
+                 max_retries: int = config.MAX_RETRIES,
+                 cache=None):
+        # Read config at construction time so command-line overrides apply
+        self.concurrency_per_host = concurrency_per_host or config.MAX_CONCURRENCY_PER_HOST
+        self.max_retries = max_retries
+        self.cache = cache
+        self.session = None
+        self.semaphores = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def available() -> bool:
+        """True if aiohttp is installed"""
+        return aiohttp is not None
+
+    def get_session(self):
+        """Create the aiohttp session lazily so it binds to the running event loop"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=config.HEADERS,
+                timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit_per_host=self.concurrency_per_host),
+            )
+        return self.session
+
+    def get_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.concurrency_per_host)
+        return self.semaphores[host]
+
+    async def get_once(self, url: str, headers: Optional[Dict] = None) -> FetchResult:
+        """Issue a single GET and read the whole body"""
+        start = time.monotonic()
+        async with self.get_session().get(url, headers=headers) as response:
+            content = await response.read()
+            return FetchResult(
+                url=str(response.url),
+                status_code=response.status,
+                headers=response.headers,
+                content=content,
+                elapsed=time.monotonic() - start,
+            )
+
+    async def fetch(self, url: str, use_cache: bool = True, headers: Optional[Dict] = None,
+                    max_retries: Optional[int] = None, client_errors: bool = False) -> Optional[FetchResult]:
+        """
+        Fetch a URL with retry logic, holding a per-host slot only while the request is in flight
+        A 304 is returned as a result too; it only occurs when conditional headers were sent
+        client_errors: return 4xx answers (other than 403/429) instead of None, so a missing page
+        can be told apart from an outage
+        """
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+
+        host = urlparse(url).netloc
+        limiter = get_rate_limiter(url)
+
+        max_retries = max_retries or self.max_retries
+        for attempt in range(max_retries):
+            async with self.get_semaphore(host):
+                await limiter.acquire_async()
+                self.logger.debug(f"Requesting: {url}")
+                try:
+                    response = await self.get_once(url, headers)
+                    limiter.record_response(response.status_code, response.elapsed,
+                                            response.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    response = None
+                    limiter.record_error()
+                    self.logger.error(f"Request error for {url}: {e!r}")
+
+            if response is None:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(limiter.backoff_delay(attempt))
+            elif response.status_code == 200:
+                if self.cache is not None:
+                    self.cache.put(url, response)
+                return response
+            elif response.status_code == 304:
+                return response
+            elif response.status_code in [403, 429]:
+                self.logger.warning(f"Rate limited ({response.status_code}) - backing off")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(limiter.backoff_delay(attempt))
+            elif client_errors and 400 <= response.status_code < 500:
+                return response
+            else:
+                self.logger.warning(f"Status {response.status_code} for {url}")
+
+        return None
+
+    async def close(self):
+        """Close the underlying aiohttp session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
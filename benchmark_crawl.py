@@ -0,0 +1,196 @@
+"""
+End-to-end crawl benchmark against the local mock OJS server
+Runs the scrapers over a synthetic (or recorded) corpus and reports articles/sec,
+requests per article and response latency percentiles
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import config
+from mock_ojs_server import add_server_arguments, build_server, point_config_at
+from rate_limiter import get_rate_limiter
+
+SCRAPERS = ['issue-async', 'issue-sync', 'legacy']
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def record_latencies(base_url: str) -> List[float]:
+    """
+    Collect the latency of every response the host's rate limiter sees
+    Timeouts and connection errors count as REQUEST_TIMEOUT, as they do for the limiter
+    """
+    limiter = get_rate_limiter(base_url)
+    latencies = []
+    record_response = limiter.record_response
+    record_error = limiter.record_error
+
+    def on_response(status_code, latency, retry_after=None):
+        latencies.append(latency)
+        record_response(status_code, latency, retry_after)
+
+    def on_error():
+        latencies.append(config.REQUEST_TIMEOUT)
+        record_error()
+
+    limiter.record_response = on_response
+    limiter.record_error = on_error
+    return latencies
+
+
+def crawl_issue_scraper(fetch_mode: str) -> int:
+    """Full corpus the way scrape_all.py does it, retry queue included; returns articles saved"""
+    from scraper_by_issue import IssueBasedScraper
+
+    scraper = IssueBasedScraper(fetch_mode=fetch_mode)
+    try:
+        for issue in scraper.iter_issues():
+            scraper.scrape_single_issue(issue)
+            scraper.retry_due_articles(opportunistic=True)
+        scraper.drain_retry_queue()
+        return scraper.frontier.count('article', 'done')
+    finally:
+        scraper.close()
+
+
+def crawl_legacy_scraper() -> int:
+    """Every article on the first archive page with FirstMondayScraper; returns articles saved"""
+    from scraper import FirstMondayScraper
+
+    scraper = FirstMondayScraper()
+    try:
+        scraper.scrape_sample(num_issues=config.ARCHIVE_MAX_PAGES, num_articles_per_issue=10 ** 6)
+        return scraper.frontier.count('article', 'done')
+    finally:
+        scraper.close()
+
+
+def run_benchmark(name: str, args) -> Dict:
+    """One scraper against a fresh server, data directory and rate limiter"""
+    server = build_server(args, timeout_delay=args.timeout + 1)
+    base_url = server.start()
+    point_config_at(base_url)
+    latencies = record_latencies(base_url)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='fm-bench-') as workdir:
+        # config paths are relative to the working directory, so each run gets its own data/
+        os.chdir(workdir)
+        try:
+            start = time.monotonic()
+            if name == 'legacy':
+                articles = crawl_legacy_scraper()
+            else:
+                articles = crawl_issue_scraper(name.split('-')[1])
+            elapsed = time.monotonic() - start
+        finally:
+            os.chdir(cwd)
+            server.stop()
+
+    stats = server.stats
+    return {
+        'scraper': name,
+        'articles': articles,
+        'seconds': round(elapsed, 3),
+        'articles_per_sec': round(articles / elapsed, 3) if elapsed else 0.0,
+        'requests': stats['requests'],
+        'requests_per_article': round(stats['requests'] / articles, 3) if articles else None,
+        'requests_by_page': {key[len('requests_'):]: n for key, n in sorted(stats.items())
+                             if key.startswith('requests_')},
+        'injected_errors': {key[len('injected_'):]: n for key, n in sorted(stats.items())
+                            if key.startswith('injected_')},
+        'bytes': stats['bytes'],
+        'latency_p50': round(percentile(latencies, 50), 4),
+        'latency_p99': round(percentile(latencies, 99), 4),
+    }
+
+
+def configure(args):
+    """Settings for a local benchmark: no politeness limits, no cache, short timeouts and back-offs"""
+    config.HTTP_CACHE_ENABLED = False
+    config.WARC_CAPTURE = False
+    config.REQUEST_TIMEOUT = args.timeout
+    config.RATE_LIMIT_INITIAL = args.rate
+    config.RATE_LIMIT_MAX = args.rate
+    config.RATE_LIMIT_BURST = max(config.RATE_LIMIT_BURST, args.rate)
+    config.BACKOFF_BASE = 0.1
+    config.BACKOFF_CAP = 2
+    config.RETRY_BASE_DELAY = 0.5
+    config.RETRY_MAX_DELAY = 2
+    config.RETRY_DRAIN_MAX_WAIT = 10
+    if args.concurrency:
+        config.MAX_CONCURRENCY_PER_HOST = args.concurrency
+    if args.text_workers is not None:
+        config.TEXT_WORKERS = args.text_workers
+
+    # Configure logging before the scrapers do, so their basicConfig calls leave it alone
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+    )
+
+
+def print_results(results: List[Dict]):
+    print(f"\n{'Scraper':<12} {'Articles':>8} {'Time':>8} {'Art/s':>7} {'Req/art':>8} "
+          f"{'p50 (s)':>8} {'p99 (s)':>8}  Injected errors")
+    for r in results:
+        per_article = f"{r['requests_per_article']:.2f}" if r['requests_per_article'] else '-'
+        errors = ', '.join(f"{k} {n}" for k, n in r['injected_errors'].items()) or 'none'
+        print(f"{r['scraper']:<12} {r['articles']:>8} {r['seconds']:>7.1f}s {r['articles_per_sec']:>7.2f} "
+              f"{per_article:>8} {r['latency_p50']:>8.3f} {r['latency_p99']:>8.3f}  {errors}")
+    print("\nRequests by page type:")
+    for r in results:
+        print(f"  {r['scraper']:<12} " + ', '.join(f"{k} {n}" for k, n in r['requests_by_page'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local mock First Monday server")
+    add_server_arguments(parser)
+    parser.add_argument('--scraper', choices=SCRAPERS + ['all'], default='all')
+    parser.add_argument('--rate', type=float, default=200.0, help="rate limit in req/s (default: 200)")
+    parser.add_argument('--concurrency', type=int, help="async requests in flight per host")
+    parser.add_argument('--text-workers', type=int,
+                        help="full-text extraction processes in async mode (0: parse threads; default: one per CPU)")
+    parser.add_argument('--timeout', type=float, default=2.0, help="request timeout in seconds (default: 2)")
+    parser.add_argument('--json', metavar='FILE', help="also write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="show the scrapers' log output")
+    args = parser.parse_args()
+
+    configure(args)
+    names = SCRAPERS if args.scraper == 'all' else [args.scraper]
+
+    print("=" * 80)
+    print("FIRST MONDAY CRAWL BENCHMARK")
+    print("=" * 80)
+    corpus = args.warc_dir or f"{args.issues} issues x {args.articles} articles, {args.galley_kb} KB documents"
+    print(f"Corpus: {corpus}")
+    print(f"Server: latency {args.latency}s +/- {args.jitter}s, 429 {args.rate_429:.0%}, "
+          f"5xx {args.rate_5xx:.0%}, timeouts {args.rate_timeout:.0%}")
+
+    results = []
+    for name in names:
+        print(f"\nRunning {name}...")
+        results.append(run_benchmark(name, args))
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
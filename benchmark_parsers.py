@@ -0,0 +1,136 @@
+"""
+Per-page benchmark of the HTML parser backends (html_parsers.py)
+Times the extraction steps the scrapers run on landing pages, galley pages and article documents,
+over saved pages (WARC archive, response cache or a directory of .html files)
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+import config
+from crawl_planner import page_type
+from html_parsers import BACKENDS, get_backend
+
+EXTRACTED_PAGES = ('landing', 'galley', 'document')
+
+
+def load_saved_pages(html_dir: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, bytes]]:
+    """
+    (url, content) of saved pages: a directory of .html files if given, otherwise the WARC archive
+    and the response cache; synthetic mock-server pages if nothing has been saved yet
+    """
+    pages = {}
+
+    if html_dir:
+        for path in sorted(Path(html_dir).rglob('*.htm*')):
+            pages[str(path)] = path.read_bytes()
+    else:
+        if os.path.exists(os.path.join(config.WARC_DIR, 'index.cdx')):
+            from warc_writer import WarcArchive
+            archive = WarcArchive()
+            for url in archive.urls():
+                record = archive.read(url)
+                if record and page_type(url) in EXTRACTED_PAGES:
+                    pages[url] = record.content
+
+        if os.path.exists(os.path.join(config.HTTP_CACHE_DIR, 'index.db')):
+            from http_cache import ResponseCache
+            cache = ResponseCache()
+            try:
+                for url, _ in cache.transfer_sizes():
+                    if url not in pages and page_type(url) in EXTRACTED_PAGES:
+                        response = cache.get(url)
+                        if response:
+                            pages[url] = response.content
+            finally:
+                cache.close()
+
+    if not pages:
+        from mock_ojs_server import OJS, SyntheticCorpus
+        corpus = SyntheticCorpus(issues=2, articles_per_issue=10)
+        for article_id in range(1001, 1011):
+            galley_id = article_id * 10 + 1
+            pages[f"{config.BASE_URL}{OJS}/article/view/{article_id}"] = corpus.landing_page(article_id).encode()
+            pages[f"{config.BASE_URL}{OJS}/article/view/{article_id}/{galley_id}"] = \
+                corpus.galley_page(article_id, galley_id).encode()
+            pages[f"{config.BASE_URL}{OJS}/article/download/{article_id}/{galley_id}"] = \
+                corpus.document(article_id, galley_id).encode()
+
+    return list(pages.items())[:limit]
+
+
+def extraction_steps(url: str, content: bytes) -> str:
+    """Which of the scraper's extraction steps run on a page: 'landing', 'galley' or 'document'"""
+    kind = page_type(url)
+    if kind in EXTRACTED_PAGES:
+        return kind
+    # Saved files have no URL to go by
+    if b'citation_' in content:
+        return 'landing'
+    return 'galley' if b'<iframe' in content else 'document'
+
+
+def extract(backend, content: bytes, steps: str) -> Dict:
+    """Parse a page and run every extraction step the scraper would run on it"""
+    if steps == 'document':
+        return {'document_text': backend(content).document_text()}
+
+    page = backend(content)
+    if steps == 'galley':
+        return {'iframe_src': page.iframe_src(), 'galley_page_text': page.galley_page_text()}
+
+    return page.landing_fields()
+
+
+def time_backend(backend, pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, List[float]]:
+    """Best-of-`repeat` milliseconds per page, grouped by page kind"""
+    timings: Dict[str, List[float]] = {}
+    for url, content in pages:
+        steps = extraction_steps(url, content)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extract(backend, content, steps)
+            best = min(best, time.perf_counter() - start)
+        timings.setdefault(steps, []).append(best * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML parser backends on saved pages")
+    parser.add_argument('--html-dir', help="directory of saved .html pages (default: WARC archive and cache)")
+    parser.add_argument('--limit', type=int, help="use at most this many pages")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per page; the fastest counts (default: 3)")
+    args = parser.parse_args()
+
+    pages = load_saved_pages(args.html_dir, args.limit)
+    backends = [name for name in BACKENDS if get_backend(name).name == name]
+
+    print("=" * 80)
+    print("HTML PARSER BENCHMARK")
+    print("=" * 80)
+    print(f"Pages: {len(pages)} ({sum(len(c) for _, c in pages) / 1024:.0f} KB)   Backends: {', '.join(backends)}")
+
+    results = {name: time_backend(BACKENDS[name], pages, args.repeat) for name in backends}
+    baseline = results['bs4']
+
+    print(f"\n{'Page kind':<10} {'Pages':>6} " + ''.join(f"{name + ' (ms)':>17}" for name in backends)
+          + ''.join(f"{name + ' speedup':>20}" for name in backends if name != 'bs4'))
+    for kind in sorted(baseline):
+        row = f"{kind:<10} {len(baseline[kind]):>6} "
+        row += ''.join(f"{median(results[name][kind]):>17.2f}" for name in backends)
+        row += ''.join(f"{median(baseline[kind]) / median(results[name][kind]):>19.1f}x"
+                       for name in backends if name != 'bs4')
+        print(row)
+
+    totals = {name: sum(sum(t) for t in results[name].values()) for name in backends}
+    print(f"\nTotal: " + ', '.join(f"{name} {totals[name]:.0f} ms" for name in backends))
+    print("Median milliseconds per page, parse included; speedup is relative to bs4 (BeautifulSoup).")
+
+
+if __name__ == "__main__":
+    main()
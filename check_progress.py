@@ -3,16 +3,51 @@ Quick progress checker for ongoing scrape
 """
 import json
 import os
+from datetime import datetime
 from pathlib import Path
+from frontier import CrawlFrontier
+import config
 
 def main():
     print("\n" + "="*60)
     print("First Monday Scraper - Progress Check")
     print("="*60 + "\n")
 
-    # Check checkpoint
+    # Check crawl frontier (indexed counts, no matter how large the corpus)
     checkpoint_file = "data/checkpoint.json"
-    if os.path.exists(checkpoint_file):
+    if os.path.exists(config.FRONTIER_DB):
+        frontier = CrawlFrontier()
+        counts = frontier.counts()
+        issues = counts.get('issue', {})
+        articles = counts.get('article', {})
+        processed_issues = issues.get('done', 0)
+
+        print(f"Frontier Status:")
+        print(f"  Issues processed: {processed_issues} / 359 ({processed_issues/359*100:.1f}%)")
+        print(f"  Issues failed: {issues.get('failed', 0)}, in flight: {issues.get('in_flight', 0)}")
+        print(f"  Articles processed: {articles.get('done', 0)}")
+        print(f"  Articles failed: {articles.get('failed', 0)}, queued for retry: {articles.get('retry', 0)}, "
+              f"pending: {articles.get('pending', 0)}, in flight: {articles.get('in_flight', 0)}")
+        next_retry = frontier.next_retry_time('article')
+        if next_retry:
+            print(f"  Next retry due: {datetime.fromtimestamp(next_retry).strftime('%Y-%m-%d %H:%M')}")
+
+        leases = [row for row in frontier.items('issue', 'in_flight') if row['lease_expires']]
+        if leases:
+            print(f"\n  Leased issues:")
+            for row in leases:
+                left = row['lease_expires'] - datetime.now().timestamp()
+                status = f"expires in {left:.0f}s" if left > 0 else "expired, waiting for takeover"
+                print(f"    - {row['url']} ({row['worker_id']}, {status})")
+
+        failures = frontier.recent_errors(3)
+        if failures:
+            print(f"\n  Recent failures:")
+            for row in failures:
+                when = datetime.fromtimestamp(row['updated_at']).strftime('%Y-%m-%d %H:%M')
+                print(f"    - [{when}] {row['url']} ({row['attempts']} attempts): {row['last_error']}")
+        frontier.close()
+    elif os.path.exists(checkpoint_file):
         with open(checkpoint_file, 'r') as f:
             checkpoint = json.load(f)
 
@@ -7,6 +7,8 @@ BASE_URL = "https://firstmonday.org"
 ARCHIVE_URL = f"{BASE_URL}/ojs/index.php/fm/issue/archive"
 OJS_ARTICLE_BASE = f"{BASE_URL}/ojs/index.php/fm/article/view"
 LEGACY_BASE = f"{BASE_URL}/issues"
+OAI_URL = f"{BASE_URL}/ojs/index.php/fm/oai"
+ARCHIVE_MAX_PAGES = 20  # upper bound on archive listing pages; discovery stops at the first empty page
 
 # Crawling settings
 REQUEST_DELAY = 2.5  # seconds between requests
@@ -14,6 +16,39 @@ REQUEST_TIMEOUT = 30  # seconds
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 
+# Fetch engine
+FETCH_MODE = "async"  # "async" (aiohttp, concurrent) or "sync" (requests, one request at a time)
+MAX_CONCURRENCY_PER_HOST = 4  # requests kept in flight per host in async mode
+PARSE_WORKERS = 1  # threads parsing fetched pages while the next requests wait (async mode); more only contend for the GIL
+TEXT_WORKERS = None  # processes extracting article full text in async mode (None: one per CPU, 0: use the parse threads)
+TEXT_MAX_PENDING = 0  # documents handed to the text processes at once, bounding memory (0: twice the workers)
+HTML_PARSER = "lxml"  # "lxml", "selectolax" (optional package) or "bs4" (BeautifulSoup: slowest, the reference behaviour)
+PIPELINE_QUEUE_SIZE = 8  # fetched-but-unparsed and parsed-but-unwritten articles held at most
+PIPELINE_STATS_INTERVAL = 30  # seconds between pipeline queue/throughput log lines
+PLAN_MEAN_LATENCY = 1.0  # seconds per response assumed by the crawl planner (crawl_planner.py --latency)
+ARTICLE_FETCH_ATTEMPTS = 1  # attempts per article request within a pass; failures go to the retry queue
+HEAD_FETCH_CHUNK_SIZE = 4096  # bytes read at a time by streaming metadata fetches (head_fetch.py) before checking for </head>
+
+# Adaptive rate limiting (token bucket with AIMD, shared by all fetching scripts)
+RATE_LIMIT_INITIAL = 1 / REQUEST_DELAY  # starting rate, requests per second per host
+RATE_LIMIT_MIN = 0.1  # never go slower than this
+RATE_LIMIT_MAX = 4.0  # never go faster than this
+RATE_LIMIT_BURST = 3  # requests that may go out back-to-back after an idle period
+RATE_LIMIT_WINDOW = 20  # responses observed before each AIMD adjustment
+RATE_LIMIT_INCREASE = 0.1  # additive increase (req/s) after a healthy window
+RATE_LIMIT_DECREASE = 0.5  # multiplicative decrease on throttling or an unhealthy window
+RATE_LIMIT_TARGET_LATENCY = 2.0  # seconds; slower windows are treated as server strain
+RATE_LIMIT_MAX_ERROR_RATE = 0.1  # error share above which a window is unhealthy
+BACKOFF_BASE = RETRY_DELAY  # seconds; full-jitter backoff ceiling for the first retry
+BACKOFF_CAP = 120  # seconds; upper bound for backoff and Retry-After pauses
+
+# Retry queue for failed articles (kept in FRONTIER_DB)
+RETRY_MAX_ATTEMPTS = 4  # passes over an article before it is failed for good
+RETRY_BASE_DELAY = 60  # seconds before the first retry; doubles with every further attempt
+RETRY_MAX_DELAY = 3600  # seconds; upper bound for the retry delay
+RETRY_BATCH_SIZE = 10  # due retries slipped in between issues when the rate budget allows
+RETRY_DRAIN_MAX_WAIT = 600  # seconds the end-of-run drain waits for retries that are not due yet
+
 # User agent (identify as academic research bot)
 USER_AGENT = "FirstMondayResearchBot/1.0 (Academic Research; Contact: your-email@example.com)"
 
@@ -31,13 +66,38 @@ OUTPUT_DIR = "data"
 ISSUES_DIR = f"{OUTPUT_DIR}/issues"  # Organized by issue
 METADATA_DIR = f"{OUTPUT_DIR}/metadata"  # Flat metadata (legacy)
 FULLTEXT_DIR = f"{OUTPUT_DIR}/fulltext"  # Flat fulltext (legacy)
-CHECKPOINT_FILE = f"{OUTPUT_DIR}/checkpoint.json"
+CHECKPOINT_FILE = f"{OUTPUT_DIR}/checkpoint.json"  # Legacy progress file, migrated into FRONTIER_DB
+FRONTIER_DB = f"{OUTPUT_DIR}/frontier.db"  # Crawl frontier: state of every issue and article URL
+ARCHIVE_INDEX_FILE = f"{OUTPUT_DIR}/archive_index.json"  # issue list from the last complete archive walk
+
+# Distributed crawling (scrape_all.py --coordinator / --worker)
+LEASE_SECONDS = 600  # a worker's claim on an issue expires this long after its last renewal
+WORKER_POLL_INTERVAL = 30  # seconds an idle worker waits before checking for expired leases again
+WORKER_RATE_LIMIT = 1.0  # default per-worker request ceiling (req/s per host); each worker paces itself
 LOG_FILE = f"{OUTPUT_DIR}/scraper.log"
 
+# HTTP response cache (shared by all fetching scripts)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = f"{OUTPUT_DIR}/http_cache"
+HTTP_CACHE_TTL = 90 * 24 * 3600  # seconds before a cached page is re-fetched; 0 keeps pages until evicted
+HTTP_CACHE_MAX_BYTES = 2 * 1024 ** 3  # compressed size bound; least recently used pages are evicted beyond it
+HTTP_CACHE_ZSTD_LEVEL = 10
+VALIDATORS_DB = f"{OUTPUT_DIR}/validators.db"  # ETag / Last-Modified / content hash per URL for recrawls
+
+# Raw response archive (WARC)
+WARC_CAPTURE = False  # When True, IssueBasedScraper archives every network response
+WARC_DIR = f"{OUTPUT_DIR}/warc"  # *.warc.gz files plus index.cdx
+WARC_MAX_FILE_SIZE = 1024 ** 3  # bytes; a new WARC file is started beyond this
+
+# OAI-PMH metadata harvesting
+OAI_METADATA_PREFIX = "oai_dc"
+OAI_STATE_FILE = f"{OUTPUT_DIR}/oai_state.json"  # last harvest date and any unfinished resumption token
+
 # Organization settings
 ORGANIZE_BY_ISSUE = True  # When True, organize files by issue folders
 
 # Data extraction settings
 EXTRACT_FULL_TEXT = True
+RESOLVE_DOWNLOAD_URLS = True  # Fetch /article/download/{id}/{galley} directly instead of via the galley page
 EXTRACT_PDF = False  # Set to True to also download PDFs
 MAX_ARTICLES_PER_RUN = None  # Set to a number for testing (e.g., 10)
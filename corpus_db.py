@@ -0,0 +1,375 @@
+"""
+SQLite corpus database with an FTS5 full-text index
+Imports the combined corpus (Data/articles) into normalized tables - issues, articles, authors,
+article_authors, keywords - and indexes title, abstract and full text for search.
+Imports are incremental: an article is only rewritten when the hash of its record has changed
+
+    python corpus_db.py import
+    python corpus_db.py search "digital divide" --phrase --year 2003
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_ARTICLES_DIR = 'Data/articles'
+DEFAULT_DB = 'Data/corpus.db'
+
+YEAR = re.compile(r'^(\d{4})')
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS issues (
+        issue_id INTEGER PRIMARY KEY,
+        folder TEXT NOT NULL UNIQUE,
+        title TEXT,
+        volume TEXT,
+        issue_number TEXT,
+        date TEXT,
+        year INTEGER,
+        url TEXT,
+        article_count INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        article_id TEXT NOT NULL UNIQUE,
+        issue_id INTEGER REFERENCES issues (issue_id),
+        url TEXT,
+        title TEXT,
+        abstract TEXT,
+        publication_date TEXT,
+        year INTEGER,
+        doi TEXT,
+        volume TEXT,
+        issue TEXT,
+        journal TEXT,
+        article_type TEXT,
+        word_count INTEGER,
+        full_text TEXT,
+        path TEXT,
+        content_hash TEXT NOT NULL,
+        imported_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS articles_year ON articles (year);
+    CREATE INDEX IF NOT EXISTS articles_issue ON articles (issue_id);
+    CREATE TABLE IF NOT EXISTS authors (
+        author_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS article_authors (
+        article_id TEXT NOT NULL REFERENCES articles (article_id) ON DELETE CASCADE,
+        author_id INTEGER NOT NULL REFERENCES authors (author_id),
+        position INTEGER NOT NULL,
+        PRIMARY KEY (article_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS article_authors_author ON article_authors (author_id);
+    CREATE TABLE IF NOT EXISTS keywords (
+        article_id TEXT NOT NULL REFERENCES articles (article_id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        keyword TEXT NOT NULL,
+        PRIMARY KEY (article_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword COLLATE NOCASE);
+
+    -- External-content FTS5 index over articles, kept in step by triggers
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (
+        title, abstract, full_text,
+        content='articles', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, title, abstract, full_text)
+        VALUES (new.id, new.title, new.abstract, new.full_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, abstract, full_text)
+        VALUES ('delete', old.id, old.title, old.abstract, old.full_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, abstract, full_text)
+        VALUES ('delete', old.id, old.title, old.abstract, old.full_text);
+        INSERT INTO articles_fts (rowid, title, abstract, full_text)
+        VALUES (new.id, new.title, new.abstract, new.full_text);
+    END;
+"""
+
+ARTICLE_COLUMNS = ['url', 'title', 'abstract', 'publication_date', 'doi', 'volume', 'issue',
+                   'journal', 'article_type', 'word_count', 'full_text']
+
+
+def content_hash(article: Dict, folder: str) -> str:
+    """Hash of an article record (and where it is filed), independent of JSON formatting"""
+    canonical = json.dumps([folder, article], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def year_of(*values) -> Optional[int]:
+    """Year from the first value that starts with one: issue folder YYYYMMDD or YYYY/MM/DD date"""
+    for value in values:
+        match = YEAR.match(str(value or ''))
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def iter_corpus(articles_dir: Path) -> Iterator[Tuple[str, str, Optional[Path], Dict]]:
+    """
+    ('issue', folder, None, issue_info) for each issue folder, followed by
+    ('article', folder, path, record) for each of its articles
+    """
+    for issue_dir in sorted(p for p in articles_dir.iterdir() if p.is_dir()):
+        info_file = issue_dir / 'issue_info.json'
+        issue_info = {}
+        if info_file.exists():
+            try:
+                with open(info_file, 'r', encoding='utf-8') as f:
+                    issue_info = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  Skipping unreadable {info_file}: {e}")
+        yield 'issue', issue_dir.name, None, issue_info
+
+        for article_file in sorted(issue_dir.glob('*.json')):
+            if article_file.name == 'issue_info.json':
+                continue
+            try:
+                with open(article_file, 'r', encoding='utf-8') as f:
+                    yield 'article', issue_dir.name, article_file, json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  Skipping unreadable {article_file}: {e}")
+
+
+class CorpusDatabase:
+    """Normalized, full-text indexed copy of the combined corpus"""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def import_corpus(self, articles_dir: str = DEFAULT_ARTICLES_DIR, prune: bool = False) -> Dict[str, int]:
+        """
+        Bring the database up to date with the corpus directory in one transaction
+        Unchanged articles (same content hash) are skipped; with prune, articles no longer in the
+        corpus are deleted. Returns counts of added, updated, unchanged and removed articles
+        """
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'issues': 0}
+        known = {row['article_id']: row['content_hash']
+                 for row in self.db.execute("SELECT article_id, content_hash FROM articles")}
+        seen = set()
+        issue_ids = {}
+
+        with self.db:
+            for kind, folder, path, record in iter_corpus(Path(articles_dir)):
+                if kind == 'issue':
+                    issue_ids[folder] = self.upsert_issue(folder, record)
+                    stats['issues'] += 1
+                    continue
+
+                article_id = str(record.get('article_id') or path.stem.split('_')[0])
+                if article_id in seen:
+                    print(f"  Duplicate article_id {article_id} in {path} - skipped")
+                    continue
+                seen.add(article_id)
+
+                digest = content_hash(record, folder)
+                if known.get(article_id) == digest:
+                    stats['unchanged'] += 1
+                    continue
+                self.upsert_article(article_id, record, issue_ids[folder], folder, str(path), digest)
+                stats['updated' if article_id in known else 'added'] += 1
+
+            if prune:
+                for article_id in set(known) - seen:
+                    self.db.execute("DELETE FROM articles WHERE article_id = ?", (article_id,))
+                    stats['removed'] += 1
+
+            # Authors left without articles by updates and deletions
+            self.db.execute("DELETE FROM authors WHERE author_id NOT IN (SELECT author_id FROM article_authors)")
+
+        return stats
+
+    def upsert_issue(self, folder: str, info: Dict) -> int:
+        self.db.execute(
+            "INSERT INTO issues (folder, title, volume, issue_number, date, year, url, article_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(folder) DO UPDATE SET title = excluded.title, volume = excluded.volume, "
+            "issue_number = excluded.issue_number, date = excluded.date, year = excluded.year, "
+            "url = excluded.url, article_count = excluded.article_count",
+            (folder, info.get('title'), info.get('volume'), info.get('issue_number'), info.get('date'),
+             year_of(folder, (info.get('date') or '')[-4:]), info.get('url'), info.get('article_count')))
+        return self.db.execute("SELECT issue_id FROM issues WHERE folder = ?", (folder,)).fetchone()[0]
+
+    def upsert_article(self, article_id: str, record: Dict, issue_id: int, folder: str, path: str, digest: str):
+        """Insert or rewrite an article with its authors and keywords"""
+        values = [record.get(column) for column in ARTICLE_COLUMNS]
+        values = [v if v is None or isinstance(v, (int, float)) else str(v) for v in values]
+        self.db.execute(
+            f"INSERT INTO articles (article_id, issue_id, year, path, content_hash, imported_at, "
+            f"{', '.join(ARTICLE_COLUMNS)}) VALUES ({', '.join('?' * (len(ARTICLE_COLUMNS) + 6))}) "
+            f"ON CONFLICT(article_id) DO UPDATE SET issue_id = excluded.issue_id, year = excluded.year, "
+            f"path = excluded.path, content_hash = excluded.content_hash, imported_at = excluded.imported_at, "
+            + ', '.join(f"{column} = excluded.{column}" for column in ARTICLE_COLUMNS),
+            [article_id, issue_id, year_of(folder, record.get('publication_date')), path, digest, time.time()]
+            + values)
+
+        self.db.execute("DELETE FROM article_authors WHERE article_id = ?", (article_id,))
+        self.db.execute("DELETE FROM keywords WHERE article_id = ?", (article_id,))
+        for position, name in enumerate(as_list(record.get('authors'))):
+            self.db.execute("INSERT OR IGNORE INTO authors (name) VALUES (?)", (name,))
+            self.db.execute(
+                "INSERT INTO article_authors (article_id, author_id, position) "
+                "SELECT ?, author_id, ? FROM authors WHERE name = ?", (article_id, position, name))
+        self.db.executemany("INSERT INTO keywords (article_id, position, keyword) VALUES (?, ?, ?)",
+                            [(article_id, position, keyword)
+                             for position, keyword in enumerate(as_list(record.get('keywords')))])
+
+    def search(self, query: str, years: Optional[Tuple[int, int]] = None, author: Optional[str] = None,
+               limit: Optional[int] = 20) -> Tuple[int, List[sqlite3.Row]]:
+        """
+        Articles matching an FTS5 query over title, abstract and full text, best match first
+        Returns the total number of matches and the first `limit` of them with a text snippet
+        """
+        where = ["articles_fts MATCH ?"]
+        params = [query]
+        if years:
+            where.append("a.year BETWEEN ? AND ?")
+            params += list(years)
+        if author:
+            where.append("a.article_id IN (SELECT aa.article_id FROM article_authors aa "
+                         "JOIN authors au USING (author_id) WHERE au.name LIKE ?)")
+            params.append(f"%{author}%")
+        condition = ' AND '.join(where)
+
+        total = self.db.execute(
+            f"SELECT COUNT(*) FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid WHERE {condition}",
+            params).fetchone()[0]
+        rows = self.db.execute(
+            "SELECT a.article_id, a.year, a.title, a.url, "
+            "(SELECT group_concat(name, ', ') FROM (SELECT au.name FROM article_authors aa "
+            " JOIN authors au USING (author_id) WHERE aa.article_id = a.article_id ORDER BY aa.position)) AS authors, "
+            "snippet(articles_fts, -1, '[', ']', '...', 12) AS snippet "
+            f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid WHERE {condition} "
+            "ORDER BY bm25(articles_fts) LIMIT ?",
+            params + [limit if limit else -1]).fetchall()
+        return total, rows
+
+    def counts(self) -> Dict[str, int]:
+        return {table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('issues', 'articles', 'authors', 'article_authors', 'keywords')}
+
+    def close(self):
+        self.db.close()
+
+
+def as_list(value) -> List[str]:
+    """authors and keywords are lists, but hand-edited records may hold a single string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value if v]
+
+
+def run_import(args):
+    if not Path(args.articles_dir).exists():
+        print(f"ERROR: {args.articles_dir} does not exist!")
+        return
+
+    print("=" * 80)
+    print("IMPORTING CORPUS INTO SQLITE")
+    print("=" * 80)
+
+    start = time.time()
+    db = CorpusDatabase(args.db)
+    try:
+        stats = db.import_corpus(args.articles_dir, prune=args.prune)
+        counts = db.counts()
+    finally:
+        db.close()
+
+    print(f"\nIssues: {stats['issues']}")
+    print(f"Articles added: {stats['added']}, updated: {stats['updated']}, "
+          f"unchanged: {stats['unchanged']}, removed: {stats['removed']}")
+    print(f"Database: {counts['articles']} articles, {counts['authors']} authors, "
+          f"{counts['keywords']} keywords in {counts['issues']} issues")
+    print(f"Time: {time.time() - start:.1f}s")
+    print(f"\nDatabase written to {args.db}")
+
+
+def run_search(args):
+    if not Path(args.db).exists():
+        print(f"ERROR: {args.db} does not exist - run 'python corpus_db.py import' first")
+        return
+
+    query = ' '.join(args.query)
+    if args.phrase:
+        query = '"' + query.replace('"', '""') + '"'
+    years = None
+    if args.year:
+        years = (args.year, args.year)
+    elif args.from_year or args.to_year:
+        years = (args.from_year or 0, args.to_year or 9999)
+
+    db = CorpusDatabase(args.db)
+    try:
+        start = time.perf_counter()
+        try:
+            total, rows = db.search(query, years, args.author, args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"ERROR: invalid search query {query!r}: {e}")
+            return
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"{total} articles match {query}" + (f" in {years[0]}-{years[1]}" if years else '')
+          + f" ({elapsed * 1000:.1f} ms)\n")
+    for row in rows:
+        print(f"[{row['year']}] {row['article_id']}: {row['title']}")
+        if row['authors']:
+            print(f"    {row['authors']}")
+        print(f"    {' '.join(row['snippet'].split())}")
+        if row['url']:
+            print(f"    {row['url']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite corpus database with full-text search")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"database file (default: {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help="import or update the corpus")
+    importer.add_argument('--articles-dir', default=DEFAULT_ARTICLES_DIR,
+                          help=f"combined corpus to import (default: {DEFAULT_ARTICLES_DIR})")
+    importer.add_argument('--prune', action='store_true',
+                          help="delete articles that are no longer in the corpus directory")
+
+    search = commands.add_parser('search', help="full-text search over title, abstract and full text")
+    search.add_argument('query', nargs='+',
+                        help='FTS5 query, e.g. digital AND divide, "public sphere", civic NEAR(engagement)')
+    search.add_argument('--phrase', action='store_true', help="search the words as one exact phrase")
+    search.add_argument('--year', type=int, help="only articles from this year")
+    search.add_argument('--from-year', type=int, help="only articles from this year on")
+    search.add_argument('--to-year', type=int, help="only articles up to this year")
+    search.add_argument('--author', help="only articles with an author name containing this")
+    search.add_argument('--limit', type=int, default=20, help="results to list (default: 20, 0 for all)")
+
+    args = parser.parse_args()
+    if args.command == 'import':
+        run_import(args)
+    else:
+        run_search(args)
+
+
+if __name__ == "__main__":
+    main()
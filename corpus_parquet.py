@@ -0,0 +1,247 @@
+"""
+Columnar copy of the combined corpus (Data/articles) as a Parquet dataset partitioned by year
+Every field gets a typed column, so a tool reads only the columns it needs: titles and abstracts
+of the whole corpus load without decoding a single full text
+
+    from corpus_parquet import load_table, load_dataframe
+    df = load_dataframe(['article_id', 'title', 'abstract'], years=[2020, 2021])
+"""
+
+import argparse
+import json
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DEFAULT_ARTICLES_DIR = 'Data/articles'
+DEFAULT_DATASET_DIR = 'Data/articles_parquet'
+BATCH_SIZE = 256  # articles per record batch written; bounds the full texts held in memory
+
+SPAN = pa.list_(pa.int32())
+SCHEMA = pa.schema([
+    ('article_id', pa.string()),
+    ('url', pa.string()),
+    ('issue', pa.string()),  # issue folder, YYYYMMDD
+    ('issue_date', pa.string()),
+    ('year', pa.int16()),
+    ('title', pa.string()),
+    ('authors', pa.list_(pa.string())),
+    ('publication_date', pa.date32()),
+    ('abstract', pa.string()),
+    ('keywords', pa.list_(pa.string())),
+    ('doi', pa.string()),
+    ('volume', pa.string()),
+    ('issue_number', pa.string()),  # the article's 'issue' field
+    ('journal', pa.string()),
+    ('article_type', pa.string()),
+    ('galley_url', pa.string()),
+    ('dublin_core', pa.map_(pa.string(), pa.list_(pa.string()))),
+    ('word_count', pa.int32()),
+    ('full_text', pa.large_string()),
+    ('full_text_structure', pa.struct([
+        ('headings', pa.list_(SPAN)), ('paragraphs', pa.list_(SPAN)),
+        ('notes', pa.list_(SPAN)), ('references', SPAN),
+    ])),
+    ('boilerplate_lines_removed', pa.int32()),
+    ('scraped_date', pa.timestamp('us')),
+    ('extra', pa.string()),  # JSON of any other fields, and of values that didn't fit their type
+])
+RENAMED = {'issue': 'issue_number'}
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive')
+
+
+def parse_date(value) -> Optional[date]:
+    """citation_publication_date is YYYY/MM/DD; OAI records may give YYYY-MM-DD"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value[:10].replace('-', '/'), '%Y/%m/%d').date()
+    except ValueError:
+        return None
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+
+
+def as_column_value(column: str, value):
+    """authors and keywords are lists, but hand-edited records may hold a single string (as may DC tags)"""
+    column_type = SCHEMA.field(column).type
+    if pa.types.is_list(column_type) and isinstance(value, str):
+        return [value]
+    if pa.types.is_map(column_type) and isinstance(value, dict):
+        return {key: [v] if isinstance(v, str) else v for key, v in value.items()}
+    return value
+
+
+def fits(column: str, value) -> bool:
+    """Whether a JSON value can be stored in its typed column"""
+    if value is None or column in ('publication_date', 'scraped_date'):
+        return True
+    if pa.types.is_list(SCHEMA.field(column).type) and isinstance(value, str):
+        # pyarrow would take the string as a sequence of characters
+        return False
+    try:
+        pa.array([value], type=SCHEMA.field(column).type)
+        return True
+    except (pa.ArrowException, TypeError, ValueError):
+        return False
+
+
+def article_row(article: Dict, issue: str, issue_info: Dict) -> Dict:
+    """One dataset row from a combined article record"""
+    article = dict(article)
+    row = {'issue': issue, 'issue_date': issue_info.get('date')}
+    extra = {}
+
+    for field in list(article):
+        column = RENAMED.get(field, field)
+        if column not in SCHEMA.names or column in ('issue', 'extra'):
+            continue
+        value = as_column_value(column, article[field])
+        if fits(column, value):
+            row[column] = value
+            del article[field]
+
+    published = parse_date(row.get('publication_date'))
+    if row.get('publication_date') is not None and published is None:
+        extra['publication_date'] = row['publication_date']
+    row['publication_date'] = published
+
+    scraped = parse_timestamp(row.get('scraped_date'))
+    if row.get('scraped_date') is not None and scraped is None:
+        extra['scraped_date'] = row['scraped_date']
+    row['scraped_date'] = scraped
+
+    if issue[:4].isdigit():
+        row['year'] = int(issue[:4])
+    elif published:
+        row['year'] = published.year
+
+    extra.update(article)
+    row['extra'] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+def iter_rows(articles_dir: Path) -> Iterator[Dict]:
+    """Rows of every article in the combined corpus, one issue folder at a time"""
+    for issue_dir in sorted(p for p in articles_dir.iterdir() if p.is_dir()):
+        issue_info = {}
+        info_file = issue_dir / 'issue_info.json'
+        if info_file.exists():
+            with open(info_file, 'r', encoding='utf-8') as f:
+                issue_info = json.load(f)
+
+        for article_file in sorted(issue_dir.glob('*.json')):
+            if article_file.name == 'issue_info.json':
+                continue
+            try:
+                with open(article_file, 'r', encoding='utf-8') as f:
+                    article = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  Skipping unreadable {article_file}: {e}")
+                continue
+            yield article_row(article, issue_dir.name, issue_info)
+
+
+def iter_batches(rows: Iterator[Dict], batch_size: int = BATCH_SIZE) -> Iterator[pa.RecordBatch]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=SCHEMA)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=SCHEMA)
+
+
+def write_dataset(articles_dir: str = DEFAULT_ARTICLES_DIR, dataset_dir: str = DEFAULT_DATASET_DIR) -> int:
+    """(Re)build the Parquet dataset from the combined corpus; returns the articles written"""
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for batch in batches:
+            written += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(iter_batches(iter_rows(Path(articles_dir)))),
+        dataset_dir,
+        schema=SCHEMA,
+        format='parquet',
+        partitioning=PARTITIONING,
+        existing_data_behavior='delete_matching',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        basename_template='articles-{i}.parquet',
+    )
+    return written
+
+
+def open_dataset(dataset_dir: str = DEFAULT_DATASET_DIR) -> ds.Dataset:
+    return ds.dataset(dataset_dir, schema=SCHEMA, format='parquet', partitioning=PARTITIONING)
+
+
+def load_table(columns: Optional[List[str]] = None, years: Optional[List[int]] = None,
+               dataset_dir: str = DEFAULT_DATASET_DIR) -> pa.Table:
+    """
+    The given columns (all if None) of the articles of the given years (all if None)
+    Only those columns are read from disk, and only the partitions of those years
+    """
+    dataset = open_dataset(dataset_dir)
+    row_filter = ds.field('year').isin(years) if years else None
+    return dataset.to_table(columns=columns, filter=row_filter)
+
+
+def load_dataframe(columns: Optional[List[str]] = None, years: Optional[List[int]] = None,
+                   dataset_dir: str = DEFAULT_DATASET_DIR):
+    """load_table as a pandas DataFrame"""
+    return load_table(columns, years, dataset_dir).to_pandas()
+
+
+def iter_articles(columns: Optional[List[str]] = None, years: Optional[List[int]] = None,
+                  dataset_dir: str = DEFAULT_DATASET_DIR) -> Iterator[Dict]:
+    """Articles as dicts of the given columns, read a record batch at a time"""
+    dataset = open_dataset(dataset_dir)
+    row_filter = ds.field('year').isin(years) if years else None
+    for batch in dataset.to_batches(columns=columns, filter=row_filter):
+        yield from batch.to_pylist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Parquet copy of the combined corpus")
+    parser.add_argument('--articles-dir', default=DEFAULT_ARTICLES_DIR,
+                        help=f"combined corpus to convert (default: {DEFAULT_ARTICLES_DIR})")
+    parser.add_argument('--output', default=DEFAULT_DATASET_DIR,
+                        help=f"dataset directory, partitioned by year (default: {DEFAULT_DATASET_DIR})")
+    args = parser.parse_args()
+
+    if not Path(args.articles_dir).exists():
+        print(f"ERROR: {args.articles_dir} does not exist!")
+        return
+
+    print("=" * 80)
+    print("BUILDING PARQUET CORPUS")
+    print("=" * 80)
+
+    start = time.time()
+    written = write_dataset(args.articles_dir, args.output)
+    elapsed = time.time() - start
+
+    files = list(Path(args.output).rglob('*.parquet'))
+    size = sum(f.stat().st_size for f in files)
+    print(f"\nArticles written: {written}")
+    print(f"Partitions: {len({f.parent for f in files})} years, {len(files)} files, {size / 2 ** 20:.1f} MB")
+    print(f"Time: {elapsed:.1f}s")
+    print(f"\nDataset written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Dry-run crawl planner for First Monday
+Forecasts the requests, bytes and wall-clock time a scrape_all.py run still needs,
+from the cached archive index and the crawl frontier, without sending any requests;
+the frontier and response cache are opened read-only
+"""
+
+import argparse
+import json
+import os
+import re
+from statistics import mean
+from typing import Dict, List, Optional
+
+import config
+from frontier import CrawlFrontier
+from http_cache import ResponseCache
+
+# Used until the response cache has pages of a type to measure (bytes on the wire)
+DEFAULT_PAGE_BYTES = {
+    'archive': 60_000,
+    'issue': 50_000,
+    'landing': 40_000,
+    'galley': 20_000,
+    'document': 90_000,
+}
+DEFAULT_ARTICLES_PER_ISSUE = 10
+
+PAGE_TYPES = [
+    ('archive', re.compile(r'/issue/archive(/\d+)?$')),
+    ('issue', re.compile(r'/issue/view/\d+$')),
+    ('landing', re.compile(r'/article/view/\d+$')),
+    ('galley', re.compile(r'/article/view/\d+/\d+$')),
+    ('document', re.compile(r'/article/download/\d+/\d+$')),
+]
+
+
+class Scenario:
+    """Settings a crawl could run with"""
+
+    def __init__(self, name: str, mode: str, concurrency: int, initial_rate: float, max_rate: float,
+                 workers: int = 1):
+        self.name = name
+        self.mode = mode
+        self.concurrency = concurrency
+        self.initial_rate = initial_rate
+        self.max_rate = max_rate
+        self.workers = workers
+
+
+def page_type(url: str) -> Optional[str]:
+    for name, pattern in PAGE_TYPES:
+        if pattern.search(url):
+            return name
+    return None
+
+
+class CrawlPlanner:
+    """Counts the work left in a crawl and turns it into estimates"""
+
+    def __init__(self, index_file: Optional[str] = None):
+        self.index_file = index_file or config.ARCHIVE_INDEX_FILE
+        self.index = self.load_index()
+
+    def load_index(self) -> Optional[Dict]:
+        if not os.path.exists(self.index_file):
+            return None
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_progress(self):
+        """
+        (done issue ids, article states per issue id) from the frontier, or from a legacy
+        checkpoint.json; opened read-only, so planning never migrates or creates anything
+        """
+        if os.path.exists(config.FRONTIER_DB):
+            frontier = CrawlFrontier(read_only=True)
+            try:
+                done = {row['item_id'] for row in frontier.items('issue', 'done')}
+                return done, frontier.child_counts('article')
+            finally:
+                frontier.close()
+
+        if os.path.exists(config.CHECKPOINT_FILE):
+            with open(config.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+                return set(json.load(f).get('processed_issues', [])), {}
+
+        return set(), {}
+
+    def remaining_work(self) -> Dict:
+        """Issues, articles and requests still to do, by page type"""
+        issues = self.index['issues']
+        done_issues, article_states = self.load_progress()
+
+        # Articles per issue, learned from issues whose articles were queued
+        known_sizes = [sum(states.values()) for states in article_states.values()]
+        per_issue = mean(known_sizes) if known_sizes else DEFAULT_ARTICLES_PER_ISSUE
+
+        remaining_issues = 0
+        remaining_articles = 0.0
+        estimated_articles = 0.0
+        for issue in issues:
+            states = article_states.get(issue['issue_id'], {})
+            if issue['issue_id'] in done_issues:
+                # Only queued retries are left of a finished issue
+                remaining_articles += states.get('retry', 0)
+                continue
+            remaining_issues += 1
+            if states:
+                remaining_articles += sum(n for state, n in states.items() if state != 'done')
+            else:
+                estimated_articles += per_issue
+
+        articles = remaining_articles + estimated_articles
+        requests = {
+            # Plus the empty page that ended discovery, on sites without OJS pagination links
+            # (indexes written before the flag existed always ended that way)
+            'archive': self.index.get('pages', 0) + (1 if self.index.get('ended_on_empty_page', True) else 0),
+            'issue': remaining_issues,
+            'landing': articles,
+            # A resolved download URL skips the galley page; otherwise galley page, then its iframe
+            'galley': 0 if config.RESOLVE_DOWNLOAD_URLS else articles,
+            'document': articles,
+        }
+
+        return {
+            'issues_total': len(issues),
+            'issues_remaining': remaining_issues,
+            'articles_known': round(remaining_articles),
+            'articles_estimated': round(estimated_articles),
+            'articles_per_issue': per_issue,
+            'requests': requests,
+        }
+
+    def page_sizes(self) -> Dict[str, float]:
+        """Mean transfer size per page type, measured from the response cache"""
+        measured: Dict[str, List[int]] = {}
+        if config.HTTP_CACHE_ENABLED and os.path.exists(os.path.join(config.HTTP_CACHE_DIR, 'index.db')):
+            cache = ResponseCache(read_only=True)
+            try:
+                for url, size in cache.transfer_sizes():
+                    kind = page_type(url)
+                    if kind:
+                        measured.setdefault(kind, []).append(size)
+            finally:
+                cache.close()
+
+        return {kind: mean(measured[kind]) if measured.get(kind) else default
+                for kind, default in DEFAULT_PAGE_BYTES.items()}
+
+    def estimate_seconds(self, requests: float, scenario: Scenario, latency: float) -> float:
+        """
+        Wall time for a number of requests, following the limiter's additive increase from the
+        initial rate (healthy responses assumed) and capped by how many requests can be in flight
+        """
+        per_worker = requests / scenario.workers
+        in_flight = scenario.concurrency if scenario.mode == 'async' else 1
+        rate = min(scenario.initial_rate, scenario.max_rate)
+        seconds = 0.0
+        left = per_worker
+
+        while left > 0:
+            batch = min(left, config.RATE_LIMIT_WINDOW)
+            seconds += batch * max(1 / rate, latency / in_flight)
+            left -= batch
+            rate = min(scenario.max_rate, rate + config.RATE_LIMIT_INCREASE)
+
+        return seconds
+
+    def scenarios(self, rate: Optional[float] = None, concurrency: Optional[int] = None,
+                  workers: Optional[int] = None) -> List[Scenario]:
+        """The configured settings, common alternatives and any settings given on the command line"""
+        base = Scenario('configured', config.FETCH_MODE, config.MAX_CONCURRENCY_PER_HOST,
+                        config.RATE_LIMIT_INITIAL, config.RATE_LIMIT_MAX)
+        scenarios = [
+            base,
+            Scenario('sync mode', 'sync', 1, base.initial_rate, base.max_rate),
+            Scenario(f'concurrency {base.concurrency * 2}', 'async', base.concurrency * 2,
+                     base.initial_rate, base.max_rate),
+            Scenario(f'max rate {base.max_rate * 2:g} req/s', base.mode, base.concurrency,
+                     base.initial_rate, base.max_rate * 2),
+            Scenario(f'4 workers at {config.WORKER_RATE_LIMIT:g} req/s', base.mode, base.concurrency,
+                     min(base.initial_rate, config.WORKER_RATE_LIMIT), config.WORKER_RATE_LIMIT, workers=4),
+        ]
+
+        if rate or concurrency or workers:
+            max_rate = rate or base.max_rate
+            scenarios.append(Scenario(
+                'custom', 'async', concurrency or base.concurrency,
+                min(base.initial_rate, max_rate), max_rate, workers=workers or 1))
+        return scenarios
+
+
+def format_bytes(n: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {secs:02d}s"
+
+
+def print_plan(rate: Optional[float] = None, concurrency: Optional[int] = None,
+               workers: Optional[int] = None, latency: Optional[float] = None) -> bool:
+    """Print the crawl forecast; False if there is no archive index to plan from"""
+    latency = latency or config.PLAN_MEAN_LATENCY
+    planner = CrawlPlanner()
+
+    print("=" * 80)
+    print("FIRST MONDAY CRAWL PLAN (dry run - no requests are sent)")
+    print("=" * 80)
+
+    if planner.index is None:
+        print(f"\nNo archive index at {planner.index_file}.")
+        print("It is written by every scrape that walks the whole archive;")
+        print("run `python crawl_planner.py --refresh-index` to fetch only the archive pages.")
+        return False
+
+    work = planner.remaining_work()
+    requests = work['requests']
+    total_requests = sum(requests.values())
+    sizes = planner.page_sizes()
+    total_bytes = sum(requests[kind] * sizes[kind] for kind in requests)
+
+    print(f"\nArchive index: {work['issues_total']} issues (fetched {planner.index.get('fetched', 'unknown')})")
+    print(f"\nRemaining work:")
+    print(f"  Issues: {work['issues_remaining']} of {work['issues_total']}")
+    print(f"  Articles: {work['articles_known'] + work['articles_estimated']}"
+          f" ({work['articles_known']} known, {work['articles_estimated']} estimated at "
+          f"{work['articles_per_issue']:.1f} per issue)")
+    print(f"  Requests: {round(total_requests)}")
+    for kind, count in requests.items():
+        print(f"    {kind:<9} {round(count):>7}  x {format_bytes(sizes[kind])}")
+    print(f"  Expected transfer: {format_bytes(total_bytes)}")
+
+    print(f"\nWall-clock estimates (mean latency {latency:.2f}s, no throttling):")
+    print(f"  {'Scenario':<28} {'Mode':<6} {'Conc.':>5} {'Rate (req/s)':>14} {'Workers':>8} {'Time':>10}")
+    for scenario in planner.scenarios(rate, concurrency, workers):
+        seconds = planner.estimate_seconds(total_requests, scenario, latency)
+        rates = f"{scenario.initial_rate:.2g}-{scenario.max_rate:g}"
+        print(f"  {scenario.name:<28} {scenario.mode:<6} {scenario.concurrency:>5} {rates:>14} "
+              f"{scenario.workers:>8} {format_duration(seconds):>10}")
+
+    print("\nThrottling (429/503) or slow responses make the limiter back off; treat these as lower bounds.")
+    return True
+
+
+def refresh_index():
+    """Walk the archive pages only, which rewrites the cached index"""
+    from scraper_by_issue import IssueBasedScraper
+
+    scraper = IssueBasedScraper()
+    try:
+        issues = scraper.get_all_issues()
+    finally:
+        scraper.close()
+    print(f"Archive index refreshed: {len(issues)} issues\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast the remaining First Monday crawl without fetching it")
+    parser.add_argument('--rate', type=float, help="add a scenario with this max rate (req/s per host)")
+    parser.add_argument('--concurrency', type=int, help="add a scenario with this many requests in flight")
+    parser.add_argument('--workers', type=int, help="add a scenario with this many distributed workers")
+    parser.add_argument('--latency', type=float, help=f"mean response time in seconds "
+                                                      f"(default: {config.PLAN_MEAN_LATENCY})")
+    parser.add_argument('--refresh-index', action='store_true',
+                        help="fetch the archive pages first (the only requests the planner makes)")
+    args = parser.parse_args()
+
+    if args.refresh_index:
+        refresh_index()
+    print_plan(args.rate, args.concurrency, args.workers, args.latency)
+
+
+if __name__ == "__main__":
+    main()
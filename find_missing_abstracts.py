@@ -4,15 +4,25 @@ Search for missing abstracts from alternative sources
 
 import json
 import requests
-import time
 from pathlib import Path
 from bs4 import BeautifulSoup
+from head_fetch import StreamingFetcher
+from html_parsers import lxml_text
+from http_cache import get_response_cache
 import config
 
+
+def abstract_div_end(element) -> bool:
+    """Stop condition: the first div.abstract (the one soup.find('div', class_='abstract') returns) is parsed"""
+    if element.tag != 'div' or 'abstract' not in (element.get('class') or '').split():
+        return False
+    return not any('abstract' in (a.get('class') or '').split() for a in element.iterancestors('div'))
+
 class AlternativeAbstractFinder:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': config.USER_AGENT})
+        self.fetcher = StreamingFetcher(self.session, cache=get_response_cache())
         self.stats = {
             'checked': 0,
             'found_page_text': 0,
@@ -21,37 +31,28 @@ class AlternativeAbstractFinder:
             'errors': 0
         }
 
-    def make_request(self, url: str, max_retries: int = 3):
-        """Make HTTP request with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                time.sleep(config.REQUEST_DELAY)
-                return response
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2
-                    print(f"  Retry {attempt + 1}/{max_retries} after {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"  ERROR: Failed after {max_retries} attempts: {e}")
-                    return None
-
     def extract_abstract_from_page_content(self, url: str):
         """
         Try to extract abstract from the full article page
         Look for abstract in the article body, not just metadata
         """
-        response = self.make_request(url)
-        if not response:
+        # Stop downloading once the first div.abstract is parsed; the other methods need the whole page
+        page = self.fetcher.fetch(url, stop=abstract_div_end)
+        if not page:
+            print(f"  ERROR: Could not fetch {url}")
             return None
 
-        soup = BeautifulSoup(response.content, 'lxml')
-        abstract = None
-
         # Method 1: Look for abstract section in article body
         # First Monday sometimes has abstracts in the article text itself
+        if not page.complete:
+            abstract = lxml_text(next(e for e in page.root.iter('div') if abstract_div_end(e)))
+            print(f"  Found in div.abstract: {len(abstract)} chars")
+            return abstract
+
+        soup = BeautifulSoup(page.content, 'lxml')
+        abstract = None
+
+        # A cached page is parsed whole, so method 1 may still find something
         abstract_section = soup.find('div', class_='abstract')
         if abstract_section:
             abstract = abstract_section.get_text(strip=True)
@@ -216,6 +217,7 @@ class AlternativeAbstractFinder:
         print(f"Found via CrossRef: {self.stats['found_doi']}")
         print(f"Still empty: {self.stats['still_empty']}")
         print(f"Errors: {self.stats['errors']}")
+        print(f"Downloads: {self.fetcher.describe()}")
         print(f"Total found: {self.stats['found_page_text'] + self.stats['found_doi']}")
         if self.stats['checked'] > 0:
             success_rate = ((self.stats['found_page_text'] + self.stats['found_doi']) / self.stats['checked']) * 100
@@ -0,0 +1,426 @@
+"""
+Persistent crawl frontier for the First Monday scrapers
+One SQLite (WAL) row per URL with its state, priority, attempt count and last error;
+replaces the processed_issues / processed_articles lists of checkpoint.json.
+Rows can also be leased by distributed workers; an expired lease puts the row back in play.
+Failed articles wait in a retry state until their not_before time
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import config
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+RETRY = 'retry'
+
+# Columns added after the first release, with their types
+ADDED_COLUMNS = {'worker_id': 'TEXT', 'lease_expires': 'REAL', 'not_before': 'REAL'}
+
+
+class CrawlFrontier:
+    """Work queue of issue and article URLs that scrapers claim and complete"""
+
+    def __init__(self, db_path: Optional[str] = None, read_only: bool = False):
+        self.db_path = db_path or config.FRONTIER_DB
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if read_only:
+            # For reports on an existing frontier: no directory, schema or migration changes
+            self.db = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True,
+                                      timeout=30, check_same_thread=False)
+            self.db.row_factory = sqlite3.Row
+            return
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                item_id TEXT,
+                parent TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                payload TEXT,
+                worker_id TEXT,
+                lease_expires REAL,
+                not_before REAL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS frontier_item ON frontier (kind, item_id);
+            CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (kind, state, priority);
+            CREATE INDEX IF NOT EXISTS frontier_parent ON frontier (parent);
+        """)
+        # Frontiers created by older versions
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(frontier)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE frontier ADD COLUMN {column} {column_type}")
+        self.db.commit()
+
+    def add(self, url: str, kind: str, item_id: Optional[str] = None, parent: Optional[str] = None,
+            priority: int = 0, payload: Optional[Dict] = None):
+        """Add a URL as pending; known URLs keep their state"""
+        self.add_many([(url, kind, item_id, parent, priority, payload)])
+
+    def add_many(self, rows: Iterable[Tuple]):
+        """Add (url, kind, item_id, parent, priority, payload) rows in one transaction"""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO frontier (url, kind, item_id, parent, priority, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "item_id = COALESCE(excluded.item_id, item_id), "
+                "parent = COALESCE(excluded.parent, parent), "
+                "payload = COALESCE(excluded.payload, payload)",
+                [(url, kind, item_id, parent, priority, json.dumps(payload) if payload is not None else None, now)
+                 for url, kind, item_id, parent, priority, payload in rows])
+            self.db.commit()
+
+    def claim(self, url: str, worker_id: Optional[str] = None, lease_seconds: Optional[float] = None,
+              ignore_backoff: bool = False) -> bool:
+        """
+        Move a URL to in_flight; False if it is already done, being worked on, or waiting out its
+        retry back-off (unless ignore_backoff)
+        With a worker_id the claim is leased to that worker, so recover() in other workers leaves it alone
+        """
+        now = time.time()
+        claimable = "url = ? AND state IN (?, ?, ?) AND (state != ? OR not_before IS NULL OR not_before <= ?)"
+        params = (url, PENDING, FAILED, RETRY, RETRY, float('inf') if ignore_backoff else now)
+        with self.lock:
+            if worker_id is None:
+                cursor = self.db.execute(
+                    f"UPDATE frontier SET state = ?, attempts = attempts + 1, updated_at = ? WHERE {claimable}",
+                    (IN_FLIGHT, now) + params)
+            else:
+                cursor = self.db.execute(
+                    "UPDATE frontier SET state = ?, attempts = attempts + 1, worker_id = ?, lease_expires = ?, "
+                    f"updated_at = ? WHERE {claimable}",
+                    (IN_FLIGHT, worker_id, now + (lease_seconds or config.LEASE_SECONDS), now) + params)
+            self.db.commit()
+            return cursor.rowcount == 1
+
+    def claim_next(self, kind: str) -> Optional[Dict]:
+        """Claim the highest-priority pending URL of a kind"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            row = self.db.execute(
+                "SELECT * FROM frontier WHERE kind = ? AND state = ? ORDER BY priority DESC, rowid LIMIT 1",
+                (kind, PENDING)).fetchone()
+            if row:
+                self.db.execute(
+                    "UPDATE frontier SET state = ?, attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                    (IN_FLIGHT, time.time(), row['url']))
+            self.db.commit()
+        return self.row_to_dict(row) if row else None
+
+    def lease_next(self, kind: str, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Lease the highest-priority pending URL of a kind to a worker
+        In-flight rows whose lease has expired (their worker died) are leased again
+        """
+        lease_seconds = lease_seconds or config.LEASE_SECONDS
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            row = self.db.execute(
+                "SELECT * FROM frontier WHERE kind = ? "
+                "AND (state = ? OR (state = ? AND lease_expires < ?)) "
+                "ORDER BY priority DESC, rowid LIMIT 1",
+                (kind, PENDING, IN_FLIGHT, now)).fetchone()
+            if row:
+                self.db.execute(
+                    "UPDATE frontier SET state = ?, attempts = attempts + 1, worker_id = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE url = ?",
+                    (IN_FLIGHT, worker_id, now + lease_seconds, now, row['url']))
+            self.db.commit()
+
+        if row and row['state'] == IN_FLIGHT:
+            self.logger.info(f"Took over expired lease of {row['worker_id']} on {row['url']}")
+        return self.row_to_dict(row) if row else None
+
+    def renew(self, url: str, worker_id: str, lease_seconds: Optional[float] = None) -> bool:
+        """
+        Extend a lease, and the worker's leases on the URL's children (an issue's articles);
+        False if the worker no longer holds it
+        """
+        expires = time.time() + (lease_seconds or config.LEASE_SECONDS)
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE frontier SET lease_expires = ? WHERE url = ? AND worker_id = ? AND state = ?",
+                (expires, url, worker_id, IN_FLIGHT))
+            if cursor.rowcount == 1:
+                self.db.execute(
+                    "UPDATE frontier SET lease_expires = ? WHERE worker_id = ? AND state = ? "
+                    "AND parent = (SELECT item_id FROM frontier WHERE url = ?)",
+                    (expires, worker_id, IN_FLIGHT, url))
+            self.db.commit()
+            return cursor.rowcount == 1
+
+    def renew_many(self, urls: List[str], worker_id: str, lease_seconds: Optional[float] = None) -> int:
+        """Extend the worker's leases on several URLs; returns how many it still holds"""
+        expires = time.time() + (lease_seconds or config.LEASE_SECONDS)
+        with self.lock:
+            renewed = 0
+            for url in urls:
+                renewed += self.db.execute(
+                    "UPDATE frontier SET lease_expires = ? WHERE url = ? AND worker_id = ? AND state = ?",
+                    (expires, url, worker_id, IN_FLIGHT)).rowcount
+            self.db.commit()
+        return renewed
+
+    def next_lease_expiry(self, kind: str) -> Optional[float]:
+        """Earliest expiry among live leases of a kind, or None if nothing is leased"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT MIN(lease_expires) FROM frontier WHERE kind = ? AND state = ? AND lease_expires IS NOT NULL",
+                (kind, IN_FLIGHT)).fetchone()[0]
+
+    def complete(self, url: str):
+        self.set_state([url], DONE)
+
+    def complete_many(self, urls: List[str]):
+        self.set_state(urls, DONE)
+
+    def fail(self, url: str, error: str):
+        self.set_state([url], FAILED, error)
+
+    def defer(self, url: str, error: str, max_attempts: Optional[int] = None) -> Optional[float]:
+        """
+        Put a failed URL in the retry queue with an exponential not_before time
+        Returns the retry delay, or None once max_attempts is used up and the URL is failed for good
+        """
+        max_attempts = max_attempts or config.RETRY_MAX_ATTEMPTS
+        with self.lock:
+            row = self.db.execute("SELECT attempts FROM frontier WHERE url = ?", (url,)).fetchone()
+            attempts = row['attempts'] if row else 0
+            now = time.time()
+            if attempts >= max_attempts:
+                delay = None
+                self.db.execute(
+                    "UPDATE frontier SET state = ?, last_error = ?, not_before = NULL, lease_expires = NULL, "
+                    "updated_at = ? WHERE url = ?", (FAILED, error, now, url))
+            else:
+                delay = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+                self.db.execute(
+                    "UPDATE frontier SET state = ?, last_error = ?, not_before = ?, lease_expires = NULL, "
+                    "updated_at = ? WHERE url = ?", (RETRY, error, now + delay, now, url))
+            self.db.commit()
+        return delay
+
+    def due(self, kind: str, limit: Optional[int] = None) -> List[Dict]:
+        """Retry-queue URLs whose not_before time has passed, oldest first"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT * FROM frontier WHERE kind = ? AND state = ? AND not_before <= ? "
+                "ORDER BY not_before LIMIT ?",
+                (kind, RETRY, time.time(), limit if limit is not None else -1)).fetchall()
+        return [self.row_to_dict(row) for row in rows]
+
+    def next_retry_time(self, kind: str) -> Optional[float]:
+        """Earliest not_before in the retry queue, or None if it is empty"""
+        with self.lock:
+            return self.db.execute("SELECT MIN(not_before) FROM frontier WHERE kind = ? AND state = ?",
+                                   (kind, RETRY)).fetchone()[0]
+
+    def release(self, url: str):
+        """Return an in_flight URL to the queue without counting it as failed"""
+        self.set_state([url], PENDING)
+
+    def set_state(self, urls: List[str], state: str, error: Optional[str] = None):
+        now = time.time()
+        with self.lock:
+            if error is None:
+                self.db.executemany(
+                    "UPDATE frontier SET state = ?, lease_expires = NULL, updated_at = ? WHERE url = ?",
+                    [(state, now, url) for url in urls])
+            else:
+                self.db.executemany(
+                    "UPDATE frontier SET state = ?, last_error = ?, lease_expires = NULL, updated_at = ? "
+                    "WHERE url = ?",
+                    [(state, error, now, url) for url in urls])
+            self.db.commit()
+
+    def recover(self) -> int:
+        """
+        Requeue URLs left in_flight by a run that was killed
+        Live worker leases are left alone, and so are the children of an issue another worker holds
+        """
+        now = time.time()
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE frontier SET state = ? WHERE state = ? AND (lease_expires IS NULL OR lease_expires < ?) "
+                "AND NOT EXISTS (SELECT 1 FROM frontier AS issue WHERE issue.kind = 'issue' "
+                "AND issue.item_id = frontier.parent AND issue.state = ? AND issue.lease_expires >= ?)",
+                (PENDING, IN_FLIGHT, now, IN_FLIGHT, now))
+            self.db.commit()
+        if cursor.rowcount:
+            self.logger.info(f"Requeued {cursor.rowcount} URLs left in flight by a previous run")
+        return cursor.rowcount
+
+    def requeue_children(self, parent: str) -> int:
+        """Requeue in_flight URLs under a parent whose lease was taken over from a dead worker"""
+        with self.lock:
+            cursor = self.db.execute("UPDATE frontier SET state = ?, updated_at = ? WHERE parent = ? AND state = ?",
+                                     (PENDING, time.time(), parent, IN_FLIGHT))
+            self.db.commit()
+            return cursor.rowcount
+
+    def get_item(self, kind: str, item_id: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM frontier WHERE kind = ? AND item_id = ? LIMIT 1",
+                                  (kind, item_id)).fetchone()
+        return self.row_to_dict(row) if row else None
+
+    def is_done(self, kind: str, item_id: str) -> bool:
+        with self.lock:
+            row = self.db.execute("SELECT 1 FROM frontier WHERE kind = ? AND item_id = ? AND state = ? LIMIT 1",
+                                  (kind, item_id, DONE)).fetchone()
+        return row is not None
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM frontier WHERE url = ?", (url,)).fetchone()
+        return self.row_to_dict(row) if row else None
+
+    def items(self, kind: str, state: str) -> List[Dict]:
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM frontier WHERE kind = ? AND state = ? ORDER BY rowid",
+                                   (kind, state)).fetchall()
+        return [self.row_to_dict(row) for row in rows]
+
+    def children(self, parent: str, kind: Optional[str] = None) -> List[Dict]:
+        """URLs under one parent (e.g. the known articles of an issue), in the order they were added"""
+        with self.lock:
+            if kind is None:
+                rows = self.db.execute("SELECT * FROM frontier WHERE parent = ? ORDER BY rowid", (parent,)).fetchall()
+            else:
+                rows = self.db.execute("SELECT * FROM frontier WHERE parent = ? AND kind = ? ORDER BY rowid",
+                                       (parent, kind)).fetchall()
+        return [self.row_to_dict(row) for row in rows]
+
+    def count(self, kind: str, state: Optional[str] = None) -> int:
+        with self.lock:
+            if state is None:
+                return self.db.execute("SELECT COUNT(*) FROM frontier WHERE kind = ?", (kind,)).fetchone()[0]
+            return self.db.execute("SELECT COUNT(*) FROM frontier WHERE kind = ? AND state = ?",
+                                   (kind, state)).fetchone()[0]
+
+    def count_children(self, parent: str, state: str) -> int:
+        """Number of URLs in a state under one parent (e.g. saved articles of an issue)"""
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM frontier WHERE parent = ? AND state = ?",
+                                   (parent, state)).fetchone()[0]
+
+    def child_counts(self, kind: str) -> Dict[str, Dict[str, int]]:
+        """{parent: {state: n}} over the URLs of a kind (e.g. article states per issue)"""
+        with self.lock:
+            rows = self.db.execute("SELECT parent, state, COUNT(*) FROM frontier WHERE kind = ? GROUP BY parent, state",
+                                   (kind,)).fetchall()
+        counts = {}
+        for parent, state, n in rows:
+            counts.setdefault(parent, {})[state] = n
+        return counts
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {state: n}} for status reports"""
+        with self.lock:
+            rows = self.db.execute("SELECT kind, state, COUNT(*) FROM frontier GROUP BY kind, state").fetchall()
+        counts = {}
+        for kind, state, n in rows:
+            counts.setdefault(kind, {})[state] = n
+        return counts
+
+    def recent_errors(self, limit: int = 5) -> List[Dict]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT * FROM frontier WHERE state = ? ORDER BY updated_at DESC LIMIT ?",
+                (FAILED, limit)).fetchall()
+        return [self.row_to_dict(row) for row in rows]
+
+    def row_to_dict(self, row) -> Dict:
+        data = dict(row)
+        data['payload'] = json.loads(data['payload']) if data['payload'] else None
+        return data
+
+    def migrate_checkpoint(self, checkpoint_file: Optional[str] = None) -> bool:
+        """Import an old checkpoint.json into an empty frontier, then move it aside"""
+        checkpoint_file = checkpoint_file or config.CHECKPOINT_FILE
+        if not os.path.exists(checkpoint_file):
+            return False
+        with self.lock:
+            if self.db.execute("SELECT 1 FROM frontier LIMIT 1").fetchone():
+                return False
+
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Could not migrate checkpoint: {e}")
+            return False
+
+        issue_base = f"{config.BASE_URL}/ojs/index.php/fm/issue/view"
+        rows = [(f"{issue_base}/{issue_id}", 'issue', str(issue_id), None, 0, None)
+                for issue_id in checkpoint.get('processed_issues', [])]
+        rows += [(url, 'article', url.rstrip('/').split('/')[-1], None, 0, None)
+                 for url in checkpoint.get('processed_articles', [])]
+        self.add_many(rows)
+        self.complete_many([row[0] for row in rows])
+
+        os.replace(checkpoint_file, checkpoint_file + '.migrated')
+        self.logger.info(f"Migrated {len(rows)} entries from {checkpoint_file} into the crawl frontier")
+        return True
+
+    def close(self):
+        self.db.close()
+
+
+class LeaseKeeper:
+    """
+    Background thread that keeps renewing a worker's lease while it works on a URL
+    (and the URL's children), or on a list of URLs until none of them is in flight any more
+    """
+
+    def __init__(self, frontier: CrawlFrontier, url: Union[str, List[str]], worker_id: str,
+                 lease_seconds: Optional[float] = None):
+        self.frontier = frontier
+        self.url = url
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds or config.LEASE_SECONDS
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.logger = logging.getLogger(__name__)
+
+    def run(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            if not isinstance(self.url, str):
+                if not self.frontier.renew_many(self.url, self.worker_id, self.lease_seconds):
+                    return
+            elif not self.frontier.renew(self.url, self.worker_id, self.lease_seconds):
+                self.logger.warning(f"Lost lease on {self.url}; another worker may take it over")
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,160 @@
+"""
+Streaming fetch that stops downloading once the part of a page a job needs has been parsed
+Bytes are fed to an incremental lxml parser as they arrive; with stop=head_end the connection is
+closed at </head>, which is all metadata-only passes need
+"""
+
+import logging
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+from bs4.dammit import EncodingDetector
+
+import config
+from async_fetcher import FetchResult
+from rate_limiter import get_rate_limiter
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([-\w.:]+)', re.I)
+
+logger = logging.getLogger(__name__)
+
+
+def head_end(element) -> bool:
+    """Stop condition: everything in <head> has been parsed"""
+    return element.tag == 'head'
+
+
+class PartialPage:
+    """The bytes read and the tree parsed before a streaming fetch stopped"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, content: bytes, root, complete: bool):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.root = root
+        self.complete = complete  # False if the download was cut short by the stop condition
+
+    def meta(self) -> Dict[str, List[str]]:
+        """content of every named <meta> parsed so far, by name ('' where it has none)"""
+        meta = {}
+        for tag in self.root.iter('meta'):
+            name = tag.get('name')
+            if name is not None:
+                meta.setdefault(name, []).append(tag.get('content', ''))
+        return meta
+
+    def as_fetch_result(self) -> FetchResult:
+        return FetchResult(url=self.url, status_code=self.status_code, headers=self.headers, content=self.content)
+
+
+class StreamingFetcher:
+    """
+    Rate-limited GETs that read the body incrementally and can stop early
+    Only complete pages go into the response cache, and a cached page is used whole
+    """
+
+    def __init__(self, session: requests.Session, cache=None, chunk_size: Optional[int] = None):
+        self.session = session
+        self.cache = cache
+        self.chunk_size = chunk_size or config.HEAD_FETCH_CHUNK_SIZE
+        self.stats = {'pages': 0, 'requests': 0, 'cached': 0, 'stopped_early': 0, 'bytes_read': 0, 'bytes_full': 0}
+
+    def fetch(self, url: str, stop: Optional[Callable] = None, max_retries: int = 3) -> Optional[PartialPage]:
+        """
+        Fetch a page, reading only until stop(element) is true for an element that has just been
+        closed (all of it if stop is None or never true); None if every attempt failed
+        """
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached:
+                self.stats['cached'] += 1
+                return self.parse_cached(cached)
+
+        limiter = get_rate_limiter(url)
+        for attempt in range(max_retries):
+            try:
+                limiter.acquire()
+                self.stats['requests'] += 1
+                start = time.monotonic()
+                with self.session.get(url, timeout=config.REQUEST_TIMEOUT, stream=True) as response:
+                    limiter.record_response(response.status_code, time.monotonic() - start,
+                                            response.headers.get('Retry-After'))
+                    response.raise_for_status()
+                    page = self.read(url, response, stop)
+
+                if page.complete and self.cache:
+                    self.cache.put(url, page.as_fetch_result())
+                return page
+            except Exception as e:
+                if not isinstance(e, requests.exceptions.HTTPError):
+                    limiter.record_error()
+                if attempt < max_retries - 1:
+                    time.sleep(limiter.backoff_delay(attempt))
+                else:
+                    logger.warning(f"Failed to fetch {url} after {max_retries} attempts: {e}")
+                    return None
+
+    def read(self, url: str, response: requests.Response, stop: Optional[Callable]) -> PartialPage:
+        """Feed the body to the parser chunk by chunk; leaving the caller's with-block closes the connection"""
+        from lxml import etree
+
+        parser = None
+        chunks = []
+        stopped = False
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            chunks.append(chunk)
+            if parser is None:
+                parser = etree.HTMLPullParser(events=('end',), encoding=self.encoding(response, chunk))
+            parser.feed(chunk)
+            if stop and any(stop(element) for _, element in parser.read_events()):
+                stopped = True
+                break
+
+        content = b''.join(chunks)
+        root = parser.close() if parser is not None else None
+        if root is None:
+            root = etree.fromstring(b'<html></html>', etree.HTMLParser())
+
+        length = response.headers.get('Content-Length', '')
+        self.stats['pages'] += 1
+        self.stats['stopped_early'] += stopped
+        # Bytes off the wire (before decompression) where urllib3 can tell us
+        wire_bytes = response.raw.tell() if hasattr(response.raw, 'tell') else len(content)
+        self.stats['bytes_read'] += wire_bytes
+        self.stats['bytes_full'] += int(length) if length.isdigit() else wire_bytes
+
+        return PartialPage(url, response.status_code, dict(response.headers), content, root, complete=not stopped)
+
+    def encoding(self, response: requests.Response, first_chunk: bytes) -> str:
+        """
+        Charset from the Content-Type header, else one declared at the top of the page, else UTF-8
+        (left to itself, libxml2's push parser would read undeclared UTF-8 as Latin-1)
+        """
+        match = HEADER_CHARSET.search(response.headers.get('Content-Type', ''))
+        if match:
+            return match.group(1)
+        return EncodingDetector.find_declared_encoding(first_chunk, is_html=True) or 'utf-8'
+
+    def parse_cached(self, cached: FetchResult) -> PartialPage:
+        from lxml import etree
+
+        from html_parsers import detect_encoding
+
+        content, encoding = detect_encoding(cached.content)
+        try:
+            root = etree.fromstring(content, etree.HTMLParser(encoding=encoding))
+        except etree.XMLSyntaxError:
+            root = None
+        if root is None:
+            root = etree.fromstring(b'<html></html>', etree.HTMLParser())
+        return PartialPage(cached.url, cached.status_code, dict(cached.headers), cached.content, root, complete=True)
+
+    def describe(self) -> str:
+        s = self.stats
+        saved = 1 - s['bytes_read'] / s['bytes_full'] if s['bytes_full'] else 0.0
+        return (f"{s['pages']} pages fetched in {s['requests']} requests ({s['cached']} more from cache), "
+                f"{s['stopped_early']} stopped early; "
+                f"{s['bytes_read'] / 1024:.0f} KB read of {s['bytes_full'] / 1024:.0f} KB ({saved:.0%} saved)")
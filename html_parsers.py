@@ -0,0 +1,409 @@
+"""
+HTML parser backends for the article extraction steps
+The lxml and selectolax backends run the scraper's selectors directly on C trees; the
+BeautifulSoup backend is the reference behaviour and the fallback when the others can't be used
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+
+import config
+
+# Removed before the full text is extracted
+DOCUMENT_SKIP_TAGS = ['script', 'style', 'nav', 'header', 'footer']
+GALLEY_SKIP_TAGS = DOCUMENT_SKIP_TAGS + ['iframe']
+
+# Elements a landing page's fields come from
+LANDING_TAGS = ['meta', 'h1', 'div', 'a']
+LANDING_SELECTOR = 'meta[name], h1.page_title, div[class], a'
+
+# BeautifulSoup's get_text() leaves out the strings inside these
+NON_TEXT_TAGS = ['script', 'style', 'template']
+
+logger = logging.getLogger(__name__)
+
+
+def detect_encoding(content: bytes):
+    """
+    (content, encoding) as BeautifulSoup would parse the page: BOM, then a declared charset, then
+    a guess - except that valid UTF-8 is taken as UTF-8 without running the (slow) guesser
+    """
+    content, sniffed = EncodingDetector.strip_byte_order_mark(content)
+    if sniffed:
+        return content, sniffed
+    declared = EncodingDetector.find_declared_encoding(content, is_html=True)
+    if declared:
+        return content, declared
+    try:
+        content.decode('utf-8')
+        return content, 'utf-8'
+    except UnicodeDecodeError:
+        return content, next(iter(EncodingDetector(content, is_html=True).encodings), 'windows-1252')
+
+
+def clean_strings(strings, separator: str) -> str:
+    """get_text(separator, strip=True): every string stripped, empty ones dropped"""
+    return separator.join(s for s in (s.strip() for s in strings) if s)
+
+
+def new_landing_fields() -> Dict:
+    return {'meta': {}}
+
+
+def is_html_label(string: Optional[str]) -> bool:
+    """Link text that marks the HTML galley"""
+    return bool(string) and 'HTML' in string.upper()
+
+
+class SoupPage:
+    """Reference backend: BeautifulSoup over lxml, as the scrapers have always parsed pages"""
+
+    name = 'bs4'
+
+    def __init__(self, content: Union[bytes, str]):
+        self.soup = BeautifulSoup(content, 'lxml')
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def landing_fields(self) -> Dict:
+        """
+        Everything the scraper reads from a landing page, collected in one pass over the tree:
+        meta: content of every named <meta> by name ('' where it has none), plus the page title,
+        author links and abstract, and the galley link href ('' if it has none; None if no link)
+        """
+        fields = new_landing_fields()
+        html_link = class_link = None
+
+        for tag in self.soup.find_all(LANDING_TAGS):
+            if tag.name == 'meta':
+                name = tag.get('name')
+                if name is not None:
+                    fields['meta'].setdefault(name, []).append(tag.get('content', ''))
+            elif tag.name == 'a':
+                if html_link is None and is_html_label(tag.string):
+                    html_link = tag
+                if class_link is None and 'obj_galley_link' in tag.get('class', []):
+                    class_link = tag
+            elif tag.name == 'h1':
+                if 'title' not in fields and 'page_title' in tag.get('class', []):
+                    fields['title'] = tag.get_text(strip=True)
+            else:
+                classes = tag.get('class', [])
+                if 'authors' not in fields and 'authors' in classes:
+                    fields['authors'] = [a.get_text(strip=True) for a in tag.find_all('a')]
+                if 'abstract' not in fields and ' '.join(classes) == 'item abstract':
+                    fields['abstract'] = tag.get_text(strip=True)
+
+        link = html_link or class_link
+        fields['galley_href'] = None if link is None else link.get('href') or ''
+        return fields
+
+    def iframe_src(self) -> Optional[str]:
+        iframe = self.soup.find('iframe')
+        return iframe.get('src') if iframe else None
+
+    def document_text(self) -> str:
+        """Text of the whole document, without scripts, styles and page chrome"""
+        for element in self.soup(DOCUMENT_SKIP_TAGS):
+            element.decompose()
+        return self.soup.get_text(separator='\n', strip=True)
+
+    def galley_page_text(self) -> str:
+        """Text of the galley page's content container (or body)"""
+        for element in self.soup(GALLEY_SKIP_TAGS):
+            element.decompose()
+
+        content = self.soup.find('div', id='htmlContainer') or self.soup.find('body')
+        if content:
+            return content.get_text(separator='\n', strip=True)
+        return ''
+
+
+class LxmlPage:
+    """
+    lxml.html backend: the same libxml2 tree BeautifulSoup builds, queried with compiled XPath
+    Skipped tags are excluded from text queries rather than removed, because removing an element
+    would merge the text on either side of it into one string
+    """
+
+    name = 'lxml'
+
+    def __init__(self, content: Union[bytes, str]):
+        from lxml import etree
+
+        if isinstance(content, str):
+            content, encoding = content.encode('utf-8'), 'utf-8'
+        else:
+            content, encoding = detect_encoding(content)
+        parser = lxml_parser(encoding)
+        try:
+            self.root = etree.fromstring(content, parser)
+        except etree.XMLSyntaxError:
+            self.root = None
+        if self.root is None:
+            # libxml2 gives no tree for an empty document; neither has anything to extract
+            self.root = etree.fromstring(b'<html></html>', parser)
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import lxml.html  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def text(self, element, separator: str = '', skip_tags: Optional[List[str]] = None) -> str:
+        return lxml_text(element, separator, skip_tags)
+
+    def landing_fields(self) -> Dict:
+        fields = new_landing_fields()
+        html_link = class_link = None
+
+        # One walk of the tree in libxml2; links are pre-filtered to possible galley links
+        for element in LXML_XPATH['landing'](self.root):
+            tag = element.tag
+            if tag == 'meta':
+                fields['meta'].setdefault(element.get('name'), []).append(element.get('content', ''))
+            elif tag == 'a':
+                if html_link is None and is_html_label(lxml_string(element)):
+                    html_link = element
+                if class_link is None and 'obj_galley_link' in (element.get('class') or '').split():
+                    class_link = element
+            elif tag == 'h1':
+                if 'title' not in fields:
+                    fields['title'] = self.text(element)
+            else:
+                classes = (element.get('class') or '').split()
+                if 'authors' not in fields and 'authors' in classes:
+                    fields['authors'] = [self.text(a) for a in element.iter('a')]
+                if 'abstract' not in fields and ' '.join(classes) == 'item abstract':
+                    fields['abstract'] = self.text(element)
+
+        link = html_link if html_link is not None else class_link
+        fields['galley_href'] = None if link is None else link.get('href') or ''
+        return fields
+
+    def iframe_src(self) -> Optional[str]:
+        iframe = next(self.root.iter('iframe'), None)
+        return iframe.get('src') if iframe is not None else None
+
+    def document_text(self) -> str:
+        return self.text(self.root, '\n', DOCUMENT_SKIP_TAGS)
+
+    def galley_page_text(self) -> str:
+        content = self.galley_container()
+        if content is not None:
+            return self.text(content, '\n', GALLEY_SKIP_TAGS)
+        return ''
+
+    def galley_container(self):
+        """The galley page's div#htmlContainer, else its body, else None"""
+        content = first(LXML_XPATH['container'](self.root))
+        if content is None:
+            content = first(LXML_XPATH['body'](self.root))
+        return content
+
+
+_lxml_parsers = threading.local()
+
+
+def lxml_parser(encoding: str):
+    """An HTML parser per encoding, reused across pages; lxml parsers must not be shared by threads"""
+    from lxml import html
+
+    parsers = getattr(_lxml_parsers, 'by_encoding', None)
+    if parsers is None:
+        parsers = _lxml_parsers.by_encoding = {}
+    if encoding not in parsers:
+        parsers[encoding] = html.HTMLParser(encoding=encoding)
+    return parsers[encoding]
+
+
+def lxml_text(element, separator: str = '', skip_tags: Optional[List[str]] = None) -> str:
+    """get_text(separator, strip=True) for any lxml element, e.g. one from a streaming parse"""
+    return clean_strings(TEXT_XPATH[tuple(skip_tags or ())](element), separator)
+
+
+def first(elements):
+    return elements[0] if len(elements) else None
+
+
+def lxml_string(element) -> Optional[str]:
+    """BeautifulSoup's Tag.string: the one string below a chain of only children"""
+    from lxml import etree
+
+    while True:
+        children = list(element)
+        count = len(children) + (1 if element.text else 0) + sum(1 for c in children if c.tail)
+        if count != 1:
+            return None
+        if element.text:
+            return element.text
+        child = children[0]
+        if child.tag is etree.Comment:
+            return child.text
+        if not isinstance(child.tag, str):
+            return None
+        element = child
+
+
+def build_lxml_queries():
+    """Compiled XPath for the lxml backend (compiled once, used by every page)"""
+    from lxml import etree
+
+    def has_class(name: str) -> str:
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+    queries = {
+        # Every element a landing page's fields can come from, in a single walk; a link only if its
+        # text could name the HTML galley (comments count, as they can be BeautifulSoup's .string)
+        'landing': etree.XPath(
+            "//*[(self::meta and @name) or (self::h1 and {}) or (self::div and @class) or "
+            "(self::a and (contains(translate(string(.), 'html', 'HTML'), 'HTML') or .//comment() or {}))]".format(
+                has_class('page_title'), has_class('obj_galley_link'))),
+        'container': etree.XPath("(//div[@id='htmlContainer'][not({})])[1]".format(
+            ' or '.join(f'ancestor::{tag}' for tag in GALLEY_SKIP_TAGS))),
+        'body': etree.XPath('(//body)[1]'),
+    }
+    text_queries = {tuple(tags): lxml_text_query(tags) for tags in ([], DOCUMENT_SKIP_TAGS, GALLEY_SKIP_TAGS)}
+    return queries, text_queries
+
+
+def lxml_text_query(skip_tags: List[str], smart_strings: bool = False):
+    """XPath for the strings get_text() would return once skip_tags were removed"""
+    from lxml import etree
+
+    excluded = ' or '.join(f'ancestor::{tag}' for tag in NON_TEXT_TAGS + [t for t in skip_tags if t not in NON_TEXT_TAGS])
+    return etree.XPath(f'.//text()[not({excluded})]', smart_strings=smart_strings)
+
+
+class SelectolaxPage:
+    """selectolax (lexbor) backend: an HTML5 tree, so malformed pages can differ slightly from libxml2"""
+
+    name = 'selectolax'
+
+    def __init__(self, content: Union[bytes, str]):
+        from selectolax.lexbor import LexborHTMLParser
+
+        if isinstance(content, bytes):
+            content, encoding = detect_encoding(content)
+            content = content.decode(encoding, 'replace')
+        self.tree = LexborHTMLParser(content)
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def text(self, node, separator: str = '') -> str:
+        # Template contents live outside the tree lexbor traverses, so only script/style need skipping
+        strings = (n.text_content for n in node.traverse(include_text=True)
+                   if n.tag == '-text' and n.parent is not None and n.parent.tag not in NON_TEXT_TAGS)
+        return clean_strings((s for s in strings if s), separator)
+
+    def landing_fields(self) -> Dict:
+        fields = new_landing_fields()
+        html_link = class_link = None
+
+        for node in self.tree.css(LANDING_SELECTOR):
+            tag = node.tag
+            attributes = node.attributes
+            if tag == 'meta':
+                fields['meta'].setdefault(attributes['name'], []).append(attributes.get('content') or '')
+            elif tag == 'a':
+                if html_link is None and is_html_label(selectolax_string(node)):
+                    html_link = node
+                if class_link is None and 'obj_galley_link' in (attributes.get('class') or '').split():
+                    class_link = node
+            elif tag == 'h1':
+                if 'title' not in fields:
+                    fields['title'] = self.text(node)
+            else:
+                classes = (attributes.get('class') or '').split()
+                if 'authors' not in fields and 'authors' in classes:
+                    fields['authors'] = [self.text(a) for a in node.css('a')]
+                if 'abstract' not in fields and ' '.join(classes) == 'item abstract':
+                    fields['abstract'] = self.text(node)
+
+        link = html_link if html_link is not None else class_link
+        fields['galley_href'] = None if link is None else link.attributes.get('href') or ''
+        return fields
+
+    def iframe_src(self) -> Optional[str]:
+        iframe = self.tree.css_first('iframe')
+        return iframe.attributes.get('src') if iframe is not None else None
+
+    def document_text(self) -> str:
+        self.tree.strip_tags(DOCUMENT_SKIP_TAGS)
+        return self.text(self.tree.root, '\n') if self.tree.root is not None else ''
+
+    def galley_page_text(self) -> str:
+        self.tree.strip_tags(GALLEY_SKIP_TAGS)
+        content = self.tree.css_first('div#htmlContainer') or self.tree.body
+        if content is not None:
+            return self.text(content, '\n')
+        return ''
+
+
+def selectolax_string(node) -> Optional[str]:
+    """BeautifulSoup's Tag.string for a lexbor node"""
+    while True:
+        children = list(node.iter(include_text=True))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.tag == '-text':
+            return child.text_content
+        if child.tag == '-comment':
+            return child.comment_content
+        node = child
+
+
+BACKENDS = {
+    'lxml': LxmlPage,
+    'selectolax': SelectolaxPage,
+    'bs4': SoupPage,
+}
+
+LXML_XPATH: Dict = {}
+TEXT_XPATH: Dict = {}
+if LxmlPage.available():
+    LXML_XPATH, TEXT_XPATH = build_lxml_queries()
+
+_warned = set()
+
+
+def get_backend(name: Optional[str] = None):
+    """The page class for a backend, falling back to BeautifulSoup if it is not installed"""
+    name = name or config.HTML_PARSER
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown HTML parser {name!r} (choose from {', '.join(BACKENDS)})")
+    if not backend.available():
+        if name not in _warned:
+            logger.warning(f"HTML parser {name!r} is not installed - falling back to BeautifulSoup")
+            _warned.add(name)
+        return SoupPage
+    return backend
+
+
+def parse_html(content: Union[bytes, str], backend: Optional[str] = None):
+    """Parse a page with the configured backend (HTML_PARSER), or BeautifulSoup if that fails"""
+    page_class = get_backend(backend)
+    try:
+        return page_class(content)
+    except Exception as e:
+        if page_class is SoupPage:
+            raise
+        logger.warning(f"{page_class.name} could not parse page ({e}) - using BeautifulSoup")
+        return SoupPage(content)
+
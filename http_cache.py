@@ -0,0 +1,261 @@
+"""
+Persistent HTTP response cache shared by all fetching scripts
+URLs are indexed in SQLite; bodies are stored once per content hash, zstd-compressed.
+Also holds the validator store used for conditional-GET recrawls
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional - bodies fall back to zlib compression
+    zstandard = None
+
+import config
+from async_fetcher import FetchResult
+
+
+class ResponseCache:
+    """URL-keyed, content-addressed response cache with TTL and size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 read_only: bool = False):
+        self.cache_dir = Path(cache_dir or config.HTTP_CACHE_DIR)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.ttl = ttl if ttl is not None else config.HTTP_CACHE_TTL
+        self.max_bytes = max_bytes or config.HTTP_CACHE_MAX_BYTES
+        self.codec = 'zstd' if zstandard is not None else 'zlib'
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if read_only:
+            # For reports on an existing cache (put() and eviction won't work): nothing is created
+            self.db = sqlite3.connect(f"{(self.cache_dir / 'index.db').resolve().as_uri()}?mode=ro", uri=True,
+                                      timeout=30, check_same_thread=False)
+            return
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        # timeout: distributed workers share the cache and may briefly hold the write lock
+        self.db = sqlite3.connect(str(self.cache_dir / 'index.db'), timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+            CREATE INDEX IF NOT EXISTS responses_digest ON responses (digest);
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def object_path(self, digest: str, codec: str) -> Path:
+        suffix = 'zst' if codec == 'zstd' else 'zz'
+        return self.objects_dir / digest[:2] / f"{digest}.{suffix}"
+
+    def compress(self, body: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=config.HTTP_CACHE_ZSTD_LEVEL).compress(body)
+        return zlib.compress(body, 6)
+
+    def decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd cache entries")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def get(self, url: str) -> Optional[FetchResult]:
+        """Return the cached response for a URL, or None if missing or expired"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT r.digest, r.status, r.headers, r.fetched_at, o.codec "
+                "FROM responses r JOIN objects o ON o.digest = r.digest WHERE r.url = ?",
+                (url,)).fetchone()
+            if not row:
+                return None
+
+            digest, status, headers, fetched_at, codec = row
+            if self.ttl and time.time() - fetched_at > self.ttl:
+                self.logger.debug(f"Cache expired: {url}")
+                return None
+
+            try:
+                body = self.decompress(self.object_path(digest, codec).read_bytes(), codec)
+            except (OSError, zlib.error, RuntimeError) as e:
+                self.logger.warning(f"Dropping unreadable cache entry for {url}: {e}")
+                self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self.db.commit()
+                return None
+
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+        self.logger.debug(f"Cache hit: {url}")
+        return FetchResult(url=url, status_code=status, headers=json.loads(headers), content=body,
+                           from_cache=True, fetched_at=fetched_at)
+
+    def transfer_sizes(self) -> List[Tuple[str, int]]:
+        """(url, bytes on the wire) for every cached page; the compressed size stands in without Content-Length"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT r.url, r.headers, o.size FROM responses r JOIN objects o ON o.digest = r.digest").fetchall()
+        sizes = []
+        for url, headers, stored_size in rows:
+            length = {k.lower(): v for k, v in json.loads(headers).items()}.get('content-length', '')
+            sizes.append((url, int(length) if length.isdigit() else stored_size))
+        return sizes
+
+    def put(self, url: str, response):
+        """Store a successful response (requests.Response or FetchResult)"""
+        if response.status_code != 200:
+            return
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+
+        with self.lock:
+            known = self.db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if not known:
+                path = self.object_path(digest, self.codec)
+                path.parent.mkdir(exist_ok=True)
+                data = self.compress(body)
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+                self.db.execute("INSERT OR IGNORE INTO objects (digest, codec, size) VALUES (?, ?, ?)",
+                                (digest, self.codec, len(data)))
+
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (url, digest, status, headers, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, response.status_code, json.dumps(dict(response.headers)), now, now))
+            self.db.commit()
+            self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries until the stored size fits max_bytes"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        while total > self.max_bytes:
+            row = self.db.execute(
+                "SELECT url, digest FROM responses ORDER BY accessed_at LIMIT 1").fetchone()
+            if not row:
+                break
+            url, digest = row
+            self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            evicted += 1
+
+            # Bodies are shared between URLs; delete one only when nothing points at it any more
+            if self.db.execute("SELECT 1 FROM responses WHERE digest = ?", (digest,)).fetchone():
+                continue
+            codec, size = self.db.execute(
+                "SELECT codec, size FROM objects WHERE digest = ?", (digest,)).fetchone()
+            try:
+                self.object_path(digest, codec).unlink()
+            except FileNotFoundError:
+                pass
+            self.db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            total -= size
+
+        self.db.commit()
+        self.logger.debug(f"Cache eviction: dropped {evicted} entries, {total / 1024**2:.1f} MB remain")
+
+    def close(self):
+        self.db.close()
+
+
+class ValidatorStore:
+    """
+    Per-URL ETag, Last-Modified and content hash, kept independently of the cache TTL
+    so recrawls can send conditional requests and recognise unchanged pages
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path or config.VALIDATORS_DB, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a URL fetched before"""
+        with self.lock:
+            row = self.db.execute("SELECT etag, last_modified FROM validators WHERE url = ?",
+                                  (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def update(self, url: str, response) -> bool:
+        """
+        Record the validators of a network response
+        Returns True if the page changed since it was last seen (new pages count as changed)
+        """
+        now = time.time()
+        with self.lock:
+            if response.status_code == 304:
+                self.db.execute("UPDATE validators SET checked_at = ? WHERE url = ?", (now, url))
+                self.db.commit()
+                return False
+
+            if response.status_code != 200:
+                return True
+
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            row = self.db.execute("SELECT content_hash FROM validators WHERE url = ?", (url,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, content_hash, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, response.headers.get('ETag'), response.headers.get('Last-Modified'), content_hash, now))
+            self.db.commit()
+            return row is None or row[0] != content_hash
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled"""
+    global _cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
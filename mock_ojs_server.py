@@ -0,0 +1,363 @@
+"""
+Local mock of the First Monday OJS site for offline testing and benchmarking
+Serves a synthetic corpus (or pages recorded in a WARC archive) with the archive, issue, landing,
+galley and download pages the scrapers parse, plus configurable latency and injected errors
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import config
+
+OJS = '/ojs/index.php/fm'
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+          'September', 'October', 'November', 'December']
+WORDS = ('network internet community platform research online digital social media users data '
+         'access information public open software culture policy economy study analysis').split()
+
+ROUTES = [
+    ('archive', re.compile(rf'^{OJS}/issue/archive(?:/(\d+))?$')),
+    ('issue', re.compile(rf'^{OJS}/issue/view/(\d+)$')),
+    ('landing', re.compile(rf'^{OJS}/article/view/(\d+)$')),
+    ('galley', re.compile(rf'^{OJS}/article/view/(\d+)/(\d+)$')),
+    ('document', re.compile(rf'^{OJS}/article/download/(\d+)/(\d+)$')),
+]
+
+
+class SyntheticCorpus:
+    """
+    Deterministic fake journal: issues numbered newest-first from `issues` down to 1,
+    article ids issue * 1000 + n, one HTML galley per article
+    """
+
+    def __init__(self, issues: int = 20, articles_per_issue: int = 10, galley_bytes: int = 60_000,
+                 issues_per_page: int = 25, seed: int = 0):
+        self.issues = issues
+        self.articles_per_issue = articles_per_issue
+        self.galley_bytes = galley_bytes
+        self.issues_per_page = issues_per_page
+        self.seed = seed
+
+    def issue_date(self, issue_id: int) -> Tuple[int, int, int]:
+        """(volume, number, year/month packed as months since 1996) for an issue"""
+        months = issue_id - 1
+        return months // 12 + 1, months % 12 + 1, months
+
+    def issue_title(self, issue_id: int) -> str:
+        volume, number, months = self.issue_date(issue_id)
+        return f"Volume {volume}, Number {number} - {number} {MONTHS[months % 12]} {1996 + months // 12}"
+
+    def text(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+    def archive_page(self, page: int) -> Optional[str]:
+        first = self.issues - (page - 1) * self.issues_per_page
+        ids = [i for i in range(first, first - self.issues_per_page, -1) if i >= 1]
+        summaries = ''.join(
+            f'<div class="obj_issue_summary"><a class="title" href="{OJS}/issue/view/{i}">'
+            f'{self.issue_title(i)}</a><div class="description"><p>Issue {i}</p></div></div>'
+            for i in ids)
+        # OJS pagination: a next link on every page but the last
+        links = ''
+        if page > 1:
+            links += f'<a class="prev" href="{OJS}/issue/archive/{page - 1}">Prev</a>'
+        if ids and ids[-1] > 1:
+            links += f'<a class="next" href="{OJS}/issue/archive/{page + 1}">Next</a>'
+        pagination = f'<div class="cmp_pagination" aria-label="View additional issues">{links}</div>'
+        return f'<html><body><ul class="issues_archive">{summaries}</ul>{pagination}</body></html>'
+
+    def issue_page(self, issue_id: int) -> Optional[str]:
+        if not 1 <= issue_id <= self.issues:
+            return None
+        rng = random.Random(self.seed * 7919 + issue_id)
+        articles = ''.join(
+            f'<div class="obj_article_summary"><h3 class="title">'
+            f'<a href="{OJS}/article/view/{issue_id * 1000 + n}">{self.text(rng, 6).title()}</a></h3>'
+            f'<div class="meta"><div class="authors">{self.text(rng, 2).title()}</div></div></div>'
+            for n in range(1, self.articles_per_issue + 1))
+        return (f'<html><body><h1>{self.issue_title(issue_id)}</h1>'
+                f'<div class="sections">{articles}</div></body></html>')
+
+    def article_exists(self, article_id: int) -> bool:
+        issue_id, n = divmod(article_id, 1000)
+        return 1 <= issue_id <= self.issues and 1 <= n <= self.articles_per_issue
+
+    def landing_page(self, article_id: int) -> Optional[str]:
+        if not self.article_exists(article_id):
+            return None
+        rng = random.Random(self.seed * 104729 + article_id)
+        issue_id = article_id // 1000
+        volume, number, months = self.issue_date(issue_id)
+        date = f"{1996 + months // 12}/{number:02d}/01"
+        title = self.text(rng, 6).title()
+        authors = [self.text(rng, 2).title() for _ in range(rng.randint(1, 3))]
+        abstract = self.text(rng, 120)
+        keywords = [rng.choice(WORDS) for _ in range(4)]
+
+        meta = [('citation_title', title), ('citation_publication_date', date),
+                ('citation_volume', volume), ('citation_issue', number),
+                ('citation_journal_title', 'First Monday'),
+                ('citation_doi', f'10.5210/fm.v{volume}i{number}.{article_id}'),
+                ('citation_abstract', abstract), ('DC.Title', title), ('DC.Date.issued', date),
+                ('DC.Description', abstract), ('DC.Identifier', article_id)]
+        meta += [('citation_author', a) for a in authors] + [('DC.Creator.PersonalName', a) for a in authors]
+        meta += [('citation_keywords', k) for k in keywords] + [('DC.Subject', k) for k in keywords]
+        head = ''.join(f'<meta name="{name}" content="{value}"/>' for name, value in meta)
+
+        galley_id = article_id * 10 + 1
+        return (f'<html><head><title>{title}</title>{head}</head><body>'
+                f'<h1 class="page_title">{title}</h1>'
+                f'<div class="authors">{"".join(f"<a>{a}</a>" for a in authors)}</div>'
+                f'<div class="item abstract"><h2 class="label">Abstract</h2><p>{abstract}</p></div>'
+                f'<a class="obj_galley_link file" href="{OJS}/article/view/{article_id}/{galley_id}">HTML</a>'
+                f'</body></html>')
+
+    def galley_page(self, article_id: int, galley_id: int) -> Optional[str]:
+        if not self.article_exists(article_id) or galley_id != article_id * 10 + 1:
+            return None
+        return (f'<html><body><header>First Monday</header>'
+                f'<iframe name="htmlFrame" src="{OJS}/article/download/{article_id}/{galley_id}"></iframe>'
+                f'</body></html>')
+
+    def document(self, article_id: int, galley_id: int) -> Optional[str]:
+        if not self.article_exists(article_id) or galley_id != article_id * 10 + 1:
+            return None
+        rng = random.Random(self.seed * 15485863 + article_id)
+        sections = []
+        size = 0
+        n = 0
+        while size < self.galley_bytes:
+            n += 1
+            paragraphs = ''.join(f'<p>{self.text(rng, rng.randint(40, 120))}</p>' for _ in range(4))
+            sections.append(f'<h2>Section {n}</h2>{paragraphs}')
+            size += len(sections[-1])
+        notes = ''.join(f'<p>{i}. {self.text(rng, 12)}</p>' for i in range(1, 6))
+        references = ''.join(f'<p>{self.text(rng, 3).title()}, {1990 + i}. {self.text(rng, 10)}.</p>'
+                             for i in range(10))
+        return (f'<html><head><title>Article {article_id}</title></head><body><div id="htmlContainer">'
+                f'{"".join(sections)}<h2>Notes</h2>{notes}<h2>References</h2>{references}'
+                f'<p>Copyright &copy; First Monday</p></div></body></html>')
+
+    def page(self, kind: str, groups: Tuple) -> Optional[str]:
+        ids = [int(g) if g else 1 for g in groups]
+        if kind == 'archive':
+            return self.archive_page(*ids)
+        if kind == 'issue':
+            return self.issue_page(*ids)
+        if kind == 'landing':
+            return self.landing_page(*ids)
+        if kind == 'galley':
+            return self.galley_page(*ids)
+        return self.document(*ids)
+
+
+class RecordedCorpus:
+    """Pages captured in a WARC archive (scrape_all.py --warc), with links pointed at the mock server"""
+
+    def __init__(self, warc_dir: str):
+        from warc_writer import WarcArchive
+        self.archive = WarcArchive(warc_dir)
+        self.by_path = {}
+        for url in self.archive.urls():
+            parts = urlsplit(url)
+            self.by_path[parts.path + (f'?{parts.query}' if parts.query else '')] = url
+        self.base_url = None
+
+    def get(self, path: str) -> Optional[bytes]:
+        url = self.by_path.get(path)
+        if not url:
+            return None
+        body = self.archive.read(url).content
+        origin = '{0.scheme}://{0.netloc}'.format(urlsplit(url)).encode()
+        return body.replace(origin, self.base_url.encode()) if self.base_url else body
+
+
+class MockOJSServer:
+    """Threaded HTTP server for a corpus, with per-request latency and error injection"""
+
+    def __init__(self, corpus=None, latency: float = 0.05, jitter: float = 0.0,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, rate_timeout: float = 0.0,
+                 timeout_delay: Optional[float] = None, retry_after: Optional[int] = 1,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        self.corpus = corpus or SyntheticCorpus(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_timeout = rate_timeout
+        self.timeout_delay = timeout_delay if timeout_delay is not None else config.REQUEST_TIMEOUT + 1
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionError:
+                    # The client gave up on the request (timed out or cancelled) or closed a kept-alive connection
+                    pass
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def draw(self) -> Tuple[float, Optional[str]]:
+        """Latency and injected failure (None, '429', '5xx' or 'timeout') for one request"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            roll = self.rng.random()
+        if roll < self.rate_timeout:
+            return delay, 'timeout'
+        roll -= self.rate_timeout
+        if roll < self.rate_429:
+            return delay, '429'
+        roll -= self.rate_429
+        if roll < self.rate_5xx:
+            return delay, '5xx'
+        return delay, None
+
+    def lookup(self, path: str) -> Tuple[str, Optional[bytes]]:
+        if isinstance(self.corpus, RecordedCorpus):
+            return 'recorded', self.corpus.get(path)
+        for kind, pattern in ROUTES:
+            match = pattern.match(path)
+            if match:
+                body = self.corpus.page(kind, match.groups())
+                return kind, body.encode('utf-8') if body is not None else None
+        return 'other', None
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        delay, failure = self.draw()
+        kind, body = self.lookup(request.path)
+        with self.lock:
+            self.stats[f'requests_{kind}'] += 1
+            self.stats['requests'] += 1
+
+        if failure == 'timeout':
+            with self.lock:
+                self.stats['injected_timeout'] += 1
+            time.sleep(self.timeout_delay)
+            request.close_connection = True
+            return
+
+        time.sleep(delay)
+        if failure:
+            status = 429 if failure == '429' else self.rng.choice([500, 502])
+            with self.lock:
+                self.stats[f'injected_{failure}'] += 1
+            request.send_response(status)
+            if status == 429 and self.retry_after is not None:
+                request.send_header('Retry-After', str(self.retry_after))
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        if body is None:
+            request.send_response(404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        with self.lock:
+            self.stats['bytes'] += len(body)
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        if isinstance(self.corpus, RecordedCorpus):
+            self.corpus.base_url = self.base_url
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def point_config_at(base_url: str):
+    """Redirect every site URL in config to another base (e.g. a mock server)"""
+    config.BASE_URL = base_url
+    config.ARCHIVE_URL = f"{base_url}{OJS}/issue/archive"
+    config.OJS_ARTICLE_BASE = f"{base_url}{OJS}/article/view"
+    config.LEGACY_BASE = f"{base_url}/issues"
+    config.OAI_URL = f"{base_url}{OJS}/oai"
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Corpus, latency and error options shared with benchmark_crawl.py"""
+    parser.add_argument('--issues', type=int, default=20, help="synthetic issues (default: 20)")
+    parser.add_argument('--articles', type=int, default=10, help="articles per issue (default: 10)")
+    parser.add_argument('--galley-kb', type=int, default=60, help="size of each article document in KB")
+    parser.add_argument('--warc-dir', help="serve pages recorded in this WARC directory instead")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="+/- seconds of uniform latency noise")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help="share of requests answered 500/502")
+    parser.add_argument('--rate-timeout', type=float, default=0.0, help="share of requests never answered")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for corpus and injected errors")
+
+
+def build_server(args, port: int = 0, timeout_delay: Optional[float] = None) -> MockOJSServer:
+    if args.warc_dir:
+        corpus = RecordedCorpus(args.warc_dir)
+    else:
+        corpus = SyntheticCorpus(args.issues, args.articles, args.galley_kb * 1024, seed=args.seed)
+    return MockOJSServer(corpus, latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+                         rate_5xx=args.rate_5xx, rate_timeout=args.rate_timeout,
+                         timeout_delay=timeout_delay, port=port, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock First Monday OJS site")
+    add_server_arguments(parser)
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    server = build_server(args, port=args.port)
+    print("=" * 80)
+    print("MOCK FIRST MONDAY SERVER")
+    print("=" * 80)
+    print(f"Serving {args.warc_dir or f'{args.issues} issues x {args.articles} articles'} at {server.base_url}")
+    print(f"Point the scrapers at it with BASE_URL = \"{server.base_url}\" in config.py (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"\nServed: {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+OAI-PMH metadata harvester for First Monday
+Fills data/metadata/ from the journal's OAI-PMH endpoint (Dublin Core, ~100 records per request)
+instead of fetching every article landing page
+"""
+
+import argparse
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+import config
+from rate_limiter import get_rate_limiter
+
+NS = {
+    'oai': 'http://www.openarchives.org/OAI/2.0/',
+    'oai_dc': 'http://www.openarchives.org/OAI/2.0/oai_dc/',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+
+ARTICLE_VIEW = re.compile(r'/article/view/(\d+)$')
+SOURCE_ISSUE = re.compile(r'Vol(?:ume)?\.?\s*(\d+),?\s*(?:No\.?|Number)\s*(\d+)', re.IGNORECASE)
+
+
+class OAIHarvester:
+    """Harvests ListRecords pages, maps Dublin Core to the article metadata schema and saves it"""
+
+    def __init__(self, oai_url: Optional[str] = None):
+        self.oai_url = oai_url or config.OAI_URL
+        self.session = requests.Session()
+        self.session.headers.update(config.HEADERS)
+        self.metadata_dir = Path(config.OUTPUT_DIR) / "metadata"
+        self.state = self.load_state()
+        self.existing = self.index_existing_metadata()
+        self.stats = {
+            'requests': 0,
+            'records': 0,
+            'created': 0,
+            'updated': 0,
+            'deleted': 0,
+            'skipped': 0
+        }
+
+    def load_state(self) -> Dict:
+        """Load the last harvest date and any unfinished resumption token"""
+        if Path(config.OAI_STATE_FILE).exists():
+            try:
+                with open(config.OAI_STATE_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"WARNING: Could not load OAI state: {e}")
+        return {'last_harvest': None, 'resumption_token': None}
+
+    def save_state(self):
+        Path(config.OAI_STATE_FILE).parent.mkdir(parents=True, exist_ok=True)
+        with open(config.OAI_STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+
+    def index_existing_metadata(self) -> Dict[str, Path]:
+        """Map article_id to its metadata JSON file, from the {id}_{title}.json naming"""
+        existing = {}
+        if self.metadata_dir.exists():
+            for path in self.metadata_dir.glob('*/*.json'):
+                article_id = path.name.split('_', 1)[0]
+                if article_id.isdigit():
+                    existing[article_id] = path
+        return existing
+
+    def make_request(self, params: Dict, max_retries: int = config.MAX_RETRIES) -> Optional[ET.Element]:
+        """Request one OAI-PMH page and return the parsed document"""
+        limiter = get_rate_limiter(self.oai_url)
+        for attempt in range(max_retries):
+            try:
+                limiter.acquire()
+                response = self.session.get(self.oai_url, params=params, timeout=config.REQUEST_TIMEOUT)
+                self.stats['requests'] += 1
+                limiter.record_response(response.status_code, response.elapsed.total_seconds(),
+                                        response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return ET.fromstring(response.content)
+            except Exception as e:
+                if not isinstance(e, (requests.exceptions.HTTPError, ET.ParseError)):
+                    limiter.record_error()
+                if attempt < max_retries - 1:
+                    wait_time = limiter.backoff_delay(attempt)
+                    print(f"  Retry {attempt + 1}/{max_retries} after {wait_time:.1f}s...")
+                    time.sleep(wait_time)
+                else:
+                    print(f"  ERROR: Failed after {max_retries} attempts: {e}")
+                    return None
+
+    def list_records(self, from_date: Optional[str] = None, set_spec: Optional[str] = None) -> Iterator[ET.Element]:
+        """
+        Yield <record> elements across all ListRecords pages
+        The resumption token is saved after every page so an interrupted harvest picks up where it stopped
+        """
+        token = self.state.get('resumption_token')
+        if token:
+            print(f"Resuming interrupted harvest (token {token[:20]}...)")
+
+        while True:
+            if token:
+                params = {'verb': 'ListRecords', 'resumptionToken': token}
+            else:
+                params = {'verb': 'ListRecords', 'metadataPrefix': config.OAI_METADATA_PREFIX}
+                if from_date:
+                    params['from'] = from_date
+                if set_spec:
+                    params['set'] = set_spec
+
+            root = self.make_request(params)
+            if root is None:
+                raise RuntimeError("OAI-PMH request failed; rerun to resume")
+
+            # noRecordsMatch answers carry a responseDate too; it is the next harvest's from date
+            if not self.state.get('harvest_started'):
+                self.state['harvest_started'] = root.findtext('oai:responseDate', default='', namespaces=NS)
+
+            error = root.find('oai:error', NS)
+            if error is not None:
+                if error.get('code') == 'noRecordsMatch':
+                    return
+                if error.get('code') == 'badResumptionToken' and token:
+                    # Tokens expire; restart the pass from the last completed harvest
+                    print("Resumption token expired - restarting harvest")
+                    token = self.state['resumption_token'] = None
+                    from_date = from_date or self.state.get('last_harvest')
+                    continue
+                raise RuntimeError(f"OAI-PMH error {error.get('code')}: {(error.text or '').strip()}")
+
+            list_records = root.find('oai:ListRecords', NS)
+            if list_records is None:
+                return
+            yield from list_records.findall('oai:record', NS)
+
+            token_elem = list_records.find('oai:resumptionToken', NS)
+            token = (token_elem.text or '').strip() if token_elem is not None else ''
+            self.state['resumption_token'] = token or None
+            self.save_state()
+
+            if token_elem is not None and token_elem.get('completeListSize'):
+                print(f"  {self.stats['records']}/{token_elem.get('completeListSize')} records")
+            if not token:
+                return
+
+    def map_record(self, record: ET.Element) -> Optional[Dict]:
+        """Map an oai_dc record to the fields produced by IssueBasedScraper.extract_meta_tags"""
+        dc = record.find('oai:metadata/oai_dc:dc', NS)
+        if dc is None:
+            return None
+
+        def values(name: str) -> List[str]:
+            return [e.text.strip() for e in dc.findall(f'dc:{name}', NS) if e.text and e.text.strip()]
+
+        identifiers = values('identifier')
+        url = next((i for i in identifiers if ARTICLE_VIEW.search(i)), None)
+        if not url:
+            return None
+
+        data = {
+            'article_id': ARTICLE_VIEW.search(url).group(1),
+            'url': url,
+            'scraped_date': datetime.now().isoformat(),
+        }
+
+        titles = values('title')
+        if titles:
+            data['title'] = titles[0]
+
+        authors = [self.normalize_author(a) for a in values('creator')]
+        if authors:
+            data['authors'] = authors
+
+        dates = values('date')
+        if dates:
+            # Landing pages give citation_publication_date as YYYY/MM/DD
+            data['publication_date'] = dates[0][:10].replace('-', '/')
+
+        descriptions = values('description')
+        if descriptions:
+            data['abstract'] = re.sub(r'<[^>]+>', '', descriptions[0]).strip()
+
+        keywords = [k.strip() for subject in values('subject') for k in subject.split(';') if k.strip()]
+        if keywords:
+            data['keywords'] = keywords
+
+        for identifier in identifiers:
+            doi = re.search(r'(10\.\d{4,}/\S+)$', identifier)
+            if doi:
+                data['doi'] = doi.group(1)
+                break
+
+        for source in values('source'):
+            issue_match = SOURCE_ISSUE.search(source)
+            if issue_match:
+                data['volume'], data['issue'] = issue_match.groups()
+                data['journal'] = source.split(';')[0].strip()
+                break
+
+        return data
+
+    def normalize_author(self, name: str) -> str:
+        """OJS exports creators as 'Family, Given'; landing pages use 'Given Family'"""
+        parts = [p.strip() for p in name.split(',')]
+        if len(parts) == 2 and all(parts):
+            return f"{parts[1]} {parts[0]}"
+        return name
+
+    def sanitize_filename(self, text: str) -> str:
+        """Sanitize text for use in filenames (same rules as the scrapers)"""
+        text = re.sub(r'[<>:"/\\|?*]', '', text)
+        text = re.sub(r'\s+', ' ', text)
+        return text.strip()[:100]
+
+    def save_record(self, data: Dict):
+        """Merge into the article's existing metadata JSON, or create one in its date folder"""
+        article_id = data['article_id']
+        path = self.existing.get(article_id)
+
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            # Keep fields from other sources (galley_url, word_count, article_type, ...)
+            metadata.update({k: v for k, v in data.items() if v and k != 'scraped_date'})
+            self.stats['updated'] += 1
+        else:
+            date = data.get('publication_date', '')
+            folder = date.replace('/', '') if re.match(r'^\d{4}/\d{2}/\d{2}$', date) else \
+                f"v{data.get('volume', 'unknown')}_n{data.get('issue', 'unknown')}"
+            title = self.sanitize_filename(data.get('title', f'article_{article_id}'))
+            path = self.metadata_dir / folder / f"{article_id}_{title}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            metadata = data
+            self.existing[article_id] = path
+            self.stats['created'] += 1
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    def harvest(self, from_date: Optional[str] = None, set_spec: Optional[str] = None):
+        """Harvest all records changed since from_date (default: since the last completed harvest)"""
+        if from_date is None and not self.state.get('resumption_token'):
+            from_date = self.state.get('last_harvest')
+
+        print(f"Harvesting {self.oai_url}" + (f" from {from_date}" if from_date else " (full)"))
+
+        for record in self.list_records(from_date, set_spec):
+            self.stats['records'] += 1
+            header = record.find('oai:header', NS)
+            if header is not None and header.get('status') == 'deleted':
+                print(f"  Deleted upstream: {header.findtext('oai:identifier', namespaces=NS)}")
+                self.stats['deleted'] += 1
+                continue
+
+            data = self.map_record(record)
+            if data is None:
+                self.stats['skipped'] += 1
+                continue
+            self.save_record(data)
+
+        # Day granularity is accepted by every OAI-PMH repository
+        # Without a response date, keep the previous one rather than forcing a full re-harvest
+        started = self.state.pop('harvest_started', None)
+        if started:
+            self.state['last_harvest'] = started[:10]
+        self.state['resumption_token'] = None
+        self.save_state()
+
+    def print_stats(self):
+        print(f"  Requests: {self.stats['requests']}")
+        print(f"  Records: {self.stats['records']}")
+        print(f"  Created: {self.stats['created']}")
+        print(f"  Updated: {self.stats['updated']}")
+        print(f"  Deleted upstream: {self.stats['deleted']}")
+        print(f"  Skipped (not articles): {self.stats['skipped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest First Monday metadata over OAI-PMH")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore the last harvest date and fetch every record")
+    parser.add_argument('--from', dest='from_date',
+                        help="only records changed since this date (YYYY-MM-DD)")
+    parser.add_argument('--set', dest='set_spec', help="restrict to an OAI set (e.g. fm:ART)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("FIRST MONDAY OAI-PMH HARVEST")
+    print("=" * 80)
+
+    harvester = OAIHarvester()
+    if args.full:
+        harvester.state = {'last_harvest': None, 'resumption_token': None}
+
+    start = time.time()
+    harvester.harvest(args.from_date, args.set_spec)
+
+    print("\n" + "=" * 80)
+    print("HARVEST COMPLETE")
+    print("=" * 80)
+    print(f"Time: {time.time() - start:.1f}s")
+    harvester.print_stats()
+
+
+if __name__ == "__main__":
+    main()
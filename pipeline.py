@@ -0,0 +1,195 @@
+"""
+Staged article pipeline for the async issue scraper
+Network fetchers, a CPU parse pool, a text extraction process pool and a single disk writer,
+connected by bounded queues, so parsing and writing overlap with the rate-limit waits of the next requests
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import config
+from text_structure import extract_full_text
+
+
+class StageStats:
+    """Items handled, busy time and queue depth of one pipeline stage"""
+
+    def __init__(self, name: str, queue: asyncio.Queue):
+        self.name = name
+        self.queue = queue
+        self.processed = 0
+        self.busy = 0.0
+        self.max_depth = queue.qsize()
+        self.started = time.monotonic()
+
+    def record(self, seconds: float):
+        self.processed += 1
+        self.busy += seconds
+
+    def sample_depth(self):
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def summary(self) -> Dict:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            'processed': self.processed,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'throughput': self.processed / elapsed,  # items per second of wall time
+            'busy_seconds': self.busy,
+        }
+
+    def describe(self) -> str:
+        s = self.summary()
+        return (f"{self.name}: {s['processed']} done, {s['throughput']:.2f}/s, "
+                f"queue {s['queue_depth']} (max {s['max_queue_depth']}), busy {s['busy_seconds']:.1f}s")
+
+
+class ArticlePipeline:
+    """
+    Runs the articles of an issue through fetch -> parse -> write
+    Full queues make the stage before them wait (backpressure), so memory stays bounded
+    """
+
+    def __init__(self, scraper, fetchers: Optional[int] = None, parse_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None, text_workers: Optional[int] = None):
+        self.scraper = scraper
+        self.fetchers = fetchers or config.MAX_CONCURRENCY_PER_HOST
+        self.parse_workers = parse_workers or config.PARSE_WORKERS
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.text_workers = text_workers if text_workers is not None else config.TEXT_WORKERS
+        if self.text_workers is None:
+            self.text_workers = os.cpu_count() or 1
+        # Documents being extracted at once: bounds the page bytes held by the process pool
+        self.text_max_pending = config.TEXT_MAX_PENDING or 2 * max(self.text_workers, self.parse_workers)
+        self.parse_pool = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix='parse')
+        self.write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='write')
+        self.text_pool = None  # started on the first document, so runs without full text never spawn it
+        self.stats: Dict[str, StageStats] = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def in_parse_pool(self, fn, *args):
+        """Run CPU-bound work off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.parse_pool, fn, *args)
+
+    async def in_text_pool(self, kind: str, content: bytes) -> Tuple[str, int, Optional[Dict]]:
+        """
+        Full text, word count and structure of a fetched document, extracted in a worker process so large
+        trees don't hold the GIL; in the parse threads if TEXT_WORKERS is 0 or the pool breaks
+        """
+        loop = asyncio.get_running_loop()
+        args = (extract_full_text, kind, content, config.HTML_PARSER)
+        if self.text_workers == 0:
+            return await loop.run_in_executor(self.parse_pool, *args)
+
+        if self.text_pool is None:
+            # spawn: forking a process that runs the event loop and pool threads is unsafe
+            self.text_pool = ProcessPoolExecutor(max_workers=self.text_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        try:
+            return await loop.run_in_executor(self.text_pool, *args)
+        except BrokenProcessPool as e:
+            self.logger.warning(f"Text extraction process pool failed ({e}) - extracting in threads instead")
+            self.text_workers = 0
+            return await loop.run_in_executor(self.parse_pool, *args)
+
+    async def run(self, articles: List[Dict], issue_dirs) -> List[Dict]:
+        """Process the articles and return their commit outcomes in input order"""
+        fetch_queue = asyncio.Queue()
+        for item in enumerate(articles, 1):
+            fetch_queue.put_nowait(item)
+        parse_queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        self.stats = {
+            'fetch': StageStats('fetch', fetch_queue),
+            'parse': StageStats('parse', parse_queue),
+            'write': StageStats('write', write_queue),
+        }
+        outcomes = {}
+
+        fetchers = [asyncio.create_task(self.fetch_stage(fetch_queue, parse_queue))
+                    for _ in range(min(self.fetchers, len(articles)) or 1)]
+        # One parse task per document that may be in the text pool at once
+        workers = [asyncio.create_task(self.parse_stage(parse_queue, write_queue))
+                   for _ in range(self.text_max_pending)]
+        workers.append(asyncio.create_task(self.write_stage(write_queue, issue_dirs, len(articles), outcomes)))
+        workers.append(asyncio.create_task(self.report_progress()))
+
+        try:
+            await asyncio.gather(*fetchers)
+            await parse_queue.join()
+            await write_queue.join()
+        finally:
+            for task in fetchers + workers:
+                task.cancel()
+            await asyncio.gather(*fetchers, *workers, return_exceptions=True)
+
+        for stage in self.stats.values():
+            self.logger.info(f"  Pipeline {stage.describe()}")
+        return [outcomes[i] for i in sorted(outcomes)]
+
+    async def fetch_stage(self, fetch_queue: asyncio.Queue, parse_queue: asyncio.Queue):
+        """Fetch landing page and full-text document of one article at a time"""
+        while not fetch_queue.empty():
+            index, article_summary = fetch_queue.get_nowait()
+            start = time.monotonic()
+            try:
+                fetched = await self.scraper.fetch_article_async(article_summary['url'])
+            except Exception as e:
+                self.logger.error(f"Fetching {article_summary['url']} failed: {e}")
+                fetched = None
+            self.stats['fetch'].record(time.monotonic() - start)
+            await parse_queue.put((index, article_summary, fetched))
+            self.stats['parse'].sample_depth()
+
+    async def parse_stage(self, parse_queue: asyncio.Queue, write_queue: asyncio.Queue):
+        """Turn fetched documents into finished article records, extracting their text in the text pool"""
+        while True:
+            index, article_summary, fetched = await parse_queue.get()
+            start = time.monotonic()
+            try:
+                document = fetched.get('document') if fetched else None
+                extracted = await self.in_text_pool(*document) if document else None
+                article_data = self.scraper.finish_article(fetched, extracted) if fetched else None
+            except Exception as e:
+                self.logger.error(f"Parsing {article_summary['url']} failed: {e}")
+                article_data = None
+            self.stats['parse'].record(time.monotonic() - start)
+            await write_queue.put((index, article_summary, article_data))
+            self.stats['write'].sample_depth()
+            parse_queue.task_done()
+
+    async def write_stage(self, write_queue: asyncio.Queue, issue_dirs, total: int, outcomes: Dict):
+        """Write and checkpoint articles one at a time on the writer thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            index, article_summary, article_data = await write_queue.get()
+            start = time.monotonic()
+            self.scraper.log_article_result(index, total, article_summary, article_data)
+            try:
+                outcomes[index] = await loop.run_in_executor(
+                    self.write_pool, self.scraper.commit_article, issue_dirs, article_summary['url'], article_data)
+            except Exception as e:
+                self.logger.error(f"Writing {article_summary['url']} failed: {e}")
+                outcomes[index] = {'success': False, 'words': 0}
+            self.stats['write'].record(time.monotonic() - start)
+            write_queue.task_done()
+
+    async def report_progress(self):
+        """Log every stage's queue depth and throughput while an issue is in progress"""
+        while True:
+            await asyncio.sleep(config.PIPELINE_STATS_INTERVAL)
+            self.logger.info("Pipeline: " + "; ".join(stage.describe() for stage in self.stats.values()))
+
+    def close(self):
+        if self.text_pool is not None:
+            self.text_pool.shutdown(wait=True)
+        self.parse_pool.shutdown(wait=True)
+        self.write_pool.shutdown(wait=True)
@@ -0,0 +1,175 @@
+"""
+Adaptive rate limiter shared by the First Monday scrapers
+Token bucket with AIMD rate adjustment, Retry-After handling and full-jitter backoff
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import config
+
+# Status codes that mean "slow down" rather than "this URL is broken"
+THROTTLE_STATUSES = {403, 429, 503}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate follows AIMD:
+    the rate grows additively after a healthy window of responses and is cut
+    multiplicatively on throttling, high error rates or rising latency
+    """
+
+    def __init__(self, name: str = 'default',
+                 rate: Optional[float] = None,
+                 burst: Optional[float] = None,
+                 min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None):
+        self.name = name
+        self.burst = burst or config.RATE_LIMIT_BURST
+        self.min_rate = min_rate or config.RATE_LIMIT_MIN
+        self.max_rate = max_rate or config.RATE_LIMIT_MAX
+        self.rate = min(self.max_rate, max(self.min_rate, rate or config.RATE_LIMIT_INITIAL))
+        self.tokens = self.burst
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.window = deque(maxlen=config.RATE_LIMIT_WINDOW)
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before sending"""
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.tokens -= 1
+            # A negative balance is debt that the caller pays off by waiting
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def has_budget(self) -> bool:
+        """True if a request could go out right now without waiting"""
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            return self.tokens >= 1 and self.paused_until <= now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            self.logger.debug(f"[{self.name}] waiting {wait:.2f}s for a token")
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            self.logger.debug(f"[{self.name}] waiting {wait:.2f}s for a token")
+            await asyncio.sleep(wait)
+
+    def record_response(self, status_code: int, latency: float, retry_after: Optional[str] = None):
+        """Feed an observed response into the AIMD controller"""
+        with self.lock:
+            if status_code in THROTTLE_STATUSES:
+                self.window.append((latency, True))
+                self.decrease(f"throttled with status {status_code}")
+                delay = parse_retry_after(retry_after)
+                if delay is not None:
+                    self.pause(delay, f"Retry-After {retry_after!r}")
+                return
+
+            self.window.append((latency, status_code >= 500))
+            self.evaluate_window()
+
+    def record_error(self):
+        """Feed a connection error or timeout into the AIMD controller"""
+        with self.lock:
+            self.window.append((config.REQUEST_TIMEOUT, True))
+            self.evaluate_window()
+
+    def evaluate_window(self):
+        """Adjust the rate once a full window of responses has been observed"""
+        if len(self.window) < self.window.maxlen:
+            return
+
+        error_rate = sum(1 for _, error in self.window if error) / len(self.window)
+        mean_latency = sum(latency for latency, _ in self.window) / len(self.window)
+        self.window.clear()
+
+        if error_rate > config.RATE_LIMIT_MAX_ERROR_RATE:
+            self.decrease(f"error rate {error_rate:.0%}")
+        elif mean_latency > config.RATE_LIMIT_TARGET_LATENCY:
+            self.decrease(f"mean latency {mean_latency:.2f}s")
+        else:
+            self.increase(f"healthy window (latency {mean_latency:.2f}s, errors {error_rate:.0%})")
+
+    def increase(self, reason: str):
+        old_rate = self.rate
+        self.rate = min(self.max_rate, self.rate + config.RATE_LIMIT_INCREASE)
+        if self.rate != old_rate:
+            self.logger.info(f"[{self.name}] rate {old_rate:.2f} -> {self.rate:.2f} req/s: {reason}")
+
+    def decrease(self, reason: str):
+        old_rate = self.rate
+        self.rate = max(self.min_rate, self.rate * config.RATE_LIMIT_DECREASE)
+        # Drop any saved-up burst so the slowdown takes effect immediately
+        self.tokens = min(self.tokens, 0.0)
+        self.window.clear()
+        self.logger.info(f"[{self.name}] rate {old_rate:.2f} -> {self.rate:.2f} req/s: {reason}")
+
+    def pause(self, seconds: float, reason: str):
+        """Hold all requests for a number of seconds"""
+        seconds = min(seconds, config.BACKOFF_CAP)
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.logger.info(f"[{self.name}] pausing {seconds:.1f}s: {reason}")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)"""
+        delay = random.uniform(0, min(config.BACKOFF_CAP, config.BACKOFF_BASE * 2 ** attempt))
+        self.logger.info(f"[{self.name}] retry {attempt + 1} backing off {delay:.1f}s")
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(url: str) -> AdaptiveRateLimiter:
+    """Return the process-wide limiter for the URL's host"""
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter(name=host)
+        return _limiters[host]
@@ -0,0 +1,237 @@
+"""
+Offline re-extraction over archived raw HTML
+Replays the parsing code of IssueBasedScraper against the WARC archive (and response cache)
+in a process pool, and diffs the result field by field against the current Data/articles JSON
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+from http_cache import ResponseCache
+from scraper_by_issue import IssueBasedScraper
+from warc_writer import WarcArchive
+
+# Fields written by the extractor; anything else in Data/articles comes from post-processing scripts
+EXTRACTED_FIELDS = {
+    'article_id', 'url', 'title', 'authors', 'publication_date', 'abstract', 'keywords', 'doi',
+    'volume', 'issue', 'journal', 'galley_url', 'dublin_core', 'word_count', 'full_text',
+    'full_text_structure',
+}
+IGNORED_FIELDS = {'scraped_date'}
+
+LANDING_PAGE = re.compile(r'/article/view/\d+$')
+
+
+class ArchiveReplayScraper(IssueBasedScraper):
+    """IssueBasedScraper whose requests are answered from local raw pages instead of the network"""
+
+    def __init__(self, warc_dir: Optional[str] = None, use_cache: bool = True):
+        # Deliberately skips IssueBasedScraper.__init__: no session, checkpoint or output directories
+        self.logger = logging.getLogger(__name__)
+        self.fetch_mode = 'sync'
+        self.fetcher = None
+        self.loop = None
+        self.pipeline = None
+        self.warc = None
+        self.resolver_stats = {'resolved': 0, 'fallback': 0}
+        self.archive = WarcArchive(warc_dir)
+        # ttl=0: an old copy is exactly what a replay wants
+        self.cache = ResponseCache(ttl=0) if use_cache and config.HTTP_CACHE_ENABLED else None
+
+    def make_request(self, url: str, max_retries: int = config.MAX_RETRIES, use_cache: bool = True,
+                     conditional: bool = False, client_errors: bool = False):
+        """
+        Look a URL up in the WARC archive, then in the response cache
+        As with a live request, archived 4xx answers are only returned with client_errors=True
+        """
+        response = self.archive.read(url)
+        if response is None and self.cache is not None:
+            response = self.cache.get(url)
+        if response is None and client_errors:
+            response = self.archive.read_client_error(url)
+        if response is None:
+            self.logger.debug(f"Not archived: {url}")
+        return response
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+
+_replay: Optional[ArchiveReplayScraper] = None
+
+
+def init_worker(warc_dir: Optional[str], use_cache: bool):
+    """Process pool initializer - each worker loads the CDX index once"""
+    global _replay
+    _replay = ArchiveReplayScraper(warc_dir, use_cache)
+
+
+def reextract_article(url: str):
+    """Re-run extraction for one landing page inside a worker process"""
+    try:
+        return url, _replay.parse_article(url), None
+    except Exception as e:
+        return url, None, repr(e)
+
+
+def load_current_articles(articles_dir: Path) -> Dict[str, Dict]:
+    """Map article URL to {'path', 'data'} for every article JSON in the corpus"""
+    current = {}
+    for path in articles_dir.rglob('*.json'):
+        if path.name == 'issue_info.json':
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.getLogger(__name__).warning(f"Skipping unreadable {path}: {e}")
+            continue
+        if data.get('url'):
+            current[data['url']] = {'path': str(path), 'data': data}
+    return current
+
+
+def summarize_value(value):
+    """Shorten long values (full text) so the report stays readable"""
+    if isinstance(value, str) and len(value) > 200:
+        return f"{value[:200]}... ({len(value)} chars, {len(value.split())} words)"
+    return value
+
+
+def diff_article(old: Dict, new: Dict) -> Dict:
+    """Field-level differences between the stored record and the re-extracted one"""
+    changes = {}
+    for field in sorted((set(old) | set(new)) & EXTRACTED_FIELDS - IGNORED_FIELDS):
+        if field not in new:
+            changes[field] = {'change': 'removed', 'old': summarize_value(old[field])}
+        elif field not in old:
+            changes[field] = {'change': 'added', 'new': summarize_value(new[field])}
+        elif old[field] != new[field]:
+            changes[field] = {'change': 'changed',
+                              'old': summarize_value(old[field]), 'new': summarize_value(new[field])}
+    return changes
+
+
+def run_reextraction(urls: List[str], warc_dir: Optional[str], use_cache: bool,
+                     workers: int) -> Dict[str, Optional[Dict]]:
+    """Re-extract all URLs across a process pool"""
+    logger = logging.getLogger(__name__)
+    results = {}
+    chunksize = max(1, min(32, len(urls) // (workers * 4) or 1))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(warc_dir, use_cache)) as pool:
+        for i, (url, article_data, error) in enumerate(
+                pool.map(reextract_article, urls, chunksize=chunksize), 1):
+            if error:
+                logger.error(f"Extraction failed for {url}: {error}")
+            results[url] = article_data
+            if i % 250 == 0:
+                logger.info(f"Re-extracted {i}/{len(urls)}")
+
+    return results
+
+
+def build_report(current: Dict[str, Dict], results: Dict[str, Optional[Dict]]) -> Dict:
+    field_counts = Counter()
+    articles = {}
+    missing = []
+    new = []
+
+    for url, article_data in results.items():
+        if article_data is None:
+            missing.append(url)
+            continue
+        if url not in current:
+            new.append(url)
+            continue
+        changes = diff_article(current[url]['data'], article_data)
+        if changes:
+            field_counts.update(changes.keys())
+            articles[url] = {'file': current[url]['path'], 'changes': changes}
+
+    return {
+        'summary': {
+            'reextracted': len(results) - len(missing),
+            'unchanged': len(results) - len(missing) - len(new) - len(articles),
+            'changed': len(articles),
+            'not_in_corpus': len(new),
+            'not_archived': len(missing) + len(set(current) - set(results)),
+            'changed_fields': dict(field_counts.most_common()),
+        },
+        'changed_articles': articles,
+        'not_in_corpus': sorted(new),
+        'failed': sorted(missing),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run article extraction over archived raw HTML")
+    parser.add_argument('--articles-dir', default='Data/articles',
+                        help="corpus to diff against (default: Data/articles)")
+    parser.add_argument('--warc-dir', default=config.WARC_DIR,
+                        help=f"WARC archive to replay (default: {config.WARC_DIR})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="only replay WARC records, not the HTTP response cache")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (default: all cores)")
+    parser.add_argument('--limit', type=int, help="only re-extract the first N articles")
+    parser.add_argument('--output', default='Data/reextract_diff.json',
+                        help="where to write the diff report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("=" * 80)
+    print("FIRST MONDAY OFFLINE RE-EXTRACTION")
+    print("=" * 80)
+
+    current = load_current_articles(Path(args.articles_dir))
+    archive = WarcArchive(args.warc_dir)
+    urls = set(current) | {url for url in archive.urls() if LANDING_PAGE.search(url)}
+    urls = sorted(urls)
+    if args.limit:
+        urls = urls[:args.limit]
+
+    print(f"Articles in corpus: {len(current)}")
+    print(f"Landing pages archived: {sum(1 for url in archive.urls() if LANDING_PAGE.search(url))}")
+    print(f"Re-extracting {len(urls)} articles with {args.workers} workers...\n")
+
+    start = time.time()
+    results = run_reextraction(urls, args.warc_dir, not args.no_cache, args.workers)
+    elapsed = time.time() - start
+
+    report = build_report(current, results)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    summary = report['summary']
+    print("\n" + "=" * 80)
+    print("RE-EXTRACTION COMPLETE")
+    print("=" * 80)
+    print(f"Time: {elapsed:.1f}s")
+    print(f"Re-extracted: {summary['reextracted']}")
+    print(f"Unchanged: {summary['unchanged']}")
+    print(f"Changed: {summary['changed']}")
+    print(f"Not in corpus: {summary['not_in_corpus']}")
+    print(f"Not archived: {summary['not_archived']}")
+    if summary['changed_fields']:
+        print("\nChanged fields:")
+        for field, count in summary['changed_fields'].items():
+            print(f"  {field}: {count}")
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
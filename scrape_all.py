@@ -3,38 +3,294 @@ Full corpus scraper - Non-interactive mode
 Scrapes all 359 issues from First Monday
 """
 from scraper_by_issue import IssueBasedScraper
+from frontier import LeaseKeeper
+import crawl_planner
+import argparse
+import os
+import socket
 import sys
+import time
+import config
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape the full First Monday corpus")
+    parser.add_argument('--mode', choices=['async', 'sync'], default=config.FETCH_MODE,
+                        help="async: concurrent aiohttp engine, sync: one blocking request at a time")
+    parser.add_argument('--concurrency', type=int, default=config.MAX_CONCURRENCY_PER_HOST,
+                        help="requests kept in flight per host (async mode)")
+    parser.add_argument('--recrawl', action='store_true',
+                        help="refresh already-scraped issues with conditional requests (ETag/Last-Modified)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only scrape issues published since the newest already-scraped issue")
+    parser.add_argument('--warc', action='store_true', default=config.WARC_CAPTURE,
+                        help=f"archive every raw response as WARC in {config.WARC_DIR}/")
+    parser.add_argument('--plan', action='store_true',
+                        help="forecast remaining requests, bytes and time from the cached archive index, then exit")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="only re-scrape articles in the retry queue or failed in earlier runs")
+    parser.add_argument('--coordinator', action='store_true',
+                        help=f"queue every archive issue in {config.FRONTIER_DB} for --worker processes")
+    parser.add_argument('--worker', action='store_true',
+                        help="lease queued issues one at a time until the queue is drained")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="name recorded on this worker's leases (default: host-pid)")
+    parser.add_argument('--rate', type=float,
+                        help=f"this worker's request ceiling in req/s per host (--worker, default "
+                             f"{config.WORKER_RATE_LIMIT}); with --plan, an extra scenario at this rate")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    if args.plan:
+        # Plan for the settings given on the command line, without fetching anything
+        concurrency = args.concurrency if args.concurrency != config.MAX_CONCURRENCY_PER_HOST else None
+        crawl_planner.print_plan(rate=args.rate, concurrency=concurrency)
+        return
+    config.MAX_CONCURRENCY_PER_HOST = args.concurrency
+    config.WARC_CAPTURE = args.warc
+    if args.worker:
+        # Every worker has its own rate limiters, so this is its own egress budget
+        rate = args.rate or config.WORKER_RATE_LIMIT
+        config.RATE_LIMIT_MAX = rate
+        config.RATE_LIMIT_INITIAL = min(config.RATE_LIMIT_INITIAL, rate)
+        config.RATE_LIMIT_MIN = min(config.RATE_LIMIT_MIN, rate)
+
     print("\n" + "="*60)
     print("First Monday - Full Corpus Scraping")
     print("="*60 + "\n")
 
-    scraper = IssueBasedScraper()
+    scraper = IssueBasedScraper(fetch_mode=args.mode, worker_id=args.worker_id if args.worker else None)
+    try:
+        if args.coordinator:
+            queue_corpus(scraper)
+        elif args.worker:
+            run_worker(scraper)
+        elif args.retry_failed:
+            retry_failed_articles(scraper)
+        elif args.recrawl:
+            recrawl_corpus(scraper)
+        elif args.incremental:
+            scrape_new_issues(scraper)
+        else:
+            scrape_corpus(scraper)
+    finally:
+        scraper.close()
+
+def recrawl_corpus(scraper: IssueBasedScraper):
+    """Refresh the whole archive, moving only pages that changed since the last run"""
+    print("Streaming archive index...")
+    totals = {'unchanged_issues': 0, 'new_issues': 0, 'updated_articles': 0, 'failed': 0}
+    all_issues = []
+
+    for i, issue in enumerate(scraper.iter_issues(), 1):
+        all_issues.append(issue)
+        print(f"\n[{i}] {issue['title']}")
 
-    # Get all issues
-    print("Fetching archive index...")
-    all_issues = scraper.get_all_issues()
+        if not scraper.is_issue_done(issue['issue_id']):
+            stats = scraper.scrape_single_issue(issue)
+            totals['new_issues'] += 1
+            totals['updated_articles'] += stats.get('successful', 0)
+            totals['failed'] += stats.get('failed', 0)
+            continue
+
+        stats = scraper.recrawl_issue(issue)
+        if stats.get('error'):
+            print(f"[ERROR] {stats['error']}")
+            continue
+        if stats.get('unchanged'):
+            totals['unchanged_issues'] += 1
+        totals['updated_articles'] += stats.get('updated', 0)
+        totals['failed'] += stats.get('failed', 0)
 
     if not all_issues:
         print("Error: No issues found!")
         return
 
-    print(f"\nFound {len(all_issues)} total issues")
-    print(f"From: {all_issues[-1]['title']}")  # Oldest
-    print(f"To: {all_issues[0]['title']}")      # Newest
+    print(f"\n{'='*60}")
+    print("RECRAWL COMPLETE")
+    print(f"{'='*60}")
+    print(f"  Total issues: {len(all_issues)}")
+    print(f"  Unchanged issues: {totals['unchanged_issues']}")
+    print(f"  New issues: {totals['new_issues']}")
+    print(f"  Articles written: {totals['updated_articles']}")
+    print(f"  Failed articles: {totals['failed']}")
+    print(f"{'='*60}\n")
+
+def scrape_new_issues(scraper: IssueBasedScraper):
+    """Scrape only issues newer than the newest one already scraped"""
+    if not scraper.frontier.count('issue', 'done'):
+        print("No issues scraped yet - nothing to be incremental against, running a full scrape")
+        return scrape_corpus(scraper)
 
-    # Check how many already processed
-    already_processed = len(scraper.checkpoint_data.get('processed_issues', []))
-    remaining = len(all_issues) - already_processed
+    # The archive lists newest issues first, so discovery ends at the first known issue
+    print("Looking for new issues...")
+    new_issues = []
+    # New issues almost always fit on the first page, so don't fetch ahead
+    issues = scraper.iter_issues(prefetch=1)
+    for issue in issues:
+        if scraper.is_issue_done(issue['issue_id']):
+            print(f"Reached already-scraped issue: {issue['title']}")
+            break
+        new_issues.append(issue)
+    issues.close()
+
+    if not new_issues:
+        print("\nNo new issues.")
+        return
+
+    print(f"\nFound {len(new_issues)} new issue(s)")
+
+    # Oldest first: an interrupted run leaves only the newest issues unscraped,
+    # which the next run reaches before it meets a known issue
+    total_successful = 0
+    total_failed = 0
+    for i, issue in enumerate(reversed(new_issues), 1):
+        print(f"\n[{i}/{len(new_issues)}] {issue['title']}")
+        stats = scraper.scrape_single_issue(issue)
+        if stats.get('error'):
+            print(f"[ERROR] {stats['error']}")
+        total_successful += stats.get('successful', 0)
+        total_failed += stats.get('failed', 0)
+        scraper.retry_due_articles(opportunistic=True)
+
+    retries = scraper.drain_retry_queue()
+    print_retry_summary(retries)
+    total_successful += retries['successful']
+    total_failed -= retries['successful']
+
+    print(f"\n{'='*60}")
+    print("INCREMENTAL SCRAPE COMPLETE")
+    print(f"{'='*60}")
+    print(f"  New issues: {len(new_issues)}")
+    print(f"  Articles scraped: {total_successful}")
+    print(f"  Failed articles: {total_failed}")
+    print(f"{'='*60}\n")
+
+def queue_corpus(scraper: IssueBasedScraper):
+    """Coordinator: put every archive issue in the shared frontier for workers to lease"""
+    print("Streaming archive index...")
+    issues = list(scraper.iter_issues())
+    if not issues:
+        print("Error: No issues found!")
+        return
+
+    # Newest issues first, matching the single-process scrape order
+    scraper.frontier.add_many([
+        (issue['url'], 'issue', issue['issue_id'], None, len(issues) - i, issue)
+        for i, issue in enumerate(issues)
+    ])
+
+    counts = scraper.frontier.counts().get('issue', {})
+    print(f"\n{'='*60}")
+    print("ISSUES QUEUED")
+    print(f"{'='*60}")
+    print(f"  Issues in archive: {len(issues)}")
+    for state in ('pending', 'in_flight', 'done', 'failed'):
+        print(f"  {state}: {counts.get(state, 0)}")
+    print(f"\nStart workers with: python scrape_all.py --worker")
+    print(f"{'='*60}\n")
+
+def run_worker(scraper: IssueBasedScraper):
+    """Worker: lease issues from the shared frontier until none are left"""
+    frontier = scraper.frontier
+    print(f"Worker {scraper.worker_id} (fetch mode: {scraper.fetch_mode}, "
+          f"rate ceiling: {config.RATE_LIMIT_MAX} req/s)")
+
+    issues_done = 0
+    total_successful = 0
+    total_failed = 0
+
+    while True:
+        lease = frontier.lease_next('issue', scraper.worker_id)
+        if lease is None:
+            # Issues leased by other workers come back if those workers die, so wait them out
+            expiry = frontier.next_lease_expiry('issue')
+            if expiry is None:
+                break
+            wait = min(config.WORKER_POLL_INTERVAL, max(1.0, expiry - time.time()))
+            print(f"No pending issues; {frontier.count('issue', 'in_flight')} leased by other workers, "
+                  f"checking again in {wait:.0f}s")
+            time.sleep(wait)
+            continue
+
+        issue = lease['payload']
+        if not issue:
+            frontier.fail(lease['url'], 'Queued without issue info')
+            continue
 
-    print(f"\nAlready processed: {already_processed} issues")
-    print(f"Remaining: {remaining} issues")
+        print(f"\n[{scraper.worker_id}] {issue['title']}")
+        try:
+            with LeaseKeeper(frontier, lease['url'], scraper.worker_id):
+                stats = scraper.scrape_single_issue(issue, leased=True)
+        except KeyboardInterrupt:
+            # Hand the issue straight back instead of making the others wait for the lease to expire
+            frontier.release(lease['url'])
+            raise
+
+        if stats.get('error'):
+            print(f"[ERROR] {stats['error']}")
+        issues_done += 1
+        total_successful += stats.get('successful', 0)
+        total_failed += stats.get('failed', 0)
+        scraper.retry_due_articles(opportunistic=True)
+
+    retries = scraper.drain_retry_queue()
+    print_retry_summary(retries)
+    total_successful += retries['successful']
+    total_failed -= retries['successful']
+
+    print(f"\n{'='*60}")
+    print(f"WORKER {scraper.worker_id} FINISHED - queue drained")
+    print(f"{'='*60}")
+    print(f"  Issues scraped: {issues_done}")
+    print(f"  Articles scraped: {total_successful}")
+    print(f"  Failed articles: {total_failed}")
+    print(f"{'='*60}\n")
+
+def print_retry_summary(totals: dict):
+    """Report the end-of-run retry queue drain"""
+    if not totals['retried'] and not totals['deferred']:
+        return
+    print(f"\nRetry queue: {totals['retried']} retries, {totals['successful']} articles recovered, "
+          f"{totals['given_up']} given up, {totals['deferred']} still queued")
+    if totals['deferred']:
+        print("  Run again later, or use --retry-failed to retry them now")
 
-    if remaining == 0:
-        print("\nAll issues already scraped!")
+def retry_failed_articles(scraper: IssueBasedScraper):
+    """Re-scrape only the articles that failed, without touching the archive index"""
+    queued = scraper.frontier.count('article', 'retry')
+    failed = scraper.frontier.items('article', 'failed')
+    orphans = sum(1 for row in failed if row['parent'] is None)
+    print(f"Articles queued for retry: {queued}, failed for good: {len(failed)}")
+    if orphans:
+        print(f"  {orphans} failed articles are not tied to an issue (legacy scraper) and are not retried")
+    if not queued and len(failed) == orphans:
+        print("\nNothing to retry.")
         return
 
+    totals = scraper.retry_failed()
+
+    print(f"\n{'='*60}")
+    print("RETRY COMPLETE")
+    print(f"{'='*60}")
+    print(f"  Articles retried: {totals['retried']}")
+    print(f"  Recovered: {totals['successful']}")
+    print(f"  Queued for another retry: {totals['deferred']}")
+    print(f"  Given up: {totals['given_up']}")
+    print(f"{'='*60}\n")
+
+def scrape_corpus(scraper: IssueBasedScraper):
+    print(f"Fetch mode: {scraper.fetch_mode}")
+
+    # Check how many already processed
+    already_processed = scraper.frontier.count('issue', 'done')
+    print(f"Already processed: {already_processed} issues")
+
+    # Issues stream in as archive pages arrive, so scraping starts with the newest issues
+    # while the rest of the archive index is still being fetched
+    print("Streaming archive index...")
+    all_issues = []
+
     print(f"\n{'='*60}")
     print("Starting full corpus scrape...")
     print(f"{'='*60}\n")
@@ -47,9 +303,10 @@ def main():
     total_skipped = 0
 
     # Scrape all issues
-    for i, issue in enumerate(all_issues, 1):
+    for i, issue in enumerate(scraper.iter_issues(), 1):
+        all_issues.append(issue)
         print(f"\n{'='*60}")
-        print(f"Progress: {i}/{len(all_issues)} ({i/len(all_issues)*100:.1f}%)")
+        print(f"Progress: issue {i} ({issue['title']})")
         print(f"{'='*60}")
 
         stats = scraper.scrape_single_issue(issue)
@@ -66,6 +323,9 @@ def main():
             total_failed += stats.get('failed', 0)
             total_words += stats.get('total_words', 0)
 
+        # Slip in retries whose back-off has passed while the rate budget allows
+        scraper.retry_due_articles(opportunistic=True)
+
         # Print running totals every 10 issues
         if i % 10 == 0:
             print(f"\n{'='*60}")
@@ -78,12 +338,23 @@ def main():
             print(f"Skipped issues: {total_skipped}")
             print(f"{'='*60}\n")
 
+    if not all_issues:
+        print("Error: No issues found!")
+        return
+
+    retries = scraper.drain_retry_queue()
+    print_retry_summary(retries)
+    total_successful += retries['successful']
+    total_failed -= retries['successful']
+
     # Final summary
     print(f"\n{'='*60}")
     print("FULL CORPUS SCRAPING COMPLETE!")
     print(f"{'='*60}")
     print(f"\nFinal Statistics:")
     print(f"  Total issues: {len(all_issues)}")
+    print(f"  From: {all_issues[-1]['title']}")  # Oldest
+    print(f"  To: {all_issues[0]['title']}")      # Newest
     print(f"  Issues processed: {len(all_issues) - total_skipped}")
     print(f"  Issues skipped: {total_skipped}")
     print(f"  Total articles: {total_articles}")
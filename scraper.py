@@ -7,11 +7,13 @@ import requests
 import time
 import logging
 import json
-import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
+from frontier import CrawlFrontier
+from http_cache import get_response_cache
+from rate_limiter import get_rate_limiter
 import config
 
 
@@ -23,7 +25,8 @@ class FirstMondayScraper:
         self.session.headers.update(config.HEADERS)
         self.setup_directories()
         self.setup_logging()
-        self.checkpoint_data = self.load_checkpoint()
+        self.frontier = self.load_frontier()
+        self.cache = get_response_cache()
 
     def setup_directories(self):
         """Create necessary output directories"""
@@ -43,49 +46,56 @@ class FirstMondayScraper:
         )
         self.logger = logging.getLogger(__name__)
 
-    def load_checkpoint(self) -> Dict:
-        """Load checkpoint data to resume interrupted sessions"""
-        if os.path.exists(config.CHECKPOINT_FILE):
-            try:
-                with open(config.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.warning(f"Could not load checkpoint: {e}")
-        return {"processed_issues": [], "processed_articles": [], "last_update": None}
+    def load_frontier(self) -> CrawlFrontier:
+        """Open the crawl frontier to resume interrupted sessions"""
+        frontier = CrawlFrontier()
+        frontier.migrate_checkpoint(config.CHECKPOINT_FILE)
+        frontier.recover()
+        return frontier
 
-    def save_checkpoint(self):
-        """Save checkpoint data"""
-        self.checkpoint_data["last_update"] = datetime.now().isoformat()
-        try:
-            with open(config.CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.checkpoint_data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Could not save checkpoint: {e}")
+    def close(self):
+        """Release the frontier database and the HTTP session"""
+        self.frontier.close()
+        self.session.close()
 
-    def make_request(self, url: str, max_retries: int = config.MAX_RETRIES) -> Optional[requests.Response]:
+    def make_request(self, url: str, max_retries: int = config.MAX_RETRIES,
+                     use_cache: bool = True) -> Optional[requests.Response]:
         """Make HTTP request with retry logic and rate limiting"""
+        if self.cache and use_cache:
+            cached = self.cache.get(url)
+            if cached:
+                return cached
+
+        limiter = get_rate_limiter(url)
         for attempt in range(max_retries):
             try:
                 self.logger.info(f"Requesting: {url}")
-                time.sleep(config.REQUEST_DELAY)  # Rate limiting
+                limiter.acquire()  # Rate limiting
 
                 response = self.session.get(url, timeout=config.REQUEST_TIMEOUT)
+                limiter.record_response(response.status_code, response.elapsed.total_seconds(),
+                                        response.headers.get('Retry-After'))
 
                 if response.status_code == 200:
+                    if self.cache:
+                        self.cache.put(url, response)
                     return response
                 elif response.status_code == 403:
                     self.logger.warning(f"403 Forbidden for {url} - may need to adjust user agent or add delay")
-                    time.sleep(config.RETRY_DELAY * 2)
+                    if attempt < max_retries - 1:
+                        time.sleep(limiter.backoff_delay(attempt))
                 elif response.status_code == 429:
-                    self.logger.warning(f"Rate limited (429) - waiting longer")
-                    time.sleep(config.RETRY_DELAY * 3)
+                    self.logger.warning(f"Rate limited (429) - backing off")
+                    if attempt < max_retries - 1:
+                        time.sleep(limiter.backoff_delay(attempt))
                 else:
                     self.logger.warning(f"Status {response.status_code} for {url}")
 
             except requests.exceptions.RequestException as e:
+                limiter.record_error()
                 self.logger.error(f"Request error for {url}: {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    time.sleep(limiter.backoff_delay(attempt))
 
         return None
 
@@ -95,7 +105,7 @@ class FirstMondayScraper:
         Returns list of issue metadata
         """
         self.logger.info("Fetching archive index...")
-        response = self.make_request(config.ARCHIVE_URL)
+        response = self.make_request(config.ARCHIVE_URL, use_cache=False)
 
         if not response:
             self.logger.error("Could not fetch archive page")
@@ -497,7 +507,8 @@ class FirstMondayScraper:
                 article_url = article_summary['url']
 
                 # Check if already processed
-                if article_url in self.checkpoint_data['processed_articles']:
+                self.frontier.add(article_url, 'article', item_id=article_url.rstrip('/').split('/')[-1])
+                if not self.frontier.claim(article_url):
                     self.logger.info(f"Skipping already processed: {article_url}")
                     continue
 
@@ -510,12 +521,12 @@ class FirstMondayScraper:
                     self.save_article_data(article_data)
                     total_articles += 1
 
-                    # Update checkpoint
-                    self.checkpoint_data['processed_articles'].append(article_url)
-                    self.save_checkpoint()
+                    # Update frontier
+                    self.frontier.complete(article_url)
 
                     self.logger.info(f"Successfully scraped article {article_data.get('article_id')}")
                 else:
+                    self.frontier.fail(article_url, 'Failed to parse article')
                     self.logger.warning(f"Failed to parse article: {article_url}")
 
         self.logger.info(f"Sample scrape complete! Processed {total_articles} articles")
@@ -533,7 +544,10 @@ def main():
     print("\nThis will scrape 1 issue with up to 3 articles for testing.")
     print("Check the 'data' directory for output files.\n")
 
-    scraper.scrape_sample(num_issues=1, num_articles_per_issue=3)
+    try:
+        scraper.scrape_sample(num_issues=1, num_articles_per_issue=3)
+    finally:
+        scraper.close()
 
     print("\n" + "="*60)
     print("Sample test complete!")
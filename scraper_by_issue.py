@@ -3,28 +3,97 @@ First Monday Scraper - Issue-by-Issue Mode
 Scrapes articles organized by issue for easier testing and review
 """
 
+import asyncio
 import requests
 import time
 import logging
 import json
 import os
 import re
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from bs4 import BeautifulSoup
+from async_fetcher import AsyncFetcher, FetchResult
+from frontier import CrawlFrontier, LeaseKeeper
+from html_parsers import parse_html
+from pipeline import ArticlePipeline
+from text_structure import extract_full_text
+from http_cache import ValidatorStore, get_response_cache
+from rate_limiter import get_rate_limiter
+from warc_writer import WarcWriter
 import config
 
+GALLEY_VIEW = re.compile(r'/article/view/(\d+)/(\d+)$')
+GALLEY_DOWNLOAD = re.compile(r'/article/download/\d+/\d+$')
+GALLEY_WRAPPER = re.compile(rb'<iframe[^>]+/article/download/')
+ARCHIVE_PAGINATION = re.compile(rb'class="[^"]*cmp_pagination')
+ARCHIVE_NEXT_LINK = re.compile(rb'<a[^>]+class="[^"]*\bnext\b')
+
 
 class IssueBasedScraper:
     """Scraper that organizes output by issue"""
 
-    def __init__(self):
+    def __init__(self, fetch_mode: str = config.FETCH_MODE, worker_id: Optional[str] = None):
+        self.worker_id = worker_id
         self.session = requests.Session()
         self.session.headers.update(config.HEADERS)
         self.setup_directories()
         self.setup_logging()
-        self.checkpoint_data = self.load_checkpoint()
+        self.frontier = self.load_frontier()
+        self.cache = get_response_cache()
+        self.validators = ValidatorStore()
+        if config.WARC_CAPTURE:
+            # Workers sharing a WARC directory each write their own files
+            self.warc = WarcWriter(prefix=f"firstmonday-{worker_id}") if worker_id else WarcWriter()
+        else:
+            self.warc = None
+        self.resolver_stats = {'resolved': 0, 'fallback': 0}
+        self.setup_fetcher(fetch_mode)
+
+    def setup_fetcher(self, fetch_mode: str):
+        """Set up the async fetch engine, or fall back to the synchronous requests path"""
+        self.fetch_mode = fetch_mode
+        self.fetcher = None
+        self.loop = None
+        self.pipeline = None
+
+        if fetch_mode == 'async':
+            if AsyncFetcher.available():
+                self.fetcher = AsyncFetcher(cache=self.cache)
+                self.loop = asyncio.new_event_loop()
+                self.pipeline = ArticlePipeline(self)
+            else:
+                self.logger.warning("aiohttp is not installed - falling back to synchronous fetching")
+                self.fetch_mode = 'sync'
+
+    def run_async(self, coro):
+        """Run a coroutine on the scraper's event loop"""
+        task = asyncio.ensure_future(coro, loop=self.loop)
+        try:
+            return self.loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            # Unwind the interrupted work so the loop can still be used to shut down cleanly
+            task.cancel()
+            try:
+                self.loop.run_until_complete(task)
+            except BaseException:
+                pass
+            raise
+
+    def close(self):
+        """Release network resources"""
+        if self.loop is not None:
+            self.run_async(self.fetcher.close())
+            self.loop.close()
+            self.loop = None
+        if self.pipeline is not None:
+            self.pipeline.close()
+        if self.warc:
+            self.warc.close()
+        self.frontier.close()
+        self.session.close()
 
     def setup_directories(self):
         """Create necessary output directories"""
@@ -43,24 +112,22 @@ class IssueBasedScraper:
         )
         self.logger = logging.getLogger(__name__)
 
-    def load_checkpoint(self) -> Dict:
-        """Load checkpoint data"""
-        if os.path.exists(config.CHECKPOINT_FILE):
-            try:
-                with open(config.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.warning(f"Could not load checkpoint: {e}")
-        return {"processed_issues": [], "processed_articles": [], "last_update": None}
-
-    def save_checkpoint(self):
-        """Save checkpoint data"""
-        self.checkpoint_data["last_update"] = datetime.now().isoformat()
-        try:
-            with open(config.CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.checkpoint_data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Could not save checkpoint: {e}")
+    def load_frontier(self) -> CrawlFrontier:
+        """Open the crawl frontier, importing checkpoint.json from older runs"""
+        frontier = CrawlFrontier()
+        frontier.migrate_checkpoint(config.CHECKPOINT_FILE)
+        frontier.recover()
+        return frontier
+
+    def is_issue_done(self, issue_id: str) -> bool:
+        return self.frontier.is_done('issue', issue_id)
+
+    def queue_articles(self, issue_id: str, articles: List[Dict]):
+        """Add an issue's articles to the frontier; the summary is kept for retries"""
+        self.frontier.add_many([
+            (a['url'], 'article', a['url'].split('/view/')[-1].split('/')[0], issue_id, 0, a)
+            for a in articles
+        ])
 
     def sanitize_filename(self, text: str) -> str:
         """Sanitize text for use in filenames"""
@@ -103,62 +170,239 @@ class IssueBasedScraper:
         self.logger.debug(f"Could not parse date: {date_str}")
         return None
 
-    def make_request(self, url: str, max_retries: int = config.MAX_RETRIES) -> Optional[requests.Response]:
-        """Make HTTP request with retry logic"""
+    def make_request(self, url: str, max_retries: int = config.MAX_RETRIES, use_cache: bool = True,
+                     conditional: bool = False, client_errors: bool = False) -> Optional[FetchResult]:
+        """
+        Make HTTP request with retry logic
+        With conditional=True the cache is bypassed, the stored validators are sent,
+        and the result's not_modified flag tells whether the page changed since the last fetch
+        With client_errors=True a 4xx answer (other than 403/429) is returned instead of None
+        """
+        if self.fetch_mode == 'async':
+            return self.run_async(self.fetch_async(url, use_cache=use_cache, conditional=conditional,
+                                                   max_retries=max_retries, client_errors=client_errors))
+
+        if self.cache and use_cache and not conditional:
+            cached = self.cache.get(url)
+            if cached:
+                return self.record_cache_hit(url, cached)
+
+        headers = self.validators.conditional_headers(url) if conditional else None
+        limiter = get_rate_limiter(url)
         for attempt in range(max_retries):
             try:
                 self.logger.debug(f"Requesting: {url}")
-                time.sleep(config.REQUEST_DELAY)
+                limiter.acquire()
 
-                response = self.session.get(url, timeout=config.REQUEST_TIMEOUT)
+                response = self.session.get(url, timeout=config.REQUEST_TIMEOUT, headers=headers)
+                limiter.record_response(response.status_code, response.elapsed.total_seconds(),
+                                        response.headers.get('Retry-After'))
 
-                if response.status_code == 200:
-                    return response
+                if response.status_code in [200, 304]:
+                    if self.cache and response.status_code == 200:
+                        self.cache.put(url, response)
+                    return self.record_response(url, FetchResult.from_response(response))
                 elif response.status_code in [403, 429]:
-                    self.logger.warning(f"Rate limited ({response.status_code}) - waiting longer")
-                    time.sleep(config.RETRY_DELAY * 2)
+                    self.logger.warning(f"Rate limited ({response.status_code}) - backing off")
+                    if attempt < max_retries - 1:
+                        time.sleep(limiter.backoff_delay(attempt))
+                elif client_errors and 400 <= response.status_code < 500:
+                    return self.record_response(url, FetchResult.from_response(response))
                 else:
                     self.logger.warning(f"Status {response.status_code} for {url}")
 
             except requests.exceptions.RequestException as e:
+                limiter.record_error()
                 self.logger.error(f"Request error for {url}: {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    time.sleep(limiter.backoff_delay(attempt))
 
         return None
 
+    async def fetch_async(self, url: str, use_cache: bool = True, conditional: bool = False,
+                          max_retries: Optional[int] = None, client_errors: bool = False) -> Optional[FetchResult]:
+        """Async counterpart of make_request"""
+        headers = self.validators.conditional_headers(url) if conditional else None
+        response = await self.fetcher.fetch(url, use_cache=use_cache and not conditional, headers=headers,
+                                            max_retries=max_retries, client_errors=client_errors)
+        if response is None:
+            return None
+        if response.from_cache:
+            return self.record_cache_hit(url, response)
+        return self.record_response(url, response)
+
+    def fetch_many(self, urls: List[str], conditional: bool = False) -> List[Optional[FetchResult]]:
+        """Fetch several URLs, concurrently in async mode"""
+        if self.fetch_mode == 'async':
+            async def fetch_all():
+                return await asyncio.gather(*(self.fetch_async(url, conditional=conditional) for url in urls))
+            return self.run_async(fetch_all())
+
+        return [self.make_request(url, conditional=conditional) for url in urls]
+
+    def record_response(self, url: str, response: FetchResult) -> FetchResult:
+        """Bookkeeping for every page that came from the network"""
+        response.not_modified = not self.validators.update(url, response)
+        if self.warc:
+            self.warc.write_response(url, response)
+        return response
+
+    def record_cache_hit(self, url: str, response: FetchResult) -> FetchResult:
+        """Pages from the response cache go into the WARC too, if they are not archived yet"""
+        if self.warc:
+            self.warc.write_cached(url, response)
+        return response
+
     def get_all_issues(self) -> List[Dict]:
         """Get all issues from all archive pages"""
         self.logger.info("Fetching all issues from archive...")
+        all_issues = list(self.iter_issues())
+        self.logger.info(f"Found {len(all_issues)} total issues")
+        return all_issues
+
+    def iter_issues(self, prefetch: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield issues newest-first as their archive pages arrive
+        A walk that reaches the end of the archive is saved as the cached archive index
+        """
         all_issues = []
+        pages = 0
+        for issues in self.iter_archive_pages(prefetch):
+            pages += 1
+            all_issues.extend(issues)
+            yield from issues
+        self.save_archive_index(all_issues, pages, self.archive_ended_on_empty_page)
+
+    def save_archive_index(self, issues: List[Dict], pages: int, ended_on_empty_page: bool):
+        """Cache the issue list for the crawl planner; the archive only grows, so never shrink it"""
+        index_file = Path(config.ARCHIVE_INDEX_FILE)
+        if index_file.exists():
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    if len(json.load(f).get('issues', [])) > len(issues):
+                        self.logger.warning("Archive walk found fewer issues than the cached index - keeping the cache")
+                        return
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.write_atomic(index_file, json.dumps({
+            'fetched': datetime.now().isoformat(),
+            'pages': pages,
+            'ended_on_empty_page': ended_on_empty_page,  # one more request than 'pages'
+            'issues': issues,
+        }, indent=2, ensure_ascii=False))
+
+    def iter_archive_pages(self, prefetch: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Yield the issues of each archive page in page order, stopping at the first empty page,
+        or after a page whose pagination has no next link
+        In async mode up to `prefetch` pages (default MAX_CONCURRENCY_PER_HOST) are fetched ahead
+        as tasks on the scraper's event loop, so they keep downloading while the caller scrapes
+        the issues already yielded. Page 1 is fetched alone, and no page is scheduled past one
+        known to be the last or past a prefetched page that came back empty. Beyond the page count
+        of the last complete walk, pages are fetched one at a time
+        Sets archive_ended_on_empty_page when the end was only found by fetching a page past it
+        """
+        self.archive_ended_on_empty_page = False
+        # The archive listing changes whenever an issue is published, so always go to the network
+        if self.fetch_mode != 'async':
+            for page_num in range(1, config.ARCHIVE_MAX_PAGES + 1):
+                self.logger.info(f"Fetching archive page {page_num}...")
+                response = self.make_request(self.archive_page_url(page_num), use_cache=False)
+                issues = self.parse_archive_page(page_num, response)
+                if issues is None:
+                    self.archive_ended_on_empty_page = True
+                    return
+                yield issues
+                if self.is_last_archive_page(response):
+                    return
+            return
+
+        window = prefetch or config.MAX_CONCURRENCY_PER_HOST
+        known_pages = self.cached_archive_pages()
+        last_page = config.ARCHIVE_MAX_PAGES
+        self.logger.info("Fetching archive page 1...")
+        pending = {1: self.loop.create_task(self.fetch_async(self.archive_page_url(1), use_cache=False))}
+        next_page = 2
+        try:
+            for page_num in range(1, config.ARCHIVE_MAX_PAGES + 1):
+                response = self.run_async(pending.pop(page_num))
+                issues = self.parse_archive_page(page_num, response)
+                if issues is None:
+                    self.archive_ended_on_empty_page = True
+                    return
+                if self.is_last_archive_page(response):
+                    # The pagination marks the end; pages prefetched past it won't be needed next time
+                    last_page = page_num
+                    self.archive_ended_on_empty_page = False
+
+                # A prefetched page that already came back empty (or failed) ends the archive
+                for num, task in pending.items():
+                    if num <= last_page and task.done() and not task.cancelled() and task.exception() is None \
+                            and self.archive_page_is_empty(task.result()):
+                        last_page = num - 1
+                        self.archive_ended_on_empty_page = True
+                        self.logger.info(f"Archive page {num} is past the end - not fetching further pages")
+
+                # Top up the window before handing the issues over, so pages download while they are scraped
+                while next_page <= last_page and len(pending) < window and \
+                        (known_pages is None or next_page <= known_pages or next_page == page_num + 1):
+                    self.logger.info(f"Fetching archive page {next_page}...")
+                    pending[next_page] = self.loop.create_task(
+                        self.fetch_async(self.archive_page_url(next_page), use_cache=False))
+                    next_page += 1
+
+                yield issues
+                if page_num >= last_page:
+                    return
+        finally:
+            # Pages past the end of the archive are not needed any more
+            for task in pending.values():
+                task.cancel()
+            if pending and self.loop is not None and not self.loop.is_running():
+                self.run_async(asyncio.gather(*pending.values(), return_exceptions=True))
+
+    def cached_archive_pages(self) -> Optional[int]:
+        """Number of archive pages found by the last complete walk, if there was one"""
+        try:
+            with open(config.ARCHIVE_INDEX_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f).get('pages') or None
+        except (OSError, json.JSONDecodeError):
+            return None
 
-        for page_num in range(1, 20):  # Check up to 20 pages
-            if page_num == 1:
-                url = config.ARCHIVE_URL
-            else:
-                url = f"{config.ARCHIVE_URL}/{page_num}"
+    def is_last_archive_page(self, response: FetchResult) -> bool:
+        """OJS paginates the archive; a pagination block without a next link marks the last page"""
+        return bool(ARCHIVE_PAGINATION.search(response.content)) and not ARCHIVE_NEXT_LINK.search(response.content)
 
-            self.logger.info(f"Fetching archive page {page_num}...")
-            response = self.make_request(url)
+    def archive_page_is_empty(self, response: Optional[FetchResult]) -> bool:
+        """Whether a fetched archive page would stop discovery (failed, or lists no issues)"""
+        return response is None or b'obj_issue_summary' not in response.content
 
-            if not response:
-                self.logger.warning(f"Could not fetch page {page_num}, stopping")
-                break
+    def archive_page_url(self, page_num: int) -> str:
+        if page_num == 1:
+            return config.ARCHIVE_URL
+        return f"{config.ARCHIVE_URL}/{page_num}"
 
-            soup = BeautifulSoup(response.content, 'lxml')
-            issue_divs = soup.find_all('div', class_='obj_issue_summary')
+    def parse_archive_page(self, page_num: int, response: Optional[FetchResult]) -> Optional[List[Dict]]:
+        """Parse the issue summaries of one archive page; None means discovery should stop"""
+        if not response:
+            self.logger.warning(f"Could not fetch page {page_num}, stopping")
+            return None
 
-            if not issue_divs:
-                self.logger.info(f"No issues on page {page_num}, stopping")
-                break
+        soup = BeautifulSoup(response.content, 'lxml')
+        issue_divs = soup.find_all('div', class_='obj_issue_summary')
 
-            for div in issue_divs:
-                issue_data = self.parse_issue_summary(div)
-                if issue_data:
-                    all_issues.append(issue_data)
+        if not issue_divs:
+            self.logger.info(f"No issues on page {page_num}, stopping")
+            return None
 
-        self.logger.info(f"Found {len(all_issues)} total issues")
-        return all_issues
+        issues = []
+        for div in issue_divs:
+            issue_data = self.parse_issue_summary(div)
+            if issue_data:
+                issues.append(issue_data)
+        return issues
 
     def parse_issue_summary(self, issue_div) -> Optional[Dict]:
         """Parse issue summary from archive page"""
@@ -212,7 +456,10 @@ class IssueBasedScraper:
         if not response:
             return []
 
-        soup = BeautifulSoup(response.content, 'lxml')
+        return self.parse_issue_page(BeautifulSoup(response.content, 'lxml'))
+
+    def parse_issue_page(self, soup) -> List[Dict]:
+        """Parse the article listing of an issue page"""
         articles = []
 
         article_divs = soup.find_all('div', class_='obj_article_summary')
@@ -267,13 +514,60 @@ class IssueBasedScraper:
 
     def parse_article(self, article_url: str) -> Optional[Dict]:
         """Parse article and extract metadata and full text"""
-        response = self.make_request(article_url)
+        # Failed articles are retried later from the retry queue, not by sleeping here
+        response = self.make_request(article_url, max_retries=config.ARTICLE_FETCH_ATTEMPTS)
 
         if not response:
             return None
 
-        soup = BeautifulSoup(response.content, 'lxml')
+        return self.parse_article_page(article_url, response)
+
+    def parse_article_page(self, article_url: str, response: FetchResult, use_cache: bool = True) -> Dict:
+        """Extract metadata from a fetched landing page and follow it to the full text"""
+        article_data, galley_url = self.parse_landing_page(article_url, response.content)
 
+        # Get full text
+        if config.EXTRACT_FULL_TEXT:
+            document = self.fetch_full_text_document(galley_url, use_cache) if galley_url else None
+            self.add_full_text(article_data, galley_url, *(extract_full_text(*document) if document else ('', 0)))
+
+        return article_data
+
+    def parse_landing_page(self, article_url: str, content: bytes):
+        """Return the article record and HTML galley URL found on a landing page"""
+        fields = parse_html(content).landing_fields()
+        return self.build_article_data(article_url, fields), self.find_html_galley_url(fields, article_url)
+
+    async def fetch_article_async(self, article_url: str) -> Optional[Dict]:
+        """
+        Pipeline fetch stage: the landing page and the document holding the full text
+        Pages are parsed in the pipeline's parse pool, never on the event loop
+        """
+        response = await self.fetch_async(article_url, max_retries=config.ARTICLE_FETCH_ATTEMPTS)
+
+        if not response:
+            return None
+
+        article_data, galley_url = await self.pipeline.in_parse_pool(
+            self.parse_landing_page, article_url, response.content)
+
+        document = None
+        if config.EXTRACT_FULL_TEXT and galley_url:
+            document = await self.fetch_full_text_document_async(galley_url)
+
+        return {'article_data': article_data, 'galley_url': galley_url, 'document': document}
+
+    def finish_article(self, fetched: Dict, extracted: Optional[Tuple] = None) -> Dict:
+        """Pipeline parse stage: attach the (full text, word count, structure) extracted from a fetched article's document"""
+        article_data = fetched['article_data']
+
+        if config.EXTRACT_FULL_TEXT:
+            self.add_full_text(article_data, fetched['galley_url'], *(extracted or ('', 0)))
+
+        return article_data
+
+    def build_article_data(self, article_url: str, fields: Dict) -> Dict:
+        """Build the article record from the fields of a landing page (see html_parsers.py)"""
         article_id = article_url.split('/view/')[-1].split('/')[0] if '/view/' in article_url else None
 
         article_data = {
@@ -283,24 +577,33 @@ class IssueBasedScraper:
         }
 
         # Extract metadata
-        article_data.update(self.extract_meta_tags(soup))
-        article_data.update(self.extract_article_content(soup))
+        article_data.update(self.extract_meta_tags(fields['meta']))
+        article_data.update(self.extract_article_content(fields))
 
-        # Get full text
-        if config.EXTRACT_FULL_TEXT:
-            galley_url = self.find_html_galley_url(soup, article_url)
-            if galley_url:
-                article_data['full_text'] = self.extract_full_text_from_galley(galley_url)
-                article_data['galley_url'] = galley_url
-            else:
-                article_data['full_text'] = ''
-
-            article_data['word_count'] = len(article_data['full_text'].split()) if article_data.get('full_text') else 0
+        dublin_core = self.extract_dublin_core(fields['meta'])
+        if dublin_core:
+            article_data['dublin_core'] = dublin_core
+            # Same last resort as add_abstracts.py
+            if not article_data.get('abstract') and dublin_core.get('DC.Description'):
+                article_data['abstract'] = dublin_core['DC.Description'][0]
 
         return article_data
 
-    def extract_meta_tags(self, soup) -> Dict:
-        """Extract metadata from HTML meta tags"""
+    def add_full_text(self, article_data: Dict, galley_url: Optional[str], full_text: str,
+                      word_count: Optional[int] = None, structure: Optional[Dict] = None):
+        """Attach full text, galley URL, word count and full text structure to an article record"""
+        article_data['full_text'] = full_text
+        if galley_url:
+            article_data['galley_url'] = galley_url
+
+        if word_count is None:
+            word_count = len(full_text.split()) if full_text else 0
+        article_data['word_count'] = word_count
+        if structure and full_text:
+            article_data['full_text_structure'] = structure
+
+    def extract_meta_tags(self, meta: Dict[str, List[str]]) -> Dict:
+        """Extract metadata from HTML meta tags (content values by meta name)"""
         meta_data = {}
 
         meta_mappings = {
@@ -316,100 +619,170 @@ class IssueBasedScraper:
         }
 
         for meta_name, field_name in meta_mappings.items():
-            meta_tags = soup.find_all('meta', attrs={'name': meta_name})
+            contents = meta.get(meta_name)
 
-            if meta_tags:
+            if contents:
                 if field_name in ['authors', 'keywords']:
-                    meta_data[field_name] = [tag.get('content') for tag in meta_tags if tag.get('content')]
+                    meta_data[field_name] = [content for content in contents if content]
                 else:
-                    meta_data[field_name] = meta_tags[0].get('content', '')
+                    meta_data[field_name] = contents[0]
 
         return meta_data
 
-    def extract_article_content(self, soup) -> Dict:
+    def extract_dublin_core(self, meta: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """All DC.* meta tags, non-empty values only"""
+        dublin_core = {}
+        for name, contents in meta.items():
+            values = [content.strip() for content in contents if content and content.strip()]
+            if name.startswith('DC.') and values:
+                dublin_core[name] = values
+        return dublin_core
+
+    def extract_article_content(self, fields: Dict) -> Dict:
         """Extract article content from page structure"""
         content_data = {}
 
-        title_tag = soup.find('h1', class_='page_title')
-        if title_tag:
-            content_data['title'] = title_tag.get_text(strip=True)
-
-        authors_div = soup.find('div', class_='authors')
-        if authors_div:
-            author_links = authors_div.find_all('a')
-            if author_links:
-                content_data['authors'] = [a.get_text(strip=True) for a in author_links]
-
-        abstract_div = soup.find('div', class_='item abstract')
-        if abstract_div:
-            content_data['abstract'] = abstract_div.get_text(strip=True)
+        if 'title' in fields:
+            content_data['title'] = fields['title']
+        if fields.get('authors'):
+            content_data['authors'] = fields['authors']
+        if 'abstract' in fields:
+            content_data['abstract'] = fields['abstract']
 
         return content_data
 
-    def find_html_galley_url(self, soup, article_url: str) -> Optional[str]:
+    def find_html_galley_url(self, fields: Dict, article_url: str) -> Optional[str]:
         """Find HTML galley URL"""
-        html_link = soup.find('a', string=lambda x: x and 'HTML' in x.upper())
-
-        if not html_link:
-            html_link = soup.find('a', class_='obj_galley_link')
+        galley_url = fields['galley_href']
 
-        if not html_link:
-            fulltext_meta = soup.find('meta', attrs={'name': 'citation_fulltext_html_url'})
+        if galley_url is None:
+            fulltext_meta = fields['meta'].get('citation_fulltext_html_url')
             if fulltext_meta:
-                return fulltext_meta.get('content')
+                return fulltext_meta[0] or None
 
-        if html_link:
-            galley_url = html_link.get('href')
-            if galley_url:
-                if not galley_url.startswith('http'):
-                    galley_url = config.BASE_URL + galley_url
-                return galley_url
+        if galley_url:
+            if not galley_url.startswith('http'):
+                galley_url = config.BASE_URL + galley_url
+            return galley_url
 
         return None
 
-    def extract_full_text_from_galley(self, galley_url: str) -> str:
-        """Extract full text from galley page"""
+    def fetch_full_text_document(self, galley_url: str, use_cache: bool = True):
+        """
+        Fetch the document holding an article's full text
+        Returns ('download', content) for the article document, ('galley', content) for the
+        galley page fallback, or None
+        """
+        download_url = self.resolve_download_url(galley_url)
+        if download_url:
+            # A wrong guess costs one request, so don't retry it
+            response = self.make_request(download_url, max_retries=1, use_cache=use_cache, client_errors=True)
+            if self.check_resolved_response(download_url, response):
+                return 'download', response.content
+
         self.logger.debug(f"Fetching full text from galley: {galley_url}")
-        response = self.make_request(galley_url)
+        response = self.make_request(galley_url, max_retries=config.ARTICLE_FETCH_ATTEMPTS, use_cache=use_cache)
 
         if not response:
-            return ''
+            return None
 
-        soup = BeautifulSoup(response.content, 'lxml')
+        iframe_src = self.find_iframe_src(parse_html(response.content))
+        if iframe_src:
+            iframe_response = self.make_request(iframe_src, max_retries=config.ARTICLE_FETCH_ATTEMPTS,
+                                                use_cache=use_cache)
+            if iframe_response:
+                return 'download', iframe_response.content
+
+        return 'galley', response.content
+
+    async def fetch_full_text_document_async(self, galley_url: str):
+        """
+        Async counterpart of fetch_full_text_document
+        """
+        download_url = self.resolve_download_url(galley_url)
+        if download_url:
+            response = await self.fetch_async(download_url, max_retries=1, client_errors=True)
+            if self.check_resolved_response(download_url, response):
+                return 'download', response.content
+
+        self.logger.debug(f"Fetching full text from galley: {galley_url}")
+        response = await self.fetch_async(galley_url, max_retries=config.ARTICLE_FETCH_ATTEMPTS)
+
+        if not response:
+            return None
 
-        # Check for iframe
-        iframe = soup.find('iframe')
-        if iframe:
-            iframe_src = iframe.get('src')
-            if iframe_src:
-                iframe_src = iframe_src.strip()
+        iframe_src = await self.pipeline.in_parse_pool(
+            lambda: self.find_iframe_src(parse_html(response.content)))
+        if iframe_src:
+            iframe_response = await self.fetch_async(iframe_src, max_retries=config.ARTICLE_FETCH_ATTEMPTS)
+            if iframe_response:
+                return 'download', iframe_response.content
 
-                if not iframe_src.startswith('http'):
-                    iframe_src = config.BASE_URL + iframe_src
+        return 'galley', response.content
 
-                self.logger.debug(f"Content in iframe: {iframe_src}")
+    def resolve_download_url(self, galley_url: str) -> Optional[str]:
+        """
+        Predict the URL the galley page would load in its iframe, so the galley page can be skipped
+        OJS serves HTML galleys at /article/download/{id}/{galley} for /article/view/{id}/{galley}
+        """
+        if not config.RESOLVE_DOWNLOAD_URLS or self.resolver_disabled():
+            return None
 
-                iframe_response = self.make_request(iframe_src)
-                if iframe_response:
-                    iframe_soup = BeautifulSoup(iframe_response.content, 'lxml')
+        if GALLEY_DOWNLOAD.search(galley_url):
+            return galley_url
 
-                    for element in iframe_soup(['script', 'style', 'nav', 'header', 'footer']):
-                        element.decompose()
+        match = GALLEY_VIEW.search(galley_url)
+        if match:
+            return f"{galley_url[:match.start()]}/article/download/{match.group(1)}/{match.group(2)}"
 
-                    return iframe_soup.get_text(separator='\n', strip=True)
+        return None
 
-        # Fallback: direct extraction
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'iframe']):
-            element.decompose()
+    def resolver_disabled(self) -> bool:
+        """Stop guessing for the rest of the run if the URL pattern turns out not to hold"""
+        attempts = self.resolver_stats['resolved'] + self.resolver_stats['fallback']
+        return attempts >= 10 and self.resolver_stats['fallback'] > self.resolver_stats['resolved']
 
-        content = soup.find('div', id='htmlContainer') or soup.find('body')
-        if content:
-            return content.get_text(separator='\n', strip=True)
+    def check_resolved_response(self, download_url: str, response: Optional[FetchResult]) -> bool:
+        """
+        Accept a directly fetched download only if it is the article document itself
+        Only answers showing the guess was wrong (a 4xx, a galley wrapper, something that is neither
+        HTML nor PDF) count against the resolver; timeouts and 5xx say nothing about the URL pattern
+        """
+        if response is None:
+            self.logger.debug(f"Could not fetch resolved URL {download_url} - falling back to galley page")
+            return False
+
+        content_type = response.headers.get('Content-Type', 'text/html')
+        ok = response.status_code == 200 and 'html' in content_type and not GALLEY_WRAPPER.search(response.content)
+        if not ok and response.status_code == 200 and 'pdf' in content_type:
+            # The right document, just not one we extract text from
+            self.logger.debug(f"Resolved URL {download_url} is a PDF - falling back to galley page")
+            return False
+
+        was_disabled = self.resolver_disabled()
+        self.resolver_stats['resolved' if ok else 'fallback'] += 1
+        if not ok:
+            self.logger.debug(f"Could not use resolved URL {download_url} - falling back to galley page")
+            if self.resolver_disabled() and not was_disabled:
+                self.logger.warning("Download URL resolution keeps failing - disabled for this run")
+        return ok
+
+    def find_iframe_src(self, page) -> Optional[str]:
+        """Find the absolute URL of the iframe holding the galley content"""
+        iframe_src = page.iframe_src()
+        if iframe_src:
+            iframe_src = iframe_src.strip()
+
+            if not iframe_src.startswith('http'):
+                iframe_src = config.BASE_URL + iframe_src
+
+            self.logger.debug(f"Content in iframe: {iframe_src}")
+            return iframe_src
 
-        return ''
+        return None
 
-    def save_issue_data(self, issue_info: Dict, articles_data: List[Dict]):
-        """Save all data for an issue in organized folder structure"""
+    def get_issue_dirs(self, issue_info: Dict):
+        """Create and return (folder name, full text dir, metadata dir) for an issue"""
         # Create folder name from issue date in YYYYMMDD format
         date_str = issue_info.get('date', 'unknown')
         volume = issue_info.get('volume', 'unknown')
@@ -436,7 +809,17 @@ class IssueBasedScraper:
         issue_metadata_dir = metadata_base / folder_date
         issue_metadata_dir.mkdir(exist_ok=True)
 
-        # Save issue summary
+        return folder_date, issue_fulltext_dir, issue_metadata_dir
+
+    def write_atomic(self, path: Path, text: str):
+        """Write a file via a temp file and rename, so readers never see a partial file"""
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def save_issue_info(self, issue_info: Dict, issue_metadata_dir: Path, article_count: int):
+        """Write issue_info.json once all articles of the issue have been handled"""
         issue_summary = {
             'issue_id': issue_info['issue_id'],
             'title': issue_info['title'],
@@ -445,96 +828,330 @@ class IssueBasedScraper:
             'date': issue_info.get('date'),
             'url': issue_info['url'],
             'description': issue_info.get('description', ''),
-            'article_count': len(articles_data),
+            'article_count': article_count,
             'scraped_date': datetime.now().isoformat()
         }
 
         summary_file = issue_metadata_dir / 'issue_info.json'
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(issue_summary, f, indent=2, ensure_ascii=False)
-
-        # Save each article
-        for article_data in articles_data:
-            article_id = article_data.get('article_id', 'unknown')
-
-            # Create safe filename from title
-            title = article_data.get('title', f'article_{article_id}')
-            safe_title = self.sanitize_filename(title)
-            filename_base = f"{article_id}_{safe_title}"
-
-            # Save metadata
-            metadata = {k: v for k, v in article_data.items() if k != 'full_text'}
-            metadata_file = issue_metadata_dir / f"{filename_base}.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-
-            # Save full text to Full Text folder
-            if article_data.get('full_text'):
-                fulltext_file = issue_fulltext_dir / f"{filename_base}.txt"
-                with open(fulltext_file, 'w', encoding='utf-8') as f:
-                    f.write(article_data['full_text'])
-
-        self.logger.info(f"Saved {len(articles_data)} articles to Full Text/{folder_date}/")
-
-    def scrape_single_issue(self, issue_info: Dict) -> Dict:
-        """Scrape a single issue and return statistics"""
+        self.write_atomic(summary_file, json.dumps(issue_summary, indent=2, ensure_ascii=False))
+
+    def save_article_files(self, issue_fulltext_dir: Path, issue_metadata_dir: Path, article_data: Dict):
+        """Write one article's metadata JSON and full text file"""
+        article_id = article_data.get('article_id', 'unknown')
+
+        # Create safe filename from title
+        title = article_data.get('title', f'article_{article_id}')
+        safe_title = self.sanitize_filename(title)
+        filename_base = f"{article_id}_{safe_title}"
+
+        # Save full text to Full Text folder
+        if article_data.get('full_text'):
+            fulltext_file = issue_fulltext_dir / f"{filename_base}.txt"
+            self.write_atomic(fulltext_file, article_data['full_text'])
+
+        # Save metadata last, so a metadata file always has its full text next to it
+        metadata = {k: v for k, v in article_data.items() if k != 'full_text'}
+        metadata_file = issue_metadata_dir / f"{filename_base}.json"
+        self.write_atomic(metadata_file, json.dumps(metadata, indent=2, ensure_ascii=False))
+
+    def commit_article(self, issue_dirs, article_url: str, article_data: Optional[Dict]) -> Dict:
+        """
+        Save a finished article and mark it done in the frontier straight away
+        Returns a small outcome record, so the article itself can be dropped from memory
+        """
+        if not self.is_successful(article_data):
+            error = 'Fetch failed' if article_data is None else 'No full text extracted'
+            delay = self.frontier.defer(article_url, error)
+            if delay is None:
+                self.logger.warning(f"  Giving up on {article_url} after {config.RETRY_MAX_ATTEMPTS} attempts")
+            else:
+                self.logger.info(f"  Queued for retry in {delay:.0f}s: {article_url}")
+            return {'success': False, 'words': 0}
+
+        _, issue_fulltext_dir, issue_metadata_dir = issue_dirs
+        self.save_article_files(issue_fulltext_dir, issue_metadata_dir, article_data)
+        self.frontier.complete(article_url)
+        return {'success': True, 'words': article_data.get('word_count', 0)}
+
+    def is_successful(self, article_data: Optional[Dict]) -> bool:
+        """An article counts as scraped when it has full text"""
+        return bool(article_data) and article_data.get('word_count', 0) > 0
+
+    def log_article_result(self, index: int, total: int, article_summary: Dict, article_data: Optional[Dict]):
+        """Log the outcome of a single article"""
+        self.logger.info(f"\n[{index}/{total}] {article_summary['title'][:60]}...")
+        if self.is_successful(article_data):
+            self.logger.info(f"  [OK] {article_data.get('word_count', 0)} words")
+        else:
+            self.logger.warning(f"  [FAIL] Extraction failed")
+
+    def scrape_single_issue(self, issue_info: Dict, leased: bool = False) -> Dict:
+        """
+        Scrape a single issue and return statistics
+        leased: the issue was already leased to this worker from the frontier (distributed mode)
+        """
         self.logger.info(f"\n{'='*60}")
         self.logger.info(f"Scraping: {issue_info['title']}")
         self.logger.info(f"URL: {issue_info['url']}")
         self.logger.info(f"{'='*60}")
 
         # Check if already processed
-        if issue_info['issue_id'] in self.checkpoint_data['processed_issues']:
+        if self.is_issue_done(issue_info['issue_id']):
             self.logger.info("Issue already processed (skipping)")
             return {'skipped': True}
 
+        if not leased:
+            self.frontier.add(issue_info['url'], 'issue', item_id=issue_info['issue_id'], payload=issue_info)
+        if not leased and not self.frontier.claim(issue_info['url'], self.worker_id):
+            self.logger.info("Issue is already being scraped (skipping)")
+            return {'skipped': True}
+
         # Get articles
         articles = self.get_articles_from_issue(issue_info['url'])
         self.logger.info(f"Found {len(articles)} articles in issue")
 
         if not articles:
+            self.frontier.fail(issue_info['url'], 'No articles found')
             return {'error': 'No articles found', 'article_count': 0}
 
-        # Scrape each article
-        articles_data = []
-        success_count = 0
-        failed_count = 0
+        # Articles saved by an interrupted earlier run are already done and are not claimed again,
+        # nor are articles still waiting out their retry back-off.
+        # A worker's article claims are leased, and renewed along with the issue's lease
+        self.queue_articles(issue_info['issue_id'], articles)
+        if leased:
+            # Whoever held the lease before us is gone; its unfinished articles are ours now
+            self.frontier.requeue_children(issue_info['issue_id'])
+        todo = [a for a in articles if self.frontier.claim(a['url'], self.worker_id)]
+        if len(todo) < len(articles):
+            self.logger.info(f"Resuming issue: {len(articles) - len(todo)} articles already saved or waiting to be retried")
 
-        for i, article_summary in enumerate(articles, 1):
-            self.logger.info(f"\n[{i}/{len(articles)}] {article_summary['title'][:60]}...")
+        issue_dirs = self.get_issue_dirs(issue_info)
+        folder_date, issue_fulltext_dir, issue_metadata_dir = issue_dirs
+
+        outcomes = self.scrape_articles(todo, issue_dirs)
+        success_count = self.finalize_issue(issue_info, issue_dirs)
+
+        stats = {
+            'issue_id': issue_info['issue_id'],
+            'title': issue_info['title'],
+            'total_articles': len(articles),
+            'successful': success_count,
+            'failed': len(articles) - success_count,
+            'deferred': self.frontier.count_children(issue_info['issue_id'], 'retry'),
+            'total_words': sum(o['words'] for o in outcomes)
+        }
 
+        self.logger.info(f"\nIssue complete: {success_count}/{len(articles)} articles scraped")
+        if stats['deferred']:
+            self.logger.info(f"{stats['deferred']} articles queued for retry")
+        return stats
+
+    def scrape_articles(self, articles: List[Dict], issue_dirs) -> List[Dict]:
+        """Scrape claimed articles; each is written and checkpointed as soon as it is parsed"""
+        if self.fetch_mode == 'async':
+            return self.run_async(self.pipeline.run(articles, issue_dirs))
+
+        outcomes = []
+        for i, article_summary in enumerate(articles, 1):
             article_data = self.parse_article(article_summary['url'])
+            self.log_article_result(i, len(articles), article_summary, article_data)
+            outcomes.append(self.commit_article(issue_dirs, article_summary['url'], article_data))
+        return outcomes
+
+    def finalize_issue(self, issue_info: Dict, issue_dirs) -> int:
+        """Write issue_info.json and mark the issue done if any article was saved"""
+        folder_date, issue_fulltext_dir, issue_metadata_dir = issue_dirs
+        success_count = self.frontier.count_children(issue_info['issue_id'], 'done')
+
+        if success_count:
+            self.save_issue_info(issue_info, issue_metadata_dir, success_count)
+            self.frontier.complete(issue_info['url'])
+            self.logger.info(f"Saved {success_count} articles to Full Text/{folder_date}/")
+        else:
+            self.frontier.fail(issue_info['url'], 'No articles scraped')
+            for directory in (issue_fulltext_dir, issue_metadata_dir):
+                if not any(directory.iterdir()):
+                    directory.rmdir()
 
-            if article_data and article_data.get('word_count', 0) > 0:
-                articles_data.append(article_data)
-                success_count += 1
-                self.logger.info(f"  [OK] {article_data.get('word_count', 0)} words")
-            else:
+        return success_count
+
+    def retry_articles(self, rows: List[Dict], ignore_backoff: bool = False) -> Dict:
+        """
+        Re-scrape articles from the retry queue, grouped by issue, and update their issues
+        Articles not tied to an issue (legacy scraper.py, checkpoint imports) have nowhere to be
+        saved and are failed for good instead
+        """
+        totals = {'retried': 0, 'successful': 0, 'deferred': 0, 'given_up': 0}
+        by_issue: Dict[str, List[Dict]] = {}
+        for row in rows:
+            if row['parent'] is None:
+                self.frontier.fail(row['url'], 'Not tied to an issue - rescrape its issue to retry it')
+                totals['given_up'] += 1
+                continue
+            by_issue.setdefault(row['parent'], []).append(row)
+        if totals['given_up']:
+            self.logger.warning(f"{totals['given_up']} articles without an issue cannot be retried - marked failed")
+
+        for issue_id, issue_rows in by_issue.items():
+            issue = self.frontier.get_item('issue', issue_id)
+            if not issue or not issue['payload']:
+                self.logger.warning(f"Cannot retry articles of unknown issue {issue_id}")
+                continue
+            issue_info = issue['payload']
+
+            todo = [row['payload'] or {'url': row['url'], 'title': row['url']} for row in issue_rows
+                    if self.frontier.claim(row['url'], self.worker_id, ignore_backoff=ignore_backoff)]
+            if not todo:
+                continue
+
+            self.logger.info(f"Retrying {len(todo)} articles of {issue_info['title']}")
+            issue_dirs = self.get_issue_dirs(issue_info)
+            # No issue lease covers these articles, so a worker renews their own leases
+            keeper = LeaseKeeper(self.frontier, [a['url'] for a in todo], self.worker_id) if self.worker_id \
+                else nullcontext()
+            with keeper:
+                outcomes = self.scrape_articles(todo, issue_dirs)
+            self.finalize_issue(issue_info, issue_dirs)
+
+            totals['retried'] += len(todo)
+            totals['successful'] += sum(1 for o in outcomes if o['success'])
+            for summary in todo:
+                state = self.frontier.get(summary['url'])['state']
+                if state == 'retry':
+                    totals['deferred'] += 1
+                elif state == 'failed':
+                    totals['given_up'] += 1
+
+        return totals
+
+    def retry_due_articles(self, opportunistic: bool = False) -> Optional[Dict]:
+        """
+        Retry the articles whose back-off has passed
+        opportunistic: only a small batch, and only if the rate limiter has budget to spare right now
+        """
+        if opportunistic and not get_rate_limiter(config.BASE_URL).has_budget():
+            return None
+        rows = self.frontier.due('article', limit=config.RETRY_BATCH_SIZE if opportunistic else None)
+        return self.retry_articles(rows) if rows else None
+
+    def drain_retry_queue(self, max_wait: Optional[float] = None) -> Dict:
+        """
+        End of run: retry queued articles as they come due
+        Waits at most max_wait seconds for a back-off to pass; anything later stays queued for the next run
+        """
+        max_wait = config.RETRY_DRAIN_MAX_WAIT if max_wait is None else max_wait
+        deadline = time.time() + max_wait
+        totals = {'retried': 0, 'successful': 0, 'deferred': 0, 'given_up': 0}
+
+        while True:
+            rows = self.frontier.due('article')
+            if rows:
+                result = self.retry_articles(rows)
+                for key in ('retried', 'successful', 'given_up'):
+                    totals[key] += result[key]
+                if result['retried']:
+                    continue
+                break
+
+            next_retry = self.frontier.next_retry_time('article')
+            if next_retry is None or next_retry > deadline:
+                break
+            wait = max(0.0, next_retry - time.time())
+            self.logger.info(f"Waiting {wait:.0f}s for the next article retry")
+            time.sleep(wait)
+
+        totals['deferred'] = self.frontier.count('article', 'retry')
+        return totals
+
+    def retry_failed(self) -> Dict:
+        """
+        Re-scrape every article in the retry queue or failed for good, ignoring back-off times
+        Failed articles without an issue stay failed; there is nothing to re-scrape them into
+        """
+        rows = self.frontier.items('article', 'retry') + \
+            [row for row in self.frontier.items('article', 'failed') if row['parent'] is not None]
+        return self.retry_articles(rows, ignore_backoff=True)
+
+    def recrawl_issue(self, issue_info: Dict) -> Dict:
+        """
+        Refresh an already-scraped issue with conditional requests
+        Pages answering 304 (or with an unchanged content hash) are neither re-parsed nor re-written
+        Every known landing page is checked, since editing an article (abstract, DOI ...) leaves the
+        issue page as it was; the issue page only tells whether there are new articles to look for
+        """
+        self.logger.info(f"Recrawling: {issue_info['title']}")
+
+        response = self.make_request(issue_info['url'], conditional=True)
+        if not response:
+            return {'error': 'Could not fetch issue page'}
+
+        _, issue_fulltext_dir, issue_metadata_dir = self.get_issue_dirs(issue_info)
+        if response.not_modified:
+            articles = self.known_articles(issue_info['issue_id'], issue_metadata_dir)
+            self.logger.info(f"  Issue page unchanged; checking {len(articles)} known articles")
+        else:
+            articles = self.parse_issue_page(BeautifulSoup(response.content, 'lxml'))
+        landing_pages = self.fetch_many([a['url'] for a in articles], conditional=True)
+
+        unchanged_count = 0
+        updated = []
+        failed_count = 0
+
+        for article_summary, landing in zip(articles, landing_pages):
+            if landing and landing.not_modified:
+                unchanged_count += 1
+                continue
+
+            article_data = self.parse_article_page(article_summary['url'], landing, use_cache=False) if landing else None
+            if not self.is_successful(article_data):
                 failed_count += 1
-                self.logger.warning(f"  [FAIL] Extraction failed")
+                self.logger.warning(f"  [FAIL] {article_summary['url']}")
+                continue
 
-        # Save issue data
-        if articles_data:
-            self.save_issue_data(issue_info, articles_data)
+            # A changed title changes the file name; drop the stale copies first
+            for stale in list(issue_metadata_dir.glob(f"{article_data['article_id']}_*.json")) + \
+                    list(issue_fulltext_dir.glob(f"{article_data['article_id']}_*.txt")):
+                stale.unlink()
+            self.save_article_files(issue_fulltext_dir, issue_metadata_dir, article_data)
+            updated.append(article_data)
+            self.logger.info(f"  [UPDATED] {article_data.get('title', '')[:60]}")
 
-            # Update checkpoint
-            self.checkpoint_data['processed_issues'].append(issue_info['issue_id'])
-            for article in articles_data:
-                if article['url'] not in self.checkpoint_data['processed_articles']:
-                    self.checkpoint_data['processed_articles'].append(article['url'])
-            self.save_checkpoint()
+        self.queue_articles(issue_info['issue_id'], articles)
+        self.frontier.complete_many([a['url'] for a in updated])
 
-        stats = {
+        return {
             'issue_id': issue_info['issue_id'],
             'title': issue_info['title'],
             'total_articles': len(articles),
-            'successful': success_count,
+            'issue_page_unchanged': response.not_modified,
+            'unchanged': unchanged_count == len(articles),
+            'unchanged_articles': unchanged_count,
+            'updated': len(updated),
             'failed': failed_count,
-            'total_words': sum(a.get('word_count', 0) for a in articles_data)
         }
 
-        self.logger.info(f"\nIssue complete: {success_count}/{len(articles)} articles scraped")
-        return stats
+    def known_articles(self, issue_id: str, issue_metadata_dir: Path) -> List[Dict]:
+        """
+        Article summaries of an already-scraped issue, without fetching its issue page: its articles
+        in the frontier, plus any saved article the frontier doesn't tie to the issue (checkpoint imports)
+        """
+        articles = [row['payload'] or {'url': row['url'], 'title': row['url']}
+                    for row in self.frontier.children(issue_id, 'article')]
+        known = {a['url'] for a in articles}
+
+        for metadata_file in sorted(issue_metadata_dir.glob('*.json')):
+            if metadata_file.name == 'issue_info.json':
+                continue
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if metadata.get('url') and metadata['url'] not in known:
+                known.add(metadata['url'])
+                articles.append({'url': metadata['url'], 'title': metadata.get('title') or metadata['url']})
+
+        return articles
 
 
 def main():
@@ -544,7 +1161,14 @@ def main():
     print("="*60 + "\n")
 
     scraper = IssueBasedScraper()
+    try:
+        run_interactive(scraper)
+    finally:
+        scraper.close()
+
 
+def run_interactive(scraper: IssueBasedScraper):
+    """Menu-driven scraping session"""
     # Get all issues
     all_issues = scraper.get_all_issues()
 
@@ -0,0 +1,273 @@
+"""
+Corpus-wide boilerplate line stripper
+Counts in how many articles each full text line occurs (count-min sketch over line hashes, so
+memory stays fixed however big the corpus is), then writes a copy of the corpus without the
+lines found in too many articles, with word counts and full_text_structure offsets updated,
+plus a report of what was removed
+"""
+
+import argparse
+import json
+import re
+import shutil
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+DIGITS = re.compile(r'\d+')
+
+
+class CountMinSketch:
+    """
+    Approximate counts of 64-bit keys in depth x width 32-bit counters
+    Never undercounts; conservative update keeps the overcount from hash collisions small
+    """
+
+    def __init__(self, width: int = 2 ** 20, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def cells(self, key: int) -> List[int]:
+        # Double hashing: the two 32-bit halves of the key give every row its own index
+        low, high = key & 0xFFFFFFFF, (key >> 32) | 1
+        return [(low + i * high) % self.width for i in range(self.depth)]
+
+    def add(self, key: int):
+        cells = self.cells(key)
+        new = min(row[c] for row, c in zip(self.rows, cells)) + 1
+        for row, c in zip(self.rows, cells):
+            if row[c] < new:
+                row[c] = new
+
+    def estimate(self, key: int) -> int:
+        return min(row[c] for row, c in zip(self.rows, self.cells(key)))
+
+    def memory_bytes(self) -> int:
+        return 4 * self.width * self.depth
+
+
+def normalize_line(line: str) -> str:
+    """Lines that differ only in case, spacing or numbers (years, volume numbers) count as one"""
+    return DIGITS.sub('0', ' '.join(line.split()).casefold())
+
+
+def line_key(line: str) -> int:
+    return int.from_bytes(blake2b(normalize_line(line).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def iter_articles(articles_dir: Path) -> Iterator[Tuple[Path, Dict]]:
+    """(path, record) of every article JSON under the corpus directory, one at a time"""
+    for path in sorted(articles_dir.rglob('*.json')):
+        if path.name == 'issue_info.json':
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield path, json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"  Skipping unreadable {path}: {e}")
+
+
+def protected_lines(structure: Optional[Dict]) -> Set[int]:
+    """Start offsets of the heading lines, which are never stripped ('Introduction', 'References' ...)"""
+    if not structure:
+        return set()
+    return {start for start, _, _ in structure.get('headings', [])}
+
+
+def candidate_lines(text: str, structure: Optional[Dict], min_chars: int) -> Iterator[Tuple[int, str]]:
+    """(start offset, line) of the lines of a full text that may be counted and stripped"""
+    protected = protected_lines(structure)
+    start = 0
+    for line in text.split('\n'):
+        if len(line.strip()) >= min_chars and start not in protected:
+            yield start, line
+        start += len(line) + 1
+
+
+def count_lines(articles_dir: Path, sketch: CountMinSketch, min_chars: int) -> int:
+    """Pass 1: add every distinct line of each article to the sketch once; returns articles seen"""
+    articles = 0
+    for _, record in iter_articles(articles_dir):
+        text = record.get('full_text') or ''
+        if not text:
+            continue
+        articles += 1
+        lines = candidate_lines(text, record.get('full_text_structure'), min_chars)
+        for key in {line_key(line) for _, line in lines}:
+            sketch.add(key)
+    return articles
+
+
+def strip_text(text: str, structure: Optional[Dict], is_boilerplate,
+               min_chars: int) -> Tuple[str, List[str], List[Tuple[int, int, int]]]:
+    """
+    The text without boilerplate lines, the lines removed, and (old start, old end, new start)
+    of every line kept, for remapping offsets
+    """
+    removed_starts = {start for start, line in candidate_lines(text, structure, min_chars)
+                      if is_boilerplate(line)}
+    kept, removed, kept_spans = [], [], []
+    old = new = 0
+    for line in text.split('\n'):
+        if old in removed_starts:
+            removed.append(line)
+        else:
+            kept_spans.append((old, old + len(line), new))
+            kept.append(line)
+            new += len(line) + 1
+        old += len(line) + 1
+    return '\n'.join(kept), removed, kept_spans
+
+
+def remap_span(start: int, end: int, kept_spans: List[Tuple[int, int, int]],
+               starts: List[int]) -> Optional[List[int]]:
+    """Offsets of [start, end) in the stripped text; None if every line of it was removed"""
+    i = max(bisect_right(starts, start) - 1, 0)
+    first = last = None
+    while i < len(kept_spans) and kept_spans[i][0] < end:
+        old_start, old_end, _ = kept_spans[i]
+        if old_end > start or (old_start == start == end):
+            if first is None:
+                first = kept_spans[i]
+            last = kept_spans[i]
+        i += 1
+    if first is None:
+        return None
+    new_start = first[2] + max(start - first[0], 0)
+    new_end = last[2] + min(end, last[1]) - last[0]
+    return [new_start, new_end]
+
+
+def remap_structure(structure: Dict, kept_spans: List[Tuple[int, int, int]]) -> Dict:
+    """full_text_structure for the stripped text; blocks whose lines were all removed are dropped"""
+    starts = [span[0] for span in kept_spans]
+    remapped = {}
+    for name, value in structure.items():
+        if name == 'references':
+            remapped[name] = remap_span(value[0], value[1], kept_spans, starts) if value else None
+        else:
+            remapped[name] = []
+            for block in value:
+                span = remap_span(block[0], block[1], kept_spans, starts)
+                if span:
+                    remapped[name].append(span + block[2:])
+    return remapped
+
+
+def strip_corpus(articles_dir: Path, output_dir: Path, sketch: CountMinSketch, threshold: int,
+                 min_chars: int, dry_run: bool) -> Dict:
+    """Pass 2: write each article without its boilerplate lines; returns the report"""
+    removed_counts = Counter()  # by line key; only lines over the threshold, so it stays small
+    examples = {}
+    articles_changed = 0
+    words_removed = 0
+
+    def is_boilerplate(line: str) -> bool:
+        return sketch.estimate(line_key(line)) >= threshold
+
+    for path, record in iter_articles(articles_dir):
+        text = record.get('full_text') or ''
+        structure = record.get('full_text_structure')
+        target = output_dir / path.relative_to(articles_dir)
+
+        if text:
+            cleaned, removed, kept_spans = strip_text(text, structure, is_boilerplate, min_chars)
+            if removed:
+                articles_changed += 1
+                for line in removed:
+                    key = line_key(line)
+                    removed_counts[key] += 1
+                    examples.setdefault(key, line.strip())
+                words_removed += len(text.split()) - len(cleaned.split())
+                record['full_text'] = cleaned
+                record['word_count'] = len(cleaned.split())
+                record['boilerplate_lines_removed'] = len(removed)
+                if structure:
+                    record['full_text_structure'] = remap_structure(structure, kept_spans)
+
+        if not dry_run:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+
+    if not dry_run:
+        # Keep the copy a complete corpus
+        for info in articles_dir.rglob('issue_info.json'):
+            target = output_dir / info.relative_to(articles_dir)
+            if target != info:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(info, target)
+
+    return {
+        'articles_changed': articles_changed,
+        'lines_removed': sum(removed_counts.values()),
+        'words_removed': words_removed,
+        'removed_lines': [
+            {'line': examples[key], 'articles_estimate': sketch.estimate(key), 'occurrences_removed': count}
+            for key, count in removed_counts.most_common()
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strip lines repeated across many articles from the full texts")
+    parser.add_argument('--articles-dir', default='Data/articles',
+                        help="combined corpus to clean (default: Data/articles)")
+    parser.add_argument('--output-dir', default='Data/articles_clean',
+                        help="where to write the cleaned corpus (default: Data/articles_clean)")
+    parser.add_argument('--report', default='Data/boilerplate_report.json',
+                        help="where to write the removed-lines report")
+    parser.add_argument('--min-share', type=float, default=0.02,
+                        help="strip lines found in at least this share of articles (default: 0.02)")
+    parser.add_argument('--min-articles', type=int, default=10,
+                        help="...and in at least this many articles (default: 10)")
+    parser.add_argument('--min-chars', type=int, default=10,
+                        help="never strip lines shorter than this, e.g. inline fragments like 'and' (default: 10)")
+    parser.add_argument('--sketch-width', type=int, default=2 ** 20, help="counters per sketch row")
+    parser.add_argument('--sketch-depth', type=int, default=4, help="sketch rows")
+    parser.add_argument('--dry-run', action='store_true', help="only write the report")
+    args = parser.parse_args()
+
+    articles_dir = Path(args.articles_dir)
+    if not articles_dir.exists():
+        print(f"ERROR: {articles_dir} does not exist!")
+        return
+
+    print("=" * 80)
+    print("STRIPPING BOILERPLATE LINES")
+    print("=" * 80)
+
+    sketch = CountMinSketch(args.sketch_width, args.sketch_depth)
+    start = time.time()
+    articles = count_lines(articles_dir, sketch, args.min_chars)
+    threshold = max(args.min_articles, int(args.min_share * articles + 0.999999))
+    print(f"\nCounted the lines of {articles} articles ({sketch.memory_bytes() / 2 ** 20:.0f} MB sketch)")
+    print(f"Stripping lines found in {threshold} or more articles...")
+
+    report = strip_corpus(articles_dir, Path(args.output_dir), sketch, threshold, args.min_chars, args.dry_run)
+    report = {'articles': articles, 'threshold_articles': threshold, 'min_chars': args.min_chars, **report}
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 80)
+    print("BOILERPLATE STRIPPING COMPLETE" if not args.dry_run else "DRY RUN COMPLETE")
+    print("=" * 80)
+    print(f"Time: {time.time() - start:.1f}s")
+    print(f"Articles changed: {report['articles_changed']}")
+    print(f"Lines removed: {report['lines_removed']} ({len(report['removed_lines'])} distinct)")
+    print(f"Words removed: {report['words_removed']}")
+    for entry in report['removed_lines'][:10]:
+        print(f"  {entry['occurrences_removed']:>6}  {entry['line'][:70]}")
+    if not args.dry_run:
+        print(f"\nCleaned corpus written to {args.output_dir}")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Test script to verify combined article records round-trip through the Parquet dataset
+Covers older records that store a single author, keyword or Dublin Core value as a string
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from corpus_parquet import load_table, write_dataset
+
+ISSUE = '20030106'
+RECORDS = {
+    'list_fields.json': {
+        'article_id': '1001', 'title': 'Lists', 'authors': ['Ann Smith', 'Bo Jones'],
+        'keywords': ['internet', 'culture'], 'publication_date': '2003/01/06',
+        'dublin_core': {'DC.Title': ['Lists']},
+    },
+    'string_fields.json': {
+        'article_id': '1002', 'title': 'Strings', 'authors': 'Smith', 'keywords': 'network',
+        'publication_date': '2003/01/06', 'dublin_core': {'DC.Title': 'Strings'},
+    },
+}
+EXPECTED = {
+    '1001': {'authors': ['Ann Smith', 'Bo Jones'], 'keywords': ['internet', 'culture'],
+             'dublin_core': [('DC.Title', ['Lists'])], 'extra': None},
+    '1002': {'authors': ['Smith'], 'keywords': ['network'],
+             'dublin_core': [('DC.Title', ['Strings'])], 'extra': None},
+}
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix='fm-parquet-') as workdir:
+        issue_dir = Path(workdir) / 'articles' / ISSUE
+        issue_dir.mkdir(parents=True)
+        for name, record in RECORDS.items():
+            with open(issue_dir / name, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+
+        dataset_dir = str(Path(workdir) / 'parquet')
+        write_dataset(str(issue_dir.parent), dataset_dir)
+        rows = {row['article_id']: row for row in
+                load_table(['article_id', *EXPECTED['1001']], dataset_dir=dataset_dir).to_pylist()}
+
+    print("Testing Parquet round trip:")
+    print("=" * 60)
+    failed = False
+    for article_id, expected in EXPECTED.items():
+        for column, value in expected.items():
+            got = rows.get(article_id, {}).get(column)
+            ok = got == value
+            failed = failed or not ok
+            print(f"{article_id} {column:12s} -> {got!r}" + ('' if ok else f"  FAILED, expected {value!r}"))
+
+    print("\n" + "=" * 60)
+    print("Test complete!" if not failed else "Test FAILED: records changed on the way through Parquet")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Test script to verify the fast HTML parser backends extract exactly what BeautifulSoup does
+Runs every extraction step on saved pages (see benchmark_parsers.py) and on tricky snippets
+"""
+import argparse
+import sys
+
+from benchmark_parsers import extract, extraction_steps, load_saved_pages
+from html_parsers import BACKENDS, get_backend
+
+# Markup the saved pages may not cover
+EDGE_CASES = [
+    ('landing', b'<html><head><meta name="citation_author" content="A"><meta name="citation_author">'
+                b'<meta name="citation_title" content=""></head><body><h1 class="page_title x"> T <b>i</b> '
+                b'</h1><div class="authors">none</div><div class="item  abstract"><p>One</p><script>x</script>'
+                b'<p>Two &nbsp;</p></div><a href="/a"><span> html </span></a></body></html>'),
+    ('landing', b'<html><body><a href="/x">HTML <b>galley</b></a><a class="obj_galley_link pdf">PDF</a>'
+                b'<div class="abstract item">not matched</div></body></html>'),
+    ('landing', b'<html><head><meta name="citation_fulltext_html_url" content="http://x/full"></head>'
+                b'<body><a><!--HTML--></a></body></html>'),
+    ('landing', '<html><head><meta charset="iso-8859-1"></head><body><h1 class="page_title">Caf\xe9 '
+                '\xfcber</h1></body></html>'.encode('iso-8859-1')),
+    ('landing', '<html><body><h1 class="page_title">Caf\xe9 — na\xefve</h1></body></html>'.encode('utf-8')),
+    ('landing', b'<html><head><meta name="DC.Description" content=" Abstract "><meta name="DC.Subject" content="a">'
+                b'<meta name="DC.Subject" content="b"></head><body><div class="authors"></div>'
+                b'<div class="authors"><a>Second</a></div><a class="obj_galley_link" href="/pdf">PDF</a>'
+                b'<a href="/h"><b><i>full html</i></b></a><h1 class="page_title">A</h1>'
+                b'<h1 class="page_title">B</h1></body></html>'),
+    ('galley', b'<html><body><header><div id="htmlContainer">chrome</div></header>'
+               b'<iframe src=" /ojs/x "></iframe><div id="htmlContainer"><p>Para<script>s</script>tail</p>'
+               b'<template>hidden</template><!-- c --><p>two</p></div></body></html>'),
+    ('galley', b'<html><body><p>No container</p><iframe>inside</iframe>after<nav><p>menu</p></nav></body></html>'),
+    ('document', b'<html><head><title>Doc</title><style>p{}</style></head><body><nav>menu</nav>'
+                 b'<p>a<br>b</p><footer>foot</footer>end<ul><li> x </li><li>\xc2\xa0</li></ul></body></html>'),
+    ('document', b''),
+    ('document', b'plain text, no markup'),
+]
+
+
+def compare(backend_name: str, pages):
+    """Return (pages checked, list of (source, field, reference, got))"""
+    backend = BACKENDS[backend_name]
+    reference = BACKENDS['bs4']
+    mismatches = []
+
+    for source, steps, content in pages:
+        expected = extract(reference, content, steps)
+        actual = extract(backend, content, steps)
+        for field in sorted(set(expected) | set(actual)):
+            if expected.get(field) != actual.get(field):
+                mismatches.append((source, field, expected.get(field), actual.get(field)))
+
+    return len(pages), mismatches
+
+
+def short(value, width: int = 100) -> str:
+    text = repr(value)
+    return text if len(text) <= width else text[:width] + '...'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the fast parser backends against BeautifulSoup")
+    parser.add_argument('--html-dir', help="directory of saved .html pages (default: WARC archive and cache)")
+    parser.add_argument('--limit', type=int, help="check at most this many saved pages")
+    args = parser.parse_args()
+
+    pages = [(url, extraction_steps(url, content), content)
+             for url, content in load_saved_pages(args.html_dir, args.limit)]
+    pages += [(f"edge case {i}", steps, content) for i, (steps, content) in enumerate(EDGE_CASES, 1)]
+
+    print("Testing parser equivalence:")
+    print("=" * 60)
+    failed = False
+    for name in BACKENDS:
+        if name == 'bs4':
+            continue
+        if get_backend(name).name != name:
+            print(f"{name:12s} -> not installed, skipped")
+            continue
+
+        checked, mismatches = compare(name, pages)
+        print(f"{name:12s} -> {checked - len({m[0] for m in mismatches})}/{checked} pages identical")
+        for source, field, expected, actual in mismatches[:10]:
+            print(f"    {source} [{field}]")
+            print(f"      bs4:   {short(expected)}")
+            print(f"      {name}: {short(actual)}")
+        failed = failed or bool(mismatches)
+
+    print("\n" + "=" * 60)
+    print("Test complete!" if not failed else "Test FAILED: backends disagree with BeautifulSoup")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
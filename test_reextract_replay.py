@@ -0,0 +1,86 @@
+"""
+Test script to verify offline re-extraction replays galley articles from a WARC archive
+Writes a small archive of synthetic pages and runs ArchiveReplayScraper through
+fetch_full_text_document, so a change to make_request's signature fails here first
+"""
+import sys
+import tempfile
+
+import config
+from async_fetcher import FetchResult
+from mock_ojs_server import OJS, SyntheticCorpus
+from reextract import ArchiveReplayScraper
+from warc_writer import WarcWriter
+
+BASE = config.BASE_URL
+
+
+def page(url: str, body, status: int = 200) -> FetchResult:
+    content = body.encode('utf-8') if body else b'Not Found'
+    return FetchResult(url=url, status_code=status, headers={'Content-Type': 'text/html; charset=utf-8'},
+                       content=content)
+
+
+def build_archive(warc_dir: str, corpus: SyntheticCorpus):
+    """
+    Article 1001: landing page and article document archived
+    Article 1002: the guessed download URL got a 404, so its galley page is archived instead
+    """
+    writer = WarcWriter(warc_dir)
+    for article_id in (1001, 1002):
+        galley_id = article_id * 10 + 1
+        landing = f"{BASE}{OJS}/article/view/{article_id}"
+        galley = f"{landing}/{galley_id}"
+        download = f"{BASE}{OJS}/article/download/{article_id}/{galley_id}"
+        writer.write_response(landing, page(landing, corpus.landing_page(article_id)))
+        if article_id == 1001:
+            writer.write_response(download, page(download, corpus.document(article_id, galley_id)))
+        else:
+            writer.write_response(download, page(download, None, status=404))
+            writer.write_response(galley, page(galley, corpus.galley_page(article_id, galley_id)))
+    writer.close()
+
+
+def main():
+    config.RESOLVE_DOWNLOAD_URLS = True
+    config.EXTRACT_FULL_TEXT = True
+    corpus = SyntheticCorpus(issues=1, articles_per_issue=2, galley_bytes=2_000)
+
+    checks = []
+    with tempfile.TemporaryDirectory(prefix='fm-replay-') as warc_dir:
+        build_archive(warc_dir, corpus)
+        replay = ArchiveReplayScraper(warc_dir, use_cache=False)
+        try:
+            galley = f"{BASE}{OJS}/article/view/1001/10011"
+            document = replay.fetch_full_text_document(galley)
+            checks.append(("archived document replayed", document is not None and document[0] == 'download'))
+
+            galley = f"{BASE}{OJS}/article/view/1002/10021"
+            download = f"{BASE}{OJS}/article/download/1002/10021"
+            document = replay.fetch_full_text_document(galley)
+            checks.append(("archived 404 falls back to galley page",
+                           document is not None and document[0] == 'galley'))
+            checks.append(("404 counted against the resolver", replay.resolver_stats['fallback'] == 1))
+            checks.append(("404 dropped without client_errors", replay.make_request(download) is None))
+            response = replay.make_request(download, client_errors=True)
+            checks.append(("404 returned with client_errors", response is not None and response.status_code == 404))
+
+            article = replay.parse_article(f"{BASE}{OJS}/article/view/1001")
+            checks.append(("landing page re-extracted with full text",
+                           article is not None and article.get('word_count', 0) > 0))
+        finally:
+            replay.close()
+
+    print("Testing archive replay:")
+    print("=" * 60)
+    for name, ok in checks:
+        print(f"{name:45s} -> {'ok' if ok else 'FAILED'}")
+
+    failed = not all(ok for _, ok in checks)
+    print("\n" + "=" * 60)
+    print("Test complete!" if not failed else "Test FAILED: re-extraction cannot replay the archive")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Full text extraction with a map of the text's structure
+Records the character offsets of headings, paragraphs, notes and the references section, so
+analyses can slice the saved full text (e.g. leave out the references) instead of re-parsing it
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import config
+from html_parsers import DOCUMENT_SKIP_TAGS, GALLEY_SKIP_TAGS, LxmlPage, lxml_text_query, parse_html
+
+HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+BLOCK_TAGS = set(HEADING_LEVELS) | {'p'}
+
+# Heading texts (lowercased, trailing colon dropped) that open the notes and references sections
+SECTION_HEADINGS = {
+    'notes': 'notes', 'endnotes': 'notes', 'footnotes': 'notes',
+    'references': 'references', 'bibliography': 'references', 'works cited': 'references',
+    'literature cited': 'references', 'sources': 'references',
+}
+
+STRUCTURE_XPATH: Dict = {}  # by skip tags, compiled on first use
+
+logger = logging.getLogger(__name__)
+
+
+def extract_full_text(kind: str, content: bytes, backend: Optional[str] = None) -> Tuple[str, int, Optional[Dict]]:
+    """
+    Full text, word count and structure (None if it can't be mapped) of an article document
+    ('download') or galley page ('galley')
+    Module-level and fed raw bytes so the pipeline can run it in worker processes
+    """
+    backend = backend or config.HTML_PARSER
+    text = structure = None
+
+    if LxmlPage.available():
+        try:
+            page = LxmlPage(content)
+            if kind == 'download':
+                text, structure = text_structure(page.root, DOCUMENT_SKIP_TAGS)
+            else:
+                container = page.galley_container()
+                if container is not None:
+                    text, structure = text_structure(container, GALLEY_SKIP_TAGS)
+        except Exception as e:
+            logger.debug(f"No text structure: {e}")
+            text = structure = None
+
+    if backend != 'lxml' or text is None:
+        page = parse_html(content, backend)
+        backend_text = page.document_text() if kind == 'download' else page.galley_page_text()
+        if backend_text != text:
+            # The offsets index the lxml text; they are no use for a different string
+            structure = None
+        text = backend_text
+
+    return text, len(text.split()), structure
+
+
+def text_structure(element, skip_tags: List[str]) -> Tuple[str, Dict]:
+    """
+    get_text('\\n', strip=True) of an lxml element without skip_tags, and the offsets in it of
+    {'headings': [[start, end, level], ...], 'paragraphs': [[start, end], ...],
+     'notes': [[start, end], ...], 'references': [start, end] or None}
+    Paragraphs are the <p>s of the body; the notes and references sections run from their heading
+    to the next heading of the same or a higher level
+    """
+    key = tuple(skip_tags)
+    if key not in STRUCTURE_XPATH:
+        STRUCTURE_XPATH[key] = lxml_text_query(skip_tags, smart_strings=True)
+
+    parts = []
+    runs = []  # [start, end, enclosing block] of consecutive strings in the same block
+    offset = 0
+    for string in STRUCTURE_XPATH[key](element):
+        stripped = string.strip()
+        if not stripped:
+            continue
+        start = offset + 1 if parts else 0
+        offset = start + len(stripped)
+        parts.append(stripped)
+
+        block = enclosing_block(string, element)
+        if runs and runs[-1][2] is block:
+            runs[-1][1] = offset
+        else:
+            runs.append([start, offset, block])
+
+    text = '\n'.join(parts)
+    structure = {'headings': [], 'paragraphs': [], 'notes': [], 'references': None}
+    section = None  # (name, heading level) of the notes or references section we are in
+    for start, end, block in runs:
+        tag = block.tag if block is not None else None
+        if tag in HEADING_LEVELS:
+            level = HEADING_LEVELS[tag]
+            if section and level <= section[1]:
+                section = None
+            structure['headings'].append([start, end, level])
+            name = SECTION_HEADINGS.get(' '.join(text[start:end].split()).lower().rstrip(':').strip())
+            if name and section is None:
+                section = (name, level)
+                if name == 'references':
+                    structure['references'] = [start, end]
+        elif section and section[0] == 'references':
+            structure['references'][1] = end
+        elif tag == 'p':
+            structure['notes' if section else 'paragraphs'].append([start, end])
+
+    return text, structure
+
+
+def enclosing_block(string, container):
+    """The nearest heading or <p> holding a string from a smart-strings XPath, if below container"""
+    element = string.getparent()
+    if string.is_tail:
+        element = element.getparent()
+    while element is not None and element is not container:
+        if element.tag in BLOCK_TAGS:
+            return element
+        element = element.getparent()
+    return element if element is not None and element.tag in BLOCK_TAGS else None
@@ -0,0 +1,239 @@
+"""
+WARC capture and replay of raw crawl responses
+Appends gzip-compressed WARC/1.1 records to size-rotated files and keeps a CDX index next to them
+"""
+
+import base64
+import gzip
+import hashlib
+import logging
+import threading
+import uuid
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import config
+from async_fetcher import FetchResult
+
+CDX_HEADER = " CDX N b a m s k r M S V g\n"
+
+# The body handed to us is already decoded, so these headers would no longer describe it
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+def surt_key(url: str) -> str:
+    """Sort-friendly URL key used in the CDX index (e.g. org,firstmonday)/ojs/index.php/...)"""
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    key = ','.join(reversed(host.split('.'))) + ')' + (parts.path or '/')
+    if parts.query:
+        key += '?' + parts.query
+    return key.lower()
+
+
+def sha1_digest(data: bytes) -> str:
+    return 'sha1:' + base64.b32encode(hashlib.sha1(data).digest()).decode('ascii')
+
+
+class WarcWriter:
+    """Writes one WARC record per response; thread-safe, rotates files at WARC_MAX_FILE_SIZE"""
+
+    def __init__(self, warc_dir: Optional[str] = None,
+                 max_file_size: Optional[int] = None,
+                 prefix: str = 'firstmonday'):
+        self.warc_dir = Path(warc_dir or config.WARC_DIR)
+        self.warc_dir.mkdir(parents=True, exist_ok=True)
+        self.max_file_size = max_file_size or config.WARC_MAX_FILE_SIZE
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self.file = None
+        self.file_name = None
+        self.warcinfo_id = None
+        self.serial = 0
+
+        cdx_path = self.warc_dir / 'index.cdx'
+        new_index = not cdx_path.exists()
+        self.captured = set() if new_index else self.load_captured(cdx_path)  # (url, payload digest)
+        self.cdx = open(cdx_path, 'a', encoding='utf-8')
+        if new_index:
+            self.cdx.write(CDX_HEADER)
+
+    def load_captured(self, cdx_path: Path) -> set:
+        """(url, payload digest) of every successful capture already in the index"""
+        captured = set()
+        with open(cdx_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 11 and fields[4] == '200':
+                    captured.add((fields[2], fields[5]))
+        return captured
+
+    def open_next_file(self):
+        """Start a new WARC file beginning with a warcinfo record"""
+        if self.file:
+            self.file.close()
+
+        self.serial += 1
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        self.file_name = f"{self.prefix}-{timestamp}-{self.serial:05d}.warc.gz"
+        self.file = open(self.warc_dir / self.file_name, 'ab')
+        self.logger.info(f"Writing WARC file {self.file_name}")
+
+        info = (f"software: FirstMondayScraper\r\n"
+                f"format: WARC File Format 1.1\r\n"
+                f"http-header-user-agent: {config.USER_AGENT}\r\n").encode('utf-8')
+        self.warcinfo_id = f"<urn:uuid:{uuid.uuid4()}>"
+        self.append_record({
+            'WARC-Type': 'warcinfo',
+            'WARC-Record-ID': self.warcinfo_id,
+            'WARC-Filename': self.file_name,
+            'Content-Type': 'application/warc-fields',
+        }, info)
+
+    def append_record(self, headers: dict, block: bytes):
+        """Append one gzip member holding a single record; returns (offset, compressed length)"""
+        headers = dict(headers)
+        headers.setdefault('WARC-Date', datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+        headers['Content-Length'] = str(len(block))
+
+        head = 'WARC/1.1\r\n' + ''.join(f"{k}: {v}\r\n" for k, v in headers.items()) + '\r\n'
+        record = gzip.compress(head.encode('utf-8') + block + b'\r\n\r\n')
+
+        offset = self.file.tell()
+        self.file.write(record)
+        return offset, len(record)
+
+    def write_response(self, url: str, response, fetched_at: Optional[float] = None):
+        """
+        Archive a network response (requests.Response or FetchResult)
+        fetched_at: when the response was downloaded, if not just now (epoch seconds)
+        """
+        status = response.status_code
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+
+        body = response.content if status != 304 else b''
+        header_lines = ''.join(f"{k}: {v}\r\n" for k, v in response.headers.items()
+                               if k.lower() not in DROPPED_HEADERS)
+        http_head = (f"HTTP/1.1 {status} {reason}\r\n{header_lines}"
+                     f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1', errors='replace')
+        block = http_head + body
+        payload_digest = sha1_digest(body)
+        now = datetime.fromtimestamp(fetched_at, timezone.utc) if fetched_at else datetime.now(timezone.utc)
+
+        record_headers = {
+            'WARC-Type': 'response',
+            'WARC-Record-ID': f"<urn:uuid:{uuid.uuid4()}>",
+            'WARC-Date': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'WARC-Target-URI': url,
+            'WARC-Payload-Digest': payload_digest,
+            'WARC-Block-Digest': sha1_digest(block),
+            'Content-Type': 'application/http;msgtype=response',
+        }
+        if status == 304:
+            record_headers['WARC-Type'] = 'revisit'
+            record_headers['WARC-Profile'] = 'http://netpreserve.org/warc/1.1/revisit/server-not-modified'
+
+        with self.lock:
+            if self.file is None or self.file.tell() >= self.max_file_size:
+                self.open_next_file()
+            record_headers['WARC-Warcinfo-ID'] = self.warcinfo_id
+            offset, length = self.append_record(record_headers, block)
+            self.file.flush()
+
+            mime = response.headers.get('Content-Type', '-').split(';')[0].strip() or '-'
+            self.cdx.write(' '.join([
+                surt_key(url), now.strftime('%Y%m%d%H%M%S'), url, mime.replace(' ', ''), str(status),
+                payload_digest.split(':', 1)[1], '-', '-', str(length), str(offset), self.file_name,
+            ]) + '\n')
+            self.cdx.flush()
+            if status == 200:
+                self.captured.add((url, payload_digest.split(':', 1)[1]))
+
+    def write_cached(self, url: str, response):
+        """
+        Archive a response served from the HTTP cache, dated when it was downloaded,
+        unless the archive already holds that URL with the same body
+        """
+        if response.status_code != 200:
+            return
+        with self.lock:
+            if (url, sha1_digest(response.content).split(':', 1)[1]) in self.captured:
+                return
+        self.write_response(url, response, fetched_at=response.fetched_at)
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+            self.cdx.close()
+
+
+class WarcArchive:
+    """Read-only view of a WARC directory, looking records up through its CDX index"""
+
+    def __init__(self, warc_dir: Optional[str] = None):
+        self.warc_dir = Path(warc_dir or config.WARC_DIR)
+        self.index: Dict[str, Tuple[str, int, int]] = {}
+        self.client_errors: Dict[str, Tuple[str, int, int]] = {}  # latest 4xx capture (not 403/429)
+        self.load_index()
+
+    def load_index(self):
+        """Map each URL to its latest successful capture, and to its latest 4xx answer"""
+        cdx_path = self.warc_dir / 'index.cdx'
+        if not cdx_path.exists():
+            return
+
+        with open(cdx_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if line.startswith(' CDX') or len(fields) != 11:
+                    continue
+                _, _, url, _, status, _, _, _, length, offset, file_name = fields
+                if status == '200':
+                    self.index[url] = (file_name, int(offset), int(length))
+                elif status.startswith('4') and status not in ('403', '429'):
+                    self.client_errors[url] = (file_name, int(offset), int(length))
+
+    def urls(self):
+        return self.index.keys()
+
+    def read(self, url: str) -> Optional[FetchResult]:
+        """Return the archived response for a URL, or None if it was never captured"""
+        return self.read_record(url, self.index.get(url))
+
+    def read_client_error(self, url: str) -> Optional[FetchResult]:
+        """Return the archived 4xx answer for a URL, or None if it never got one"""
+        return self.read_record(url, self.client_errors.get(url))
+
+    def read_record(self, url: str, entry: Optional[Tuple[str, int, int]]) -> Optional[FetchResult]:
+        if not entry:
+            return None
+
+        file_name, offset, length = entry
+        with open(self.warc_dir / file_name, 'rb') as f:
+            f.seek(offset)
+            record = gzip.decompress(f.read(length))
+
+        _, _, block = record.partition(b'\r\n\r\n')
+        http_head, _, body = block.partition(b'\r\n\r\n')
+        if body.endswith(b'\r\n\r\n'):
+            body = body[:-4]
+
+        lines = http_head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
+
+        return FetchResult(url=url, status_code=status, headers=headers, content=body, from_cache=True)